@@ -0,0 +1,72 @@
+'''
+Event journal benchmark.
+
+Measures the append (ingest), lookup and replay rates of the memory-mapped event journal.
+
+    python benchmarks/journal.py [N]
+'''
+
+import os
+import struct
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from uhppoted.journal import Journal
+
+
+def event(controller, index):
+    packet = bytearray(64)
+
+    packet[0] = 0x17
+    packet[1] = 0x20
+    struct.pack_into('<LLBBBBL', packet, 4, controller, index, 0x01, 0x01, 0x03, 0x01, 10058400 + index)
+    packet[20:27] = bytes.fromhex('20240315123456')
+    packet[37:40] = bytes.fromhex('123456')
+    packet[51:54] = bytes.fromhex('240315')
+
+    return bytes(packet)
+
+
+def rate(f, N):
+    '''
+    Returns the number of operations per second for N invocations of f(i).
+    '''
+    start = time.perf_counter()
+    for i in range(N):
+        f(i)
+
+    return N / (time.perf_counter() - start)
+
+
+def main():
+    N = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    controllers = [405419896 + i for i in range(100)]
+    packets = [event(controllers[i % 100], 1 + i // 100) for i in range(N)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with Journal(tmp) as journal:
+            append = rate(lambda i: journal.append(packets[i]), N)
+            lookup = rate(lambda i: journal.get(controllers[i % 100], 1 + i // 100), N)
+
+            start = time.perf_counter()
+            replayed = sum(1 for _ in journal.replay(lazy=True))
+            replay = replayed / (time.perf_counter() - start)
+
+            journal.flush()
+
+        start = time.perf_counter()
+        with Journal(tmp) as journal:
+            reopen = time.perf_counter() - start
+
+    print(f'{N} events')
+    print(f'  append           {append:12.0f} events/s')
+    print(f'  lookup           {lookup:12.0f} events/s')
+    print(f'  replay (lazy)    {replay:12.0f} events/s')
+    print(f'  reopen           {reopen:12.3f} s')
+
+
+if __name__ == '__main__':
+    main()
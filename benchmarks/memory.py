@@ -0,0 +1,76 @@
+'''
+Memory benchmark for the slotted response classes.
+
+Measures the per-object memory use of decoded events and cards held in memory, for the standard
+dataclasses and the equivalent structs.slotted variants.
+
+    python benchmarks/memory.py [N]
+'''
+
+import datetime
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from uhppoted import decode
+from uhppoted import structs
+
+
+def event(index):
+    packet = bytearray(64)
+
+    packet[0] = 0x17
+    packet[1] = 0x20
+    packet[4:8] = (405419896).to_bytes(4, 'little')
+    packet[8:12] = index.to_bytes(4, 'little')
+    packet[12] = 0x01
+    packet[14] = 0x03
+    packet[16:20] = (10058400 + index).to_bytes(4, 'little')
+    packet[20:27] = bytes.fromhex('20240315123456')
+    packet[37:40] = bytes.fromhex('123456')
+    packet[51:54] = bytes.fromhex('240315')
+
+    return bytes(packet)
+
+
+def card(index):
+    return structs.GetCardByIndexResponse(405419896, 10058400 + index, datetime.date(2024, 1, 1),
+                                          datetime.date(2024, 12, 31), 1, 0, 0, 1, 0)
+
+
+def measure(f, N):
+    '''
+    Returns the memory allocated per object (in bytes) for N objects created by f(index).
+    '''
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [f(i) for i in range(N)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    del objects
+
+    return (after - before) / N
+
+
+def main():
+    N = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    packets = [event(i) for i in range(N)]
+    cards = [card(i) for i in range(N)]
+
+    tests = [
+        ('Event', lambda i: decode.event(packets[i])),
+        ('Event (slotted)', lambda i: structs.compact(decode.event(packets[i]))),
+        ('GetCardByIndexResponse', lambda i: structs.GetCardByIndexResponse(*cards[i].__dict__.values())),
+        ('GetCardByIndexResponse (slotted)', lambda i: structs.compact(cards[i])),
+    ]
+
+    print(f'{N} objects')
+    for (name, f) in tests:
+        print(f'  {name:<36} {measure(f, N):8.1f} bytes/object')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+'''
+UDP throughput benchmark for the pipelined bulk functions.
+
+Downloads N events and N cards from a stub controller (running in a separate process) with the default
+(worker thread per request) and batched UDP I/O backends and reports the throughput in datagrams per second.
+
+    python benchmarks/udp.py [N] [window]
+'''
+
+import multiprocessing
+import os
+import socket
+import struct
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from uhppoted import uhppote
+
+CONTROLLER = 405419896
+ADDR = ('127.0.0.1', 54325)
+
+
+def stub(N, ready):
+    '''
+    Replies to get-status and get-cards requests with N events and cards, and to get-event and
+    get-card-by-index requests with the echoed request (i.e. event N has index N and card N has card
+    number N).
+    '''
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, 0)
+    sock.bind(ADDR)
+    ready.set()
+
+    while True:
+        (request, addr) = sock.recvfrom(1024)
+        if len(request) == 64:
+            reply = bytearray(request)
+            if request[1] in [0x20, 0x58]:
+                struct.pack_into('<L', reply, 8, N)
+
+            sock.sendto(reply, addr)
+
+
+def measure(f):
+    '''
+    Returns the number of datagrams per second (request and reply) for the items retrieved by f().
+    '''
+    start = time.perf_counter()
+    n = sum(1 for _ in f())
+    dt = time.perf_counter() - start
+
+    return 2 * n / dt
+
+
+def main():
+    N = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    window = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+    controller = (CONTROLLER, f'{ADDR[0]}:{ADDR[1]}')
+
+    ready = multiprocessing.Event()
+    process = multiprocessing.Process(target=stub, args=(N, ready), daemon=True)
+    process.start()
+    ready.wait()
+
+    try:
+        print(f'{N} events/cards, window {window}')
+
+        for batched in [False, True]:
+            u = uhppote.Uhppote('127.0.0.1', '255.255.255.255:60000', '0.0.0.0:60001', False, batched=batched)
+            backend = 'batched' if batched else 'threaded'
+            events = measure(lambda: u.iter_events(controller, 1, N, window=window, timeout=1.0))
+            cards = measure(lambda: u.iter_cards(controller, window=window, timeout=1.0))
+
+            print(f'  iter_events ({backend:<8}) {events:10.0f} datagrams/s')
+            print(f'  iter_cards  ({backend:<8}) {cards:10.0f} datagrams/s')
+    finally:
+        process.terminate()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,369 @@
+'''
+UHPPOTE function tests.
+
+End-to-end tests for the pipelined bulk retrieval functions.
+'''
+
+import unittest
+import socket
+import struct
+import threading
+import time
+import datetime
+
+from uhppoted import uhppote
+from uhppoted.cards import CardIndex
+from uhppoted.net import dump
+from uhppoted.ratelimit import RateLimiter
+from uhppoted.structs import Card
+
+from .stub import messages
+
+DEST_ADDR = '127.0.0.1:54324'
+CONTROLLER = 405419896
+LOST = 405419897
+EVENTS = 73
+SLOTS = 57
+DELETED = 5
+START_DATE = datetime.date(2024, 1, 1)
+END_DATE = datetime.date(2024, 12, 31)
+REJECTED = 11
+DROPPED = 7
+
+
+def card(index):
+    '''
+    Returns the synthesized card number stored at a card index, 0xffffffff for every DELETED'th slot and 0
+    for slots past the end of the card table.
+    '''
+    if index > SLOTS:
+        return 0
+    elif index % DELETED == 0:
+        return 0xffffffff
+    else:
+        return 10000000 + index
+
+
+def handle(sock, bind, debug):
+    '''
+    Replies to get-status, get-event, get-cards, get-card-by-index, put-card and delete-card
+    requests with synthesized
+    responses for a controller with EVENTS events and SLOTS card slots that rejects every REJECTED'th card
+    number. Requests for the LOST controller and every other request for every DROPPED'th event index, card
+    index or card number are discarded to exercise the retry logic.
+    '''
+    never = struct.pack('ll', 0, 0)  # (infinite)
+    responses = {}
+    requests = {}
+
+    for m in messages():
+        if m['response'] != None and m['response'][8] != 0:
+            responses.setdefault(m['request'][1], m['response'])
+
+    def synthesize(message):
+        index = struct.unpack_from('<L', message, 8)[0]
+
+        if message[1] == 0x20:
+            return EVENTS
+        elif message[1] == 0x58:
+            return len([i for i in range(1, SLOTS + 1) if card(i) != 0xffffffff])
+        elif message[1] == 0xb0:
+            return index if index <= EVENTS else 0
+        elif message[1] == 0x5c:
+            return card(index)
+        elif message[1] == 0x50:
+            return 0 if index % REJECTED == 0 else 1
+        elif message[1] == 0x52:
+            return 1
+
+    try:
+        sock.bind(bind)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVTIMEO, never)
+
+        while True:
+            (message, addr) = sock.recvfrom(1024)
+            if len(message) == 64 and message[1] in [0x20, 0x58, 0xb0, 0x5c, 0x50, 0x52]:
+                if debug:
+                    dump(message)
+
+                controller = struct.unpack_from('<L', message, 4)[0]
+                if controller == LOST and message[1] in [0xb0, 0x5c, 0x50]:
+                    continue
+
+                if message[1] in [0xb0, 0x5c, 0x50]:
+                    key = (message[1], struct.unpack_from('<L', message, 8)[0])
+                    requests[key] = requests.get(key, 0) + 1
+                    if key[1] % DROPPED == 0 and requests[key] % 2 == 1:
+                        continue
+
+                reply = bytearray(responses[message[1]])
+                reply[4:8] = message[4:8]
+                struct.pack_into('<L', reply, 8, synthesize(message))
+
+                sock.sendto(bytes(reply), addr)
+    except Exception as x:
+        pass
+    finally:
+        sock.close()
+
+
+class TestBulk(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(clazz):
+        bind = '0.0.0.0'
+        broadcast = '255.255.255.255:60000'
+        listen = '0.0.0.0:60001'
+        debug = False
+
+        clazz._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, 0)
+        clazz._thread = threading.Thread(target=handle, args=(clazz._sock, ('127.0.0.1', 54324), False), daemon=True)
+
+        clazz._thread.start()
+        time.sleep(1)
+
+    @classmethod
+    def tearDownClass(clazz):
+        clazz._sock.close()
+        clazz._sock = None
+
+    def test_iter_events(self):
+        '''
+        Tests the pipelined iter-events function with a request per socket.
+        '''
+        controller = (CONTROLLER, DEST_ADDR)
+        u = uhppote.Uhppote('0.0.0.0', '255.255.255.255:60000', '0.0.0.0:60001', False)
+
+        events = list(u.iter_events(controller, 1, 100, window=8, timeout=0.5))
+
+        self.assertEqual([e.index for e in events], list(range(1, EVENTS + 1)))
+        self.assertTrue(all(e.controller == CONTROLLER for e in events))
+
+    def test_iter_events_with_persistent_socket(self):
+        '''
+        Tests the pipelined iter-events function over a long-lived UDP socket.
+        '''
+        controller = (CONTROLLER, DEST_ADDR)
+
+        with uhppote.Uhppote('0.0.0.0', '255.255.255.255:60000', '0.0.0.0:60001', False) as u:
+            events = list(u.iter_events(controller, 1, 100, window=8, timeout=0.5))
+
+        self.assertEqual([e.index for e in events], list(range(1, EVENTS + 1)))
+
+    def test_iter_events_with_batched_io(self):
+        '''
+        Tests the pipelined iter-events function with the batched UDP I/O backend.
+        '''
+        controller = (CONTROLLER, DEST_ADDR)
+        u = uhppote.Uhppote('0.0.0.0', '255.255.255.255:60000', '0.0.0.0:60001', False, batched=True)
+
+        events = list(u.iter_events(controller, 1, 100, window=8, timeout=0.5))
+
+        self.assertEqual([e.index for e in events], list(range(1, EVENTS + 1)))
+        self.assertTrue(all(e.controller == CONTROLLER for e in events))
+
+    def test_iter_events_with_rate_limiter(self):
+        '''
+        Tests the pipelined iter-events function with a per-controller rate and in-flight limit.
+        '''
+        controller = (CONTROLLER, DEST_ADDR)
+        limiter = RateLimiter(rate=500, burst=4, max_inflight=2)
+        u = uhppote.Uhppote('0.0.0.0', '255.255.255.255:60000', '0.0.0.0:60001', False, limiter=limiter)
+
+        events = list(u.iter_events(controller, 1, 100, window=8, timeout=0.5))
+
+        self.assertEqual([e.index for e in events], list(range(1, EVENTS + 1)))
+        self.assertGreater(limiter.stats().throttled, 0)
+        self.assertEqual(limiter.stats().inflight, 0)
+
+    def test_iter_events_with_batched_io_and_rate_limiter(self):
+        '''
+        Tests the pipelined iter-events function with the batched UDP I/O backend and a per-controller rate
+        and in-flight limit.
+        '''
+        controller = (CONTROLLER, DEST_ADDR)
+        limiter = RateLimiter(rate=500, burst=4, max_inflight=2)
+        u = uhppote.Uhppote('0.0.0.0', '255.255.255.255:60000', '0.0.0.0:60001', False, batched=True, limiter=limiter)
+
+        events = list(u.iter_events(controller, 1, 100, window=8, timeout=0.5))
+
+        self.assertEqual([e.index for e in events], list(range(1, EVENTS + 1)))
+        self.assertGreaterEqual(limiter.stats().requests, EVENTS)
+        self.assertEqual(limiter.stats().inflight, 0)
+
+    def test_iter_events_with_lost_controller(self):
+        '''
+        Tests that the pipelined iter-events function raises an error once the retries are exhausted.
+        '''
+        controller = (LOST, DEST_ADDR)
+        u = uhppote.Uhppote('0.0.0.0', '255.255.255.255:60000', '0.0.0.0:60001', False)
+
+        with self.assertRaises(OSError):
+            list(u.iter_events(controller, 1, 4, window=2, retries=1, timeout=0.2))
+
+    def test_iter_cards(self):
+        '''
+        Tests the pipelined iter-cards function with a request per socket.
+        '''
+        controller = (CONTROLLER, DEST_ADDR)
+        u = uhppote.Uhppote('0.0.0.0', '255.255.255.255:60000', '0.0.0.0:60001', False)
+
+        cards = list(u.iter_cards(controller, window=8, timeout=0.5))
+        expected = [card(i) for i in range(1, SLOTS + 1) if card(i) != 0xffffffff]
+
+        self.assertEqual([c.card_number for c in cards], expected)
+
+    def test_iter_cards_with_persistent_socket(self):
+        '''
+        Tests the pipelined iter-cards function over a long-lived UDP socket.
+        '''
+        controller = (CONTROLLER, DEST_ADDR)
+
+        with uhppote.Uhppote('0.0.0.0', '255.255.255.255:60000', '0.0.0.0:60001', False) as u:
+            cards = list(u.iter_cards(controller, window=8, timeout=0.5))
+
+        expected = [card(i) for i in range(1, SLOTS + 1) if card(i) != 0xffffffff]
+
+        self.assertEqual([c.card_number for c in cards], expected)
+
+    def test_iter_cards_with_batched_io(self):
+        '''
+        Tests the pipelined iter-cards function with the batched UDP I/O backend.
+        '''
+        controller = (CONTROLLER, DEST_ADDR)
+        u = uhppote.Uhppote('0.0.0.0', '255.255.255.255:60000', '0.0.0.0:60001', False, batched=True)
+
+        cards = list(u.iter_cards(controller, window=8, timeout=0.5))
+        expected = [card(i) for i in range(1, SLOTS + 1) if card(i) != 0xffffffff]
+
+        self.assertEqual([c.card_number for c in cards], expected)
+
+    def test_put_cards(self):
+        '''
+        Tests the pipelined put-cards function with a request per socket.
+        '''
+        controller = (CONTROLLER, DEST_ADDR)
+        u = uhppote.Uhppote('0.0.0.0', '255.255.255.255:60000', '0.0.0.0:60001', False)
+
+        cards = [Card(n, START_DATE, END_DATE, 1, 0, 0, 1, 7531) for n in range(10000001, 10000051)]
+        report = u.put_cards(controller, cards, window=8, timeout=0.5)
+
+        self.assertEqual(report.controller, CONTROLLER)
+        self.assertEqual(report.stored, [c.card_number for c in cards if c.card_number % REJECTED != 0])
+        self.assertEqual(report.rejected, [c.card_number for c in cards if c.card_number % REJECTED == 0])
+        self.assertEqual(report.failed, {})
+
+    def test_put_cards_with_batched_io(self):
+        '''
+        Tests the pipelined put-cards function with the batched UDP I/O backend.
+        '''
+        controller = (CONTROLLER, DEST_ADDR)
+        u = uhppote.Uhppote('0.0.0.0', '255.255.255.255:60000', '0.0.0.0:60001', False, batched=True)
+
+        cards = [Card(n, START_DATE, END_DATE, 1, 0, 0, 1, 7531) for n in range(10000001, 10000051)]
+        report = u.put_cards(controller, cards, window=8, timeout=0.5)
+
+        self.assertEqual(report.stored, [c.card_number for c in cards if c.card_number % REJECTED != 0])
+        self.assertEqual(report.rejected, [c.card_number for c in cards if c.card_number % REJECTED == 0])
+        self.assertEqual(report.failed, {})
+
+    def test_put_cards_with_persistent_socket(self):
+        '''
+        Tests that the put-card requests are pipelined while a long-lived UDP socket is open (the put-card
+        replies do not identify the request, so the requests cannot be multiplexed over the shared socket).
+        '''
+        controller = (CONTROLLER, DEST_ADDR)
+        cards = [Card(n, START_DATE, END_DATE, 1, 0, 0, 1, 7531) for n in range(10000001, 10000051)]
+
+        with uhppote.Uhppote('0.0.0.0', '255.255.255.255:60000', '0.0.0.0:60001', False) as u:
+            start = time.monotonic()
+            report = u.put_cards(controller, cards, window=8, timeout=0.5)
+            elapsed = time.monotonic() - start
+
+        self.assertEqual(report.stored, [c.card_number for c in cards if c.card_number % REJECTED != 0])
+        self.assertEqual(report.rejected, [c.card_number for c in cards if c.card_number % REJECTED == 0])
+        self.assertEqual(report.failed, {})
+        self.assertLess(elapsed, 2.0)  # 7 dropped requests at 0.5s each if not pipelined
+
+    def test_put_cards_with_batched_io_and_lost_controller(self):
+        '''
+        Tests that the batched UDP I/O backend reports the cards that could not be stored.
+        '''
+        controller = (LOST, DEST_ADDR)
+        u = uhppote.Uhppote('0.0.0.0', '255.255.255.255:60000', '0.0.0.0:60001', False, batched=True)
+
+        cards = [Card(n, START_DATE, END_DATE, 1, 0, 0, 1, 0) for n in range(10000001, 10000004)]
+        report = u.put_cards(controller, cards, window=2, retries=1, timeout=0.2)
+
+        self.assertEqual(report.stored, [])
+        self.assertEqual(sorted(report.failed), [c.card_number for c in cards])
+        self.assertTrue(all(isinstance(x, socket.timeout) for x in report.failed.values()))
+
+    def test_put_cards_with_lost_controller(self):
+        '''
+        Tests that the pipelined put-cards function reports the cards that could not be stored.
+        '''
+        controller = (LOST, DEST_ADDR)
+        u = uhppote.Uhppote('0.0.0.0', '255.255.255.255:60000', '0.0.0.0:60001', False)
+
+        cards = [Card(n, START_DATE, END_DATE, 1, 0, 0, 1, 0) for n in range(10000001, 10000004)]
+        report = u.put_cards(controller, cards, window=2, retries=1, timeout=0.2)
+
+        self.assertEqual(report.stored, [])
+        self.assertEqual(report.rejected, [])
+        self.assertEqual(sorted(report.failed), [c.card_number for c in cards])
+        self.assertTrue(all(isinstance(x, socket.timeout) for x in report.failed.values()))
+
+    def test_card_index(self):
+        '''
+        Tests that the card index is updated by put-cards and reloaded by iter-cards.
+        '''
+        controller = (CONTROLLER, DEST_ADDR)
+        index = CardIndex()
+        u = uhppote.Uhppote('0.0.0.0', '255.255.255.255:60000', '0.0.0.0:60001', False, card_index=index)
+
+        cards = [Card(n, START_DATE, END_DATE, 1, 0, 0, 1, 0) for n in range(10000001, 10000031)]
+        u.put_cards(controller, cards, window=8, timeout=0.5)
+
+        self.assertEqual(sorted(index.by_door(CONTROLLER, 4)), [n for n in range(10000001, 10000031) if n % REJECTED])
+
+        list(u.iter_cards(controller, window=8, timeout=0.5))
+
+        self.assertEqual(sorted(c.card_number for c in index.cards(CONTROLLER)),
+                         [card(i) for i in range(1, SLOTS + 1) if card(i) != 0xffffffff])
+
+    def test_sync_cards(self):
+        '''
+        Tests the sync-cards function with a snapshot of the stored cards.
+        '''
+        controller = (CONTROLLER, DEST_ADDR)
+        u = uhppote.Uhppote('0.0.0.0', '255.255.255.255:60000', '0.0.0.0:60001', False)
+
+        snapshot = [Card(n, START_DATE, END_DATE, 1, 0, 0, 1, 0) for n in range(10000001, 10000031)]
+        cards = [Card(n, START_DATE, END_DATE, 1, 0, 0, 1, 0) for n in range(10000001, 10000021)] + \
+                [Card(n, START_DATE, END_DATE, 1, 1, 1, 1, 0) for n in range(10000021, 10000026)] + \
+                [Card(n, START_DATE, END_DATE, 1, 0, 0, 1, 0) for n in range(10000031, 10000036)]
+
+        report = u.sync_cards(controller, cards, snapshot=snapshot, window=8, timeout=0.5)
+
+        self.assertEqual(report.added, [n for n in range(10000031, 10000036) if n % REJECTED != 0])
+        self.assertEqual(report.updated, [n for n in range(10000021, 10000026) if n % REJECTED != 0])
+        self.assertEqual(report.deleted, list(range(10000026, 10000031)))
+        self.assertEqual(report.unchanged, 20)
+        self.assertEqual(report.failed, {n: 'not stored' for n in range(10000021, 10000036) if n % REJECTED == 0})
+
+    def test_sync_cards_with_download(self):
+        '''
+        Tests the sync-cards function with the stored cards retrieved from the controller.
+        '''
+        controller = (CONTROLLER, DEST_ADDR)
+        u = uhppote.Uhppote('0.0.0.0', '255.255.255.255:60000', '0.0.0.0:60001', False)
+
+        report = u.sync_cards(controller, [], window=8, timeout=0.5)
+
+        self.assertEqual(report.deleted, [card(i) for i in range(1, SLOTS + 1) if card(i) != 0xffffffff])
+        self.assertEqual(report.failed, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,181 @@
+'''
+UHPPOTE function tests.
+
+End-to-end tests for the queued event listener.
+'''
+
+import unittest
+import socket
+import struct
+import threading
+import time
+import datetime
+
+from uhppoted import uhppote
+
+LISTEN = ('127.0.0.1', 60005)
+CONTROLLER = 405419896
+
+# yapf: disable
+EVENT = bytes([
+    0x17, 0x20, 0x00, 0x00, 0x78, 0x37, 0x2a, 0x18, 0x46, 0x00, 0x00, 0x00, 0x02, 0x01, 0x03, 0x01,
+    0x9f, 0x98, 0x7c, 0x00, 0x20, 0x24, 0x02, 0x22, 0x10, 0x23, 0x40, 0x2c, 0x01, 0x00, 0x01, 0x00,
+    0x00, 0x00, 0x01, 0x01, 0x03, 0x10, 0x23, 0x40, 0x7b, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
+    0x27, 0x0a, 0x05, 0x24, 0x02, 0x22, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
+])
+# yapf: enable
+
+
+def event(index):
+    '''
+    Returns an event packet with the event index.
+    '''
+    packet = bytearray(EVENT)
+    struct.pack_into('<L', packet, 8, index)
+
+    return bytes(packet)
+
+
+def until(f, timeout=2.5):
+    '''
+    Waits for f() to return True, failing the test if it does not within the timeout.
+    '''
+    deadline = time.monotonic() + timeout
+    while not f():
+        if time.monotonic() > deadline:
+            raise AssertionError('timed out')
+        time.sleep(0.01)
+
+
+class TestListener(unittest.TestCase):
+
+    def setUp(self):
+        self.u = uhppote.Uhppote('0.0.0.0', '255.255.255.255:60000', f'{LISTEN[0]}:{LISTEN[1]}', False)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, 0)
+
+    def tearDown(self):
+        self.sock.close()
+
+    def send(self, *indexes):
+        for index in indexes:
+            self.sock.sendto(event(index), LISTEN)
+
+    def test_listener(self):
+        '''
+        Tests that received events are decoded and passed to the event handler by the worker threads.
+        '''
+        events = []
+        guard = threading.Lock()
+
+        def onEvent(e):
+            with guard:
+                events.append(e)
+
+        with self.u.listener(onEvent, workers=4, rcvbuf=262144) as listener:
+            self.send(*range(1, 21))
+            until(lambda: listener.stats().handled == 20)
+
+            self.assertGreaterEqual(listener.rcvbuf, 262144)
+
+        self.assertEqual(sorted(e.event_index for e in events), list(range(1, 21)))
+        self.assertTrue(all(e.controller == CONTROLLER for e in events))
+        self.assertTrue(all(e.event_timestamp == datetime.datetime(2024, 2, 22, 10, 23, 40) for e in events))
+
+    def test_listener_drop_newest(self):
+        '''
+        Tests that the drop-newest policy discards the received events when the queue is full.
+        '''
+        (indexes, release) = ([], threading.Event())
+
+        def onEvent(e):
+            release.wait()
+            indexes.append(e.event_index)
+
+        with self.u.listener(onEvent, queue_size=2, policy='drop-newest') as listener:
+            self.send(1)
+            until(lambda: listener.stats().received == 1 and listener.stats().queued == 0)
+
+            self.send(*range(2, 11))
+            until(lambda: listener.stats().received == 10)
+
+            stats = listener.stats()
+            release.set()
+
+        self.assertEqual(stats.dropped, 7)
+        self.assertEqual(stats.queued, 2)
+        self.assertEqual(indexes, [1, 2, 3])
+
+    def test_listener_drop_oldest(self):
+        '''
+        Tests that the drop-oldest policy discards the oldest queued events when the queue is full.
+        '''
+        (indexes, release) = ([], threading.Event())
+
+        def onEvent(e):
+            release.wait()
+            indexes.append(e.event_index)
+
+        with self.u.listener(onEvent, queue_size=2, policy='drop-oldest') as listener:
+            self.send(1)
+            until(lambda: listener.stats().received == 1 and listener.stats().queued == 0)
+
+            self.send(*range(2, 11))
+            until(lambda: listener.stats().received == 10)
+
+            stats = listener.stats()
+            release.set()
+
+        self.assertEqual(stats.dropped, 7)
+        self.assertEqual(indexes, [1, 9, 10])
+
+    def test_listener_block(self):
+        '''
+        Tests that the block policy defers to the socket receive buffer rather than discarding events.
+        '''
+        (indexes, release) = ([], threading.Event())
+
+        def onEvent(e):
+            release.wait()
+            indexes.append(e.event_index)
+
+        with self.u.listener(onEvent, queue_size=2, policy='block') as listener:
+            self.send(*range(1, 11))
+            until(lambda: listener.stats().received == 4)
+            time.sleep(0.1)
+
+            self.assertEqual(listener.stats().received, 4)
+
+            release.set()
+            until(lambda: listener.stats().handled == 10)
+
+        self.assertEqual(listener.stats().dropped, 0)
+        self.assertEqual(indexes, list(range(1, 11)))
+
+    def test_listener_errors(self):
+        '''
+        Tests that exceptions raised by the event handler are counted and passed to the error handler.
+        '''
+        errors = []
+
+        def onEvent(e):
+            if e.event_index % 2 == 0:
+                raise ValueError('qwerty')
+
+        with self.u.listener(onEvent, onError=lambda packet, err: errors.append(err)) as listener:
+            self.send(*range(1, 11))
+            until(lambda: listener.stats().handled == 10)
+
+        self.assertEqual(listener.stats().errors, 5)
+        self.assertEqual(len(errors), 5)
+        self.assertTrue(all(isinstance(err, ValueError) for err in errors))
+
+    def test_listener_invalid_policy(self):
+        '''
+        Tests that an invalid queue policy is rejected.
+        '''
+        with self.assertRaises(ValueError):
+            self.u.listener(lambda e: None, policy='drop-random')
+
+
+if __name__ == '__main__':
+    unittest.main()
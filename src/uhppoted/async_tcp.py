@@ -0,0 +1,106 @@
+'''
+UHPPOTE asyncio TCP communications wrapper.
+
+Implements the functionality to send and receive 64 byte TCP packets to/from a UHPPOTE
+access controller using asyncio streams.
+'''
+
+import asyncio
+
+from . import net
+from .tcp import is_INADDR_ANY
+
+
+class AsyncTCP:
+
+    def __init__(self, bind='0.0.0.0', debug=False):
+        '''
+        Initialises an asyncio TCP communications wrapper with the bind address.
+
+            Parameters:
+               bind      (string)  The IPv4 address:port to which to bind when sending a request.
+               debug     (bool)    Dumps the sent and received packets to the console if enabled.
+
+            Returns:
+               Initialised AsyncTCP object.
+        '''
+        self._bind = (bind, 0)
+        self._debug = debug
+
+    async def send(self, request, dest_addr, timeout=2.5):
+        '''
+        Binds to the bind address from the constructor and connects to the access controller after which it sends
+        the request and waits 'timeout' seconds for the reply (if any).
+
+            Parameters:
+               request   (bytearray)  64 byte request packet.
+               dest_addr (string)     IPv4 address:port of the controller. Defaults to port 60000
+                                      if dest_addr does not include a port.
+               timeout   (float)      Optional operation timeout (in seconds). Defaults to 2.5s.
+
+            Returns:
+               Received response packet (if any) or None (for set-ip request).
+
+            Raises:
+               Error         For any socket related errors.
+               TimeoutError  If the connection could not be established or no reply was received within
+                             the timeout.
+        '''
+        self.dump(request)
+
+        addr = net.resolve(f'{dest_addr}')
+        time_limit = net.timeout_to_seconds(timeout)
+        local_addr = None if is_INADDR_ANY(self._bind) else self._bind
+
+        (reader, writer) = await asyncio.wait_for(asyncio.open_connection(addr[0], addr[1], local_addr=local_addr),
+                                                  time_limit)
+
+        try:
+            writer.write(request)
+            await writer.drain()
+
+            if request[1] == 0x96:
+                return None
+            else:
+                return await asyncio.wait_for(_read(reader, debug=self._debug), time_limit)
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass  # already reset by the controller
+
+    def dump(self, packet):
+        '''
+        Prints a packet to the console as a formatted hexadecimal string if debug was enabled in the
+        constructor.
+
+            Parameters:
+               packet  (bytearray)  64 byte UDP packet.
+
+            Returns:
+               None.
+        '''
+        if self._debug:
+            net.dump(packet)
+
+
+async def _read(reader, debug=False):
+    '''
+    Reads a single 64 byte packet from the stream. Prints the packet to the console if debug is True.
+
+        Parameters:
+            reader  (StreamReader)  Connected asyncio stream reader.
+            debug   (bool)          Enables dumping the received packet to the console.
+
+        Returns:
+            Received 64 byte packet.
+
+        Raises:
+            IncompleteReadError  If the connection was closed before a complete packet was received.
+    '''
+    reply = await reader.readexactly(64)
+    if debug:
+        net.dump(reply)
+
+    return reply
@@ -0,0 +1,213 @@
+'''
+UHPPOTE asyncio UDP communications wrapper.
+
+Implements the functionality to send and receive 64 byte UDP packets to/from a UHPPOTE
+access controller using asyncio datagram endpoints.
+'''
+
+import asyncio
+
+from . import net
+
+
+class AsyncUDP:
+
+    def __init__(self, bind='0.0.0.0', broadcast='255.255.255.255:60000', listen="0.0.0.0:60001", debug=False):
+        '''
+        Initialises an asyncio UDP communications wrapper with the bind address, broadcast address and
+        listen address.
+
+            Parameters:
+               bind      (string)  The IPv4 address:port to which to bind when sending a request.
+               broadcast (string)  The IPv4 address:port to which to send broadcast UDP messages.
+               listen    (string)  The IPv4 address:port on which to listen for events from the
+                                   access controllers.
+               debug     (bool)    Dumps the sent and received packets to the console if enabled.
+
+            Returns:
+               Initialised AsyncUDP object.
+
+            Raises:
+               Exception  If any of the supplied IPv4 values cannot be translated to a valid IPv4
+                          address:port combination.
+        '''
+        self._bind = (bind, 0)
+        self._broadcast = net.resolve(broadcast)
+        self._listen = net.resolve(listen)
+        self._debug = debug
+
+    async def broadcast(self, request, timeout=2.5):
+        '''
+        Binds to the bind address from the constructor and then broadcasts a UDP request to the broadcast
+        address from the constructor and then accumulates the replies from any responding access controllers
+        until no reply has been received for 'timeout' seconds.
+
+            Parameters:
+               request  (bytearray)  64 byte request packet.
+                timeout (float)      Optional operation timeout (in seconds). Defaults to 2.5s.
+
+            Returns:
+               List of received response packets (may be empty).
+
+            Raises:
+               Error  For any socket related errors.
+        '''
+        self.dump(request)
+
+        time_limit = net.timeout_to_seconds(timeout)
+        (transport, protocol) = await self._open()
+
+        try:
+            transport.sendto(request, self._broadcast)
+
+            while True:
+                try:
+                    await asyncio.wait_for(protocol.received.wait(), time_limit)
+                    protocol.received.clear()
+                except asyncio.TimeoutError:
+                    break
+
+            return protocol.replies
+        finally:
+            transport.close()
+
+    async def send(self, request, dest_addr=None, timeout=2.5):
+        '''
+        Binds to the bind address from the constructor and then sends a UDP request to the destination
+        address (or the broadcast address), and then waits 'timeout' seconds for a reply from the
+        destination access controller. Replies that do not match the request function code and controller
+        serial number are discarded.
+
+            Parameters:
+               request   (bytearray)  64 byte request packet.
+               dest_addr (string)     Optional IPv4 address:port of the controller. Defaults to port 60000
+                                      if dest_addr does not include a port.
+               timeout   (float)      Optional operation timeout (in seconds). Defaults to 2.5s.
+
+            Returns:
+               Received response packet (if any) or None (for set-ip request).
+
+            Raises:
+               Error         For any socket related errors.
+               TimeoutError  If no reply was received within the timeout.
+        '''
+        self.dump(request)
+
+        time_limit = net.timeout_to_seconds(timeout)
+        (transport, protocol) = await self._open(request)
+
+        try:
+            if dest_addr == None:
+                transport.sendto(request, self._broadcast)
+            else:
+                addr = net.resolve(f'{dest_addr}')
+                transport.sendto(request, addr)
+
+            if request[1] == 0x96:
+                return None
+
+            return await asyncio.wait_for(protocol.reply, time_limit)
+        finally:
+            transport.close()
+
+    async def listen(self, onEvent):
+        '''
+        Binds to the listen address from the constructor and invokes the events handler for
+        any received 64 byte UDP packets. Invalid'ish packets are silently discarded. Runs
+        until cancelled.
+
+            Parameters:
+               onEvent  (function)  Handler function for received events, with a function signature
+                                    f(packet).
+
+            Returns:
+               None.
+
+            Raises:
+               Error  For any socket related errors.
+        '''
+        loop = asyncio.get_running_loop()
+        (transport, protocol) = await loop.create_datagram_endpoint(lambda: _Listener(onEvent, self._debug),
+                                                                    local_addr=self._listen)
+
+        try:
+            await loop.create_future()
+        finally:
+            transport.close()
+
+    def dump(self, packet):
+        '''
+        Prints a packet to the console as a formatted hexadecimal string if debug was enabled in the
+        constructor.
+
+            Parameters:
+               packet  (bytearray)  64 byte UDP packet.
+
+            Returns:
+               None.
+        '''
+        if self._debug:
+            net.dump(packet)
+
+    async def _open(self, request=None):
+        '''
+        Creates a datagram endpoint bound to the bind address from the constructor, with broadcast
+        enabled. If the request is supplied, only a matching reply completes the protocol 'reply' future.
+
+            Returns:
+               (transport, protocol) tuple.
+        '''
+        loop = asyncio.get_running_loop()
+
+        return await loop.create_datagram_endpoint(lambda: _Protocol(loop, self._debug, request),
+                                                   local_addr=self._bind,
+                                                   allow_broadcast=True)
+
+
+class _Protocol(asyncio.DatagramProtocol):
+    '''
+    Datagram protocol that accumulates the received 64 byte replies and completes the 'reply' future
+    with the first received reply that matches the request (if any).
+    '''
+
+    def __init__(self, loop, debug, request=None):
+        self.reply = loop.create_future()
+        self.replies = []
+        self.received = asyncio.Event()
+        self._debug = debug
+        self._request = request
+
+    def datagram_received(self, data, addr):
+        if len(data) == 64:
+            if self._debug:
+                net.dump(data)
+
+            self.replies.append(data)
+            self.received.set()
+
+            if not self.reply.done() and (self._request == None or net.matches(self._request, data)):
+                self.reply.set_result(data)
+
+    def error_received(self, err):
+        if not self.reply.done():
+            self.reply.set_exception(err)
+
+    def connection_lost(self, err):
+        if not self.reply.done():
+            self.reply.cancel()
+
+
+class _Listener(asyncio.DatagramProtocol):
+    '''
+    Datagram protocol that invokes the event handler for received 64 byte packets.
+    '''
+
+    def __init__(self, onEvent, debug):
+        self._onEvent = onEvent
+        self._debug = debug
+
+    def datagram_received(self, data, addr):
+        if len(data) == 64:
+            if self._debug:
+                net.dump(data)
+            self._onEvent(data)
@@ -0,0 +1,265 @@
+'''
+UHPPOTE response cache.
+
+Implements an opt-in read-through cache for the responses to the (rarely changing) controller configuration
+getters, with a TTL per API function, LRU eviction and invalidation by the equivalent setters. Concurrent
+identical requests for an uncached response are coalesced into a single request to the controller.
+
+Also implements the single-flight coalescing of concurrent identical read-only requests used by Uhppote._send.
+'''
+
+import socket
+import threading
+import time
+
+from collections import OrderedDict
+
+from .structs import CacheStats
+
+# yapf: disable
+TTL = {
+    'get_controller':   60.0,
+    'get_listener':     60.0,
+    'get_door_control': 60.0,
+    'get_time_profile': 300.0,
+}
+
+INVALIDATES = {
+    'set_ip':                     ('get_controller',),
+    'set_listener':               ('get_listener',),
+    'set_door_control':           ('get_door_control',),
+    'set_time_profile':           ('get_time_profile',),
+    'delete_all_time_profiles':   ('get_time_profile',),
+    'restore_default_parameters': None,  # everything
+}
+
+READ_ONLY = frozenset([
+    0x20,  # get-status
+    0x32,  # get-time
+    0x58,  # get-cards
+    0x5a,  # get-card
+    0x5c,  # get-card-by-index
+    0x82,  # get-door-control
+    0x92,  # get-listener
+    0x94,  # get-controller
+    0x98,  # get-time-profile
+    0xb0,  # get-event
+    0xb4,  # get-event-index
+])
+# yapf: enable
+
+
+class ResponseCache:
+
+    def __init__(self, ttl=None, max_entries=1024):
+        '''
+        Initialises a response cache.
+
+            Parameters:
+               ttl         (dict)  Optional API function name -> TTL (in seconds). Only the responses for the
+                                   functions with a TTL are cached. Defaults to cache.TTL (get_controller,
+                                   get_listener, get_door_control and get_time_profile).
+               max_entries (int)   Maximum number of cached responses, after which the least recently used
+                                   response is evicted. Defaults to 1024.
+
+            Returns:
+               Initialised ResponseCache object.
+        '''
+        self._ttl = dict(TTL if ttl == None else ttl)
+        self._max_entries = max(1, max_entries)
+        self._entries = OrderedDict()
+        self._flights = SingleFlight()
+        self._generation = 0
+        self._guard = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, method, controller, args, f, timeout=None):
+        '''
+        Returns the cached response for an API function call, invoking f() to retrieve (and cache) the response
+        if it is not cached or has expired. A call for which the same response is already being retrieved waits
+        for, and returns, that response rather than invoking f().
+
+            Parameters:
+               method     (string)    API function name, e.g. 'get_listener'.
+               controller (uint32)    Controller serial number.
+               args       (tuple)     Additional API function arguments that identify the response (e.g. door).
+               f          (function)  Function that retrieves the response.
+               timeout    (float)     Optional maximum time (in seconds) to wait for the response to a coalesced
+                                      call. Defaults to None (no limit).
+
+            Returns:
+               Cached or retrieved response.
+
+            Raises:
+               socket.timeout  If a coalesced call did not complete within the timeout.
+               Exception       Any exception raised by f().
+        '''
+        ttl = self._ttl.get(method)
+        if not ttl:
+            return f()
+
+        key = (method, controller) + tuple(args)
+
+        def load():
+            with self._guard:
+                entry = self._entries.get(key)
+                if entry != None and entry[0] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return entry[1]
+
+                generation = self._generation
+                self._misses += 1
+
+            response = f()
+
+            with self._guard:
+                # NTS: don't cache a response retrieved before (or during) an invalidation. A single (global)
+                #      generation is conservative but doesn't accumulate per-controller state.
+                if response != None and self._generation == generation:
+                    self._entries[key] = (time.monotonic() + ttl, response)
+                    self._entries.move_to_end(key)
+
+                    while len(self._entries) > self._max_entries:
+                        self._entries.popitem(last=False)
+                        self._evictions += 1
+
+            return response
+
+        with self._guard:
+            entry = self._entries.get(key)
+            if entry != None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry[1]
+
+        return self._flights.do(key, load, timeout)
+
+    def invalidate(self, method, controller):
+        '''
+        Discards the cached responses invalidated by a (mutating) API function call.
+
+            Parameters:
+               method     (string)  API function name, e.g. 'set_listener'.
+               controller (uint32)  Controller serial number.
+
+            Returns:
+               None.
+        '''
+        if method not in INVALIDATES:
+            return
+
+        methods = INVALIDATES[method]
+
+        with self._guard:
+            self._generation += 1
+
+            for key in [k for k in self._entries if k[1] == controller and (methods == None or k[0] in methods)]:
+                del self._entries[key]
+
+    def clear(self):
+        '''
+        Discards all cached responses.
+        '''
+        with self._guard:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self):
+        '''
+        Returns the hit, miss, coalesced request and eviction counters and the number of cached responses.
+
+            Returns:
+               CacheStats.
+        '''
+        with self._guard:
+            return CacheStats(self._hits, self._misses, self._flights.coalesced, self._evictions, len(self._entries))
+
+
+class SingleFlight:
+    '''
+    Coalesces concurrent identical calls, so that only the first call for a key invokes the function and the
+    calls made while it is in progress wait for, and share, its result.
+    '''
+
+    def __init__(self):
+        self._flights = {}
+        self._guard = threading.Lock()
+        self.coalesced = 0
+
+    def do(self, key, f, timeout=None):
+        '''
+        Invokes f() unless a call with the same key is already in progress, in which case it waits (for at most
+        'timeout' seconds) for and returns the result of that call.
+
+            Parameters:
+               key     (hashable)  Identifies identical calls.
+               f       (function)  Function to invoke.
+               timeout (float)     Optional maximum time (in seconds) to wait for a call in progress. Defaults to
+                                   None (no limit).
+
+            Returns:
+               Result of f().
+
+            Raises:
+               socket.timeout  If the call in progress did not complete within the timeout.
+               Exception       Any exception raised by f().
+        '''
+        leader = False
+
+        with self._guard:
+            flight = self._flights.get(key)
+            if flight != None:
+                self.coalesced += 1
+            else:
+                flight = self._flights[key] = _Flight()
+                leader = True
+
+        if not leader:
+            return flight.wait(timeout)
+
+        try:
+            result = f()
+        except BaseException as err:
+            with self._guard:
+                del self._flights[key]
+
+            flight.fail(err)
+            raise
+
+        with self._guard:
+            del self._flights[key]
+
+        flight.done(result)
+
+        return result
+
+
+class _Flight:
+    '''
+    A response being retrieved, on which identical concurrent requests wait.
+    '''
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._response = None
+        self._error = None
+
+    def done(self, response):
+        self._response = response
+        self._event.set()
+
+    def fail(self, err):
+        self._error = err
+        self._event.set()
+
+    def wait(self, timeout):
+        if not self._event.wait(timeout):
+            raise socket.timeout('timed out')
+
+        if self._error != None:
+            raise self._error
+
+        return self._response
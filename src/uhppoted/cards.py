@@ -0,0 +1,287 @@
+'''
+Local card index.
+
+Implements an in-memory cache of the cards stored on one or more access controllers, so that queries like
+"which cards can open door 3 on controller X" can be answered without retrieving the card list from the
+controller. The cards for each controller are stored in compact column arrays, with a hash index on the card
+number and a bitset per door.
+'''
+
+import datetime
+import threading
+
+from array import array
+
+from .structs import Card
+
+# yapf: disable
+BITS = tuple(tuple(i for i in range(8) if b & (1 << i)) for b in range(256))  # bit positions set in each byte value
+# yapf: enable
+
+
+class CardIndex:
+
+    def __init__(self):
+        '''
+        Initialises an empty card index.
+
+            Returns:
+               Initialised CardIndex object.
+        '''
+        self._controllers = {}
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(cards) for cards in self._controllers.values())
+
+    def controllers(self):
+        '''
+        Returns the list of controllers with cards in the index.
+        '''
+        with self._lock:
+            return [controller for (controller, cards) in self._controllers.items() if len(cards) > 0]
+
+    def load(self, controller, cards):
+        '''
+        Replaces the cards for a controller, e.g. with the cards retrieved by 'iter_cards'.
+
+            Parameters:
+               controller (uint32)    Controller serial number.
+               cards      (iterable)  Card records (GetCardByIndexResponse, GetCardResponse, Card or any object
+                                      with the same fields).
+
+            Returns:
+               None.
+        '''
+        index = _Cards()
+        for card in cards:
+            index.put(card)
+
+        with self._lock:
+            self._controllers[controller] = index
+
+    def put(self, controller, card):
+        '''
+        Adds (or updates) a card for a controller.
+
+            Parameters:
+               controller (uint32)  Controller serial number.
+               card       (Card)    Card record (GetCardByIndexResponse, GetCardResponse, Card or any object with
+                                    the same fields).
+
+            Returns:
+               None.
+        '''
+        with self._lock:
+            self._controllers.setdefault(controller, _Cards()).put(card)
+
+    def delete(self, controller, card_number):
+        '''
+        Removes a card from the index for a controller.
+
+            Parameters:
+               controller  (uint32)  Controller serial number.
+               card_number (uint32)  Card number.
+
+            Returns:
+               True if the card was in the index.
+        '''
+        with self._lock:
+            cards = self._controllers.get(controller)
+
+            return cards != None and cards.delete(card_number)
+
+    def clear(self, controller):
+        '''
+        Removes all the cards for a controller from the index.
+        '''
+        with self._lock:
+            self._controllers.pop(controller, None)
+
+    def get(self, controller, card_number):
+        '''
+        Returns the card record for a card number.
+
+            Parameters:
+               controller  (uint32)  Controller serial number.
+               card_number (uint32)  Card number.
+
+            Returns:
+               Card (or None if the card is not in the index).
+        '''
+        with self._lock:
+            cards = self._controllers.get(controller)
+
+            return cards.get(card_number) if cards != None else None
+
+    def cards(self, controller):
+        '''
+        Returns the card records for a controller.
+
+            Parameters:
+               controller  (uint32)  Controller serial number.
+
+            Returns:
+               List of Card.
+        '''
+        with self._lock:
+            cards = self._controllers.get(controller)
+
+            return cards.all() if cards != None else []
+
+    def by_door(self, controller, door, date=None):
+        '''
+        Returns the cards with access to a door, i.e. with a door permission of 'all' or a time profile.
+
+            Parameters:
+               controller (uint32)  Controller serial number.
+               door       (uint8)   Door number [1..4].
+               date       (date)    Optional date on which the card must be valid. Defaults to None (any
+                                    date).
+
+            Returns:
+               List of card numbers, in no particular order.
+
+            Raises:
+               ValueError  If the door is not in the range [1..4].
+        '''
+        if door not in (1, 2, 3, 4):
+            raise ValueError(f'invalid door ({door})')
+
+        with self._lock:
+            cards = self._controllers.get(controller)
+
+            return cards.by_door(door - 1, date) if cards != None else []
+
+    def expiring(self, controller, days, today=None):
+        '''
+        Returns the cards with an end date within 'days' days.
+
+            Parameters:
+               controller (uint32)  Controller serial number.
+               days       (int)     Number of days.
+               today      (date)    Optional start date. Defaults to the current date.
+
+            Returns:
+               List of card numbers of the cards with an end date in the range [today, today + days].
+        '''
+        today = today if today != None else datetime.date.today()
+
+        with self._lock:
+            cards = self._controllers.get(controller)
+
+            return cards.expiring(today.toordinal(), today.toordinal() + days) if cards != None else []
+
+
+class _Cards:
+    '''
+    Column store for the cards of a single controller. A card is stored in the same slot of each column and
+    a deleted card is replaced by the card in the last slot, so the columns are always dense. Dates are stored
+    as proleptic Gregorian ordinals (0 for a missing date).
+    '''
+
+    def __init__(self):
+        self.slots = {}
+        self.card_number = array('L')
+        self.start_date = array('l')
+        self.end_date = array('l')
+        self.doors = [array('B') for _ in range(4)]
+        self.pin = array('L')
+        self.bitsets = [bytearray() for _ in range(4)]
+
+    def __len__(self):
+        return len(self.card_number)
+
+    def put(self, card):
+        doors = (card.door_1, card.door_2, card.door_3, card.door_4)
+        slot = self.slots.get(card.card_number)
+
+        if slot == None:
+            slot = len(self.card_number)
+            self.slots[card.card_number] = slot
+            self.card_number.append(card.card_number)
+            self.start_date.append(0)
+            self.end_date.append(0)
+            self.pin.append(0)
+            for column in self.doors:
+                column.append(0)
+
+            if slot % 8 == 0:
+                for bitset in self.bitsets:
+                    bitset.append(0)
+
+        self.start_date[slot] = _ordinal(card.start_date)
+        self.end_date[slot] = _ordinal(card.end_date)
+        self.pin[slot] = card.pin if card.pin != None else 0
+
+        for (column, bitset, permission) in zip(self.doors, self.bitsets, doors):
+            column[slot] = permission
+            if permission != 0:
+                bitset[slot >> 3] |= 1 << (slot & 7)
+            else:
+                bitset[slot >> 3] &= ~(1 << (slot & 7)) & 0xff
+
+    def delete(self, card_number):
+        slot = self.slots.pop(card_number, None)
+        if slot == None:
+            return False
+
+        last = len(self.card_number) - 1
+        if slot != last:
+            self.slots[self.card_number[last]] = slot
+            self.card_number[slot] = self.card_number[last]
+            self.start_date[slot] = self.start_date[last]
+            self.end_date[slot] = self.end_date[last]
+            self.pin[slot] = self.pin[last]
+
+            for (column, bitset) in zip(self.doors, self.bitsets):
+                column[slot] = column[last]
+                if column[slot] != 0:
+                    bitset[slot >> 3] |= 1 << (slot & 7)
+                else:
+                    bitset[slot >> 3] &= ~(1 << (slot & 7)) & 0xff
+
+        for column in [self.card_number, self.start_date, self.end_date, self.pin] + self.doors:
+            column.pop()
+
+        for bitset in self.bitsets:
+            bitset[last >> 3] &= ~(1 << (last & 7)) & 0xff
+            if last % 8 == 0:
+                bitset.pop()
+
+        return True
+
+    def get(self, card_number):
+        slot = self.slots.get(card_number)
+        if slot == None:
+            return None
+
+        return self._card(slot)
+
+    def all(self):
+        return [self._card(slot) for slot in range(len(self.card_number))]
+
+    def by_door(self, door, date):
+        slots = [(i << 3) + bit for (i, b) in enumerate(self.bitsets[door]) if b != 0 for bit in BITS[b]]
+
+        if date != None:
+            ordinal = date.toordinal()
+            slots = [slot for slot in slots if self.start_date[slot] <= ordinal <= self.end_date[slot]]
+
+        return [self.card_number[slot] for slot in slots]
+
+    def expiring(self, start, end):
+        return [self.card_number[slot] for (slot, v) in enumerate(self.end_date) if start <= v <= end]
+
+    def _card(self, slot):
+        return Card(self.card_number[slot], _date(self.start_date[slot]), _date(self.end_date[slot]),
+                    self.doors[0][slot], self.doors[1][slot], self.doors[2][slot], self.doors[3][slot], self.pin[slot])
+
+
+def _ordinal(date):
+    return date.toordinal() if date != None else 0
+
+
+def _date(ordinal):
+    return datetime.date.fromordinal(ordinal) if ordinal > 0 else None
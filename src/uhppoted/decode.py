@@ -44,6 +44,27 @@ from .structs import RestoreDefaultParametersResponse
 from .structs import Event
 from .structs import PIN
 
+# BCD byte -> 0..99 lookup table (None for bytes with an invalid BCD nibble)
+BCD = tuple((b >> 4) * 10 + (b & 0x0f) if (b >> 4) < 10 and (b & 0x0f) < 10 else None for b in range(256))
+
+# Precompiled layouts of the fixed (non-BCD) fields of each response. The BCD encoded date/time fields
+# are skipped as padding and decoded separately.
+# yapf: disable
+CONTROLLER          = struct.Struct('<4xL')          # controller
+CONTROLLER_BOOL     = struct.Struct('<4xL?')         # controller, ok
+CONTROLLER_UINT32   = struct.Struct('<4xLL')         # controller, value
+GET_CONTROLLER      = struct.Struct('<4xL4s4s4s')    # controller, address, netmask, gateway
+GET_LISTENER        = struct.Struct('<4xL4sHB')      # controller, address, port, interval
+DOOR_CONTROL        = struct.Struct('<4xLBBB')       # controller, door, mode, delay
+CARD                = struct.Struct('<4xLL8xBBBBHB') # controller, card, door 1-4, PIN (lo,hi)
+GET_EVENT           = struct.Struct('<4xLLB?BBL7xB') # controller, index, type, granted, door, direction, card, reason
+TIME_PROFILE        = struct.Struct('<4xLB8x7?12xB') # controller, profile, weekdays, linked profile
+
+# controller, index, type, granted, door, direction, card, reason, doors open 1-4, buttons 1-4, system error,
+# sequence no., special info, relays, inputs
+STATUS              = struct.Struct('<4xLLB?BBL7xB8?B3xL4xBBB')
+# yapf: enable
+
 
 def get_controller_response(packet):
     '''
@@ -59,21 +80,15 @@ def get_controller_response(packet):
             ValueError If the packet is not 64 bytes, has an invalid start-of-message byte or has
                        the incorrect message type.
     '''
-    if len(packet) != 64:
-        raise ValueError(f'invalid reply packet length ({len(packet)})')
+    validate(packet, 0x94)
 
-    # Ref. v6.62 firmware event
-    if packet[0] != 0x17 and (packet[0] != 0x19 or packet[1] != 0x20):
-        raise ValueError(f'invalid reply start of message byte ({packet[0]:02x})')
-
-    if packet[1] != 0x94:
-        raise ValueError(f'invalid reply function code ({packet[1]:02x})')
+    (controller, address, netmask, gateway) = GET_CONTROLLER.unpack_from(packet)
 
     return GetControllerResponse(
-        unpack_uint32(packet, 4),
-        unpack_ipv4(packet, 8),
-        unpack_ipv4(packet, 12),
-        unpack_ipv4(packet, 16),
+        controller,
+        IPv4Address(bytes(address)),
+        IPv4Address(bytes(netmask)),
+        IPv4Address(bytes(gateway)),
         unpack_mac(packet, 20),
         unpack_version(packet, 26),
         unpack_date(packet, 28),
@@ -94,18 +109,10 @@ def get_time_response(packet):
             ValueError If the packet is not 64 bytes, has an invalid start-of-message byte or has
                        the incorrect message type.
     '''
-    if len(packet) != 64:
-        raise ValueError(f'invalid reply packet length ({len(packet)})')
-
-    # Ref. v6.62 firmware event
-    if packet[0] != 0x17 and (packet[0] != 0x19 or packet[1] != 0x20):
-        raise ValueError(f'invalid reply start of message byte ({packet[0]:02x})')
-
-    if packet[1] != 0x32:
-        raise ValueError(f'invalid reply function code ({packet[1]:02x})')
+    validate(packet, 0x32)
 
     return GetTimeResponse(
-        unpack_uint32(packet, 4),
+        CONTROLLER.unpack_from(packet)[0],
         unpack_datetime(packet, 8),
     )
 
@@ -124,18 +131,10 @@ def set_time_response(packet):
             ValueError If the packet is not 64 bytes, has an invalid start-of-message byte or has
                        the incorrect message type.
     '''
-    if len(packet) != 64:
-        raise ValueError(f'invalid reply packet length ({len(packet)})')
-
-    # Ref. v6.62 firmware event
-    if packet[0] != 0x17 and (packet[0] != 0x19 or packet[1] != 0x20):
-        raise ValueError(f'invalid reply start of message byte ({packet[0]:02x})')
-
-    if packet[1] != 0x30:
-        raise ValueError(f'invalid reply function code ({packet[1]:02x})')
+    validate(packet, 0x30)
 
     return SetTimeResponse(
-        unpack_uint32(packet, 4),
+        CONTROLLER.unpack_from(packet)[0],
         unpack_datetime(packet, 8),
     )
 
@@ -154,37 +153,31 @@ def get_status_response(packet):
             ValueError If the packet is not 64 bytes, has an invalid start-of-message byte or has
                        the incorrect message type.
     '''
-    if len(packet) != 64:
-        raise ValueError(f'invalid reply packet length ({len(packet)})')
-
-    # Ref. v6.62 firmware event
-    if packet[0] != 0x17 and (packet[0] != 0x19 or packet[1] != 0x20):
-        raise ValueError(f'invalid reply start of message byte ({packet[0]:02x})')
-
-    if packet[1] != 0x20:
-        raise ValueError(f'invalid reply function code ({packet[1]:02x})')
+    validate(packet, 0x20)
 
-    event_index = unpack_uint32(packet, 8)
+    (controller, event_index, event_type, granted, door, direction, card, reason, door_1_open, door_2_open, door_3_open,
+     door_4_open, door_1_button, door_2_button, door_3_button, door_4_button, system_error, sequence_no, special_info,
+     relays, inputs) = STATUS.unpack_from(packet)
 
     # no event in response ?
     if event_index == 0:
         return GetStatusResponse(
-            unpack_uint32(packet, 4),
+            controller,
             unpack_shortdate(packet, 51),
             unpack_time(packet, 37),
-            unpack_bool(packet, 28),
-            unpack_bool(packet, 29),
-            unpack_bool(packet, 30),
-            unpack_bool(packet, 31),
-            unpack_bool(packet, 32),
-            unpack_bool(packet, 33),
-            unpack_bool(packet, 34),
-            unpack_bool(packet, 35),
-            unpack_uint8(packet, 49),
-            unpack_uint8(packet, 50),
-            unpack_uint8(packet, 36),
-            unpack_uint8(packet, 48),
-            unpack_uint32(packet, 8),
+            door_1_open,
+            door_2_open,
+            door_3_open,
+            door_4_open,
+            door_1_button,
+            door_2_button,
+            door_3_button,
+            door_4_button,
+            relays,
+            inputs,
+            system_error,
+            special_info,
+            event_index,
             None,
             None,
             None,
@@ -192,34 +185,34 @@ def get_status_response(packet):
             None,
             None,
             None,
-            unpack_uint32(packet, 40),
+            sequence_no,
         )
     else:
         return GetStatusResponse(
-            unpack_uint32(packet, 4),
+            controller,
             unpack_shortdate(packet, 51),
             unpack_time(packet, 37),
-            unpack_bool(packet, 28),
-            unpack_bool(packet, 29),
-            unpack_bool(packet, 30),
-            unpack_bool(packet, 31),
-            unpack_bool(packet, 32),
-            unpack_bool(packet, 33),
-            unpack_bool(packet, 34),
-            unpack_bool(packet, 35),
-            unpack_uint8(packet, 49),
-            unpack_uint8(packet, 50),
-            unpack_uint8(packet, 36),
-            unpack_uint8(packet, 48),
-            unpack_uint32(packet, 8),
-            unpack_uint8(packet, 12),
-            unpack_bool(packet, 13),
-            unpack_uint8(packet, 14),
-            unpack_uint8(packet, 15),
-            unpack_uint32(packet, 16),
+            door_1_open,
+            door_2_open,
+            door_3_open,
+            door_4_open,
+            door_1_button,
+            door_2_button,
+            door_3_button,
+            door_4_button,
+            relays,
+            inputs,
+            system_error,
+            special_info,
+            event_index,
+            event_type,
+            granted,
+            door,
+            direction,
+            card,
             unpack_optional_datetime(packet, 20),
-            unpack_uint8(packet, 27),
-            unpack_uint32(packet, 40),
+            reason,
+            sequence_no,
         )
 
 
@@ -237,21 +230,15 @@ def get_listener_response(packet):
             ValueError If the packet is not 64 bytes, has an invalid start-of-message byte or has
                        the incorrect message type.
     '''
-    if len(packet) != 64:
-        raise ValueError(f'invalid reply packet length ({len(packet)})')
+    validate(packet, 0x92)
 
-    # Ref. v6.62 firmware event
-    if packet[0] != 0x17 and (packet[0] != 0x19 or packet[1] != 0x20):
-        raise ValueError(f'invalid reply start of message byte ({packet[0]:02x})')
-
-    if packet[1] != 0x92:
-        raise ValueError(f'invalid reply function code ({packet[1]:02x})')
+    (controller, address, port, interval) = GET_LISTENER.unpack_from(packet)
 
     return GetListenerResponse(
-        unpack_uint32(packet, 4),
-        unpack_ipv4(packet, 8),
-        unpack_uint16(packet, 12),
-        unpack_uint8(packet, 14),
+        controller,
+        IPv4Address(bytes(address)),
+        port,
+        interval,
     )
 
 
@@ -269,20 +256,9 @@ def set_listener_response(packet):
             ValueError If the packet is not 64 bytes, has an invalid start-of-message byte or has
                        the incorrect message type.
     '''
-    if len(packet) != 64:
-        raise ValueError(f'invalid reply packet length ({len(packet)})')
-
-    # Ref. v6.62 firmware event
-    if packet[0] != 0x17 and (packet[0] != 0x19 or packet[1] != 0x20):
-        raise ValueError(f'invalid reply start of message byte ({packet[0]:02x})')
-
-    if packet[1] != 0x90:
-        raise ValueError(f'invalid reply function code ({packet[1]:02x})')
+    validate(packet, 0x90)
 
-    return SetListenerResponse(
-        unpack_uint32(packet, 4),
-        unpack_bool(packet, 8),
-    )
+    return SetListenerResponse(*CONTROLLER_BOOL.unpack_from(packet))
 
 
 def get_door_control_response(packet):
@@ -299,22 +275,9 @@ def get_door_control_response(packet):
             ValueError If the packet is not 64 bytes, has an invalid start-of-message byte or has
                        the incorrect message type.
     '''
-    if len(packet) != 64:
-        raise ValueError(f'invalid reply packet length ({len(packet)})')
+    validate(packet, 0x82)
 
-    # Ref. v6.62 firmware event
-    if packet[0] != 0x17 and (packet[0] != 0x19 or packet[1] != 0x20):
-        raise ValueError(f'invalid reply start of message byte ({packet[0]:02x})')
-
-    if packet[1] != 0x82:
-        raise ValueError(f'invalid reply function code ({packet[1]:02x})')
-
-    return GetDoorControlResponse(
-        unpack_uint32(packet, 4),
-        unpack_uint8(packet, 8),
-        unpack_uint8(packet, 9),
-        unpack_uint8(packet, 10),
-    )
+    return GetDoorControlResponse(*DOOR_CONTROL.unpack_from(packet))
 
 
 def set_door_control_response(packet):
@@ -331,22 +294,9 @@ def set_door_control_response(packet):
             ValueError If the packet is not 64 bytes, has an invalid start-of-message byte or has
                        the incorrect message type.
     '''
-    if len(packet) != 64:
-        raise ValueError(f'invalid reply packet length ({len(packet)})')
+    validate(packet, 0x80)
 
-    # Ref. v6.62 firmware event
-    if packet[0] != 0x17 and (packet[0] != 0x19 or packet[1] != 0x20):
-        raise ValueError(f'invalid reply start of message byte ({packet[0]:02x})')
-
-    if packet[1] != 0x80:
-        raise ValueError(f'invalid reply function code ({packet[1]:02x})')
-
-    return SetDoorControlResponse(
-        unpack_uint32(packet, 4),
-        unpack_uint8(packet, 8),
-        unpack_uint8(packet, 9),
-        unpack_uint8(packet, 10),
-    )
+    return SetDoorControlResponse(*DOOR_CONTROL.unpack_from(packet))
 
 
 def open_door_response(packet):
@@ -363,20 +313,9 @@ def open_door_response(packet):
             ValueError If the packet is not 64 bytes, has an invalid start-of-message byte or has
                        the incorrect message type.
     '''
-    if len(packet) != 64:
-        raise ValueError(f'invalid reply packet length ({len(packet)})')
-
-    # Ref. v6.62 firmware event
-    if packet[0] != 0x17 and (packet[0] != 0x19 or packet[1] != 0x20):
-        raise ValueError(f'invalid reply start of message byte ({packet[0]:02x})')
+    validate(packet, 0x40)
 
-    if packet[1] != 0x40:
-        raise ValueError(f'invalid reply function code ({packet[1]:02x})')
-
-    return OpenDoorResponse(
-        unpack_uint32(packet, 4),
-        unpack_bool(packet, 8),
-    )
+    return OpenDoorResponse(*CONTROLLER_BOOL.unpack_from(packet))
 
 
 def get_cards_response(packet):
@@ -393,20 +332,9 @@ def get_cards_response(packet):
             ValueError If the packet is not 64 bytes, has an invalid start-of-message byte or has
                        the incorrect message type.
     '''
-    if len(packet) != 64:
-        raise ValueError(f'invalid reply packet length ({len(packet)})')
+    validate(packet, 0x58)
 
-    # Ref. v6.62 firmware event
-    if packet[0] != 0x17 and (packet[0] != 0x19 or packet[1] != 0x20):
-        raise ValueError(f'invalid reply start of message byte ({packet[0]:02x})')
-
-    if packet[1] != 0x58:
-        raise ValueError(f'invalid reply function code ({packet[1]:02x})')
-
-    return GetCardsResponse(
-        unpack_uint32(packet, 4),
-        unpack_uint32(packet, 8),
-    )
+    return GetCardsResponse(*CONTROLLER_UINT32.unpack_from(packet))
 
 
 def get_card_response(packet):
@@ -423,26 +351,20 @@ def get_card_response(packet):
             ValueError If the packet is not 64 bytes, has an invalid start-of-message byte or has
                        the incorrect message type.
     '''
-    if len(packet) != 64:
-        raise ValueError(f'invalid reply packet length ({len(packet)})')
+    validate(packet, 0x5a)
 
-    # Ref. v6.62 firmware event
-    if packet[0] != 0x17 and (packet[0] != 0x19 or packet[1] != 0x20):
-        raise ValueError(f'invalid reply start of message byte ({packet[0]:02x})')
-
-    if packet[1] != 0x5a:
-        raise ValueError(f'invalid reply function code ({packet[1]:02x})')
+    (controller, card, door_1, door_2, door_3, door_4, pin, pin_hi) = CARD.unpack_from(packet)
 
     return GetCardResponse(
-        unpack_uint32(packet, 4),
-        unpack_uint32(packet, 8),
+        controller,
+        card,
         unpack_optional_date(packet, 12),
         unpack_optional_date(packet, 16),
-        unpack_uint8(packet, 20),
-        unpack_uint8(packet, 21),
-        unpack_uint8(packet, 22),
-        unpack_uint8(packet, 23),
-        unpack_pin(packet, 24),
+        door_1,
+        door_2,
+        door_3,
+        door_4,
+        pin | (pin_hi << 16),
     )
 
 
@@ -460,26 +382,20 @@ def get_card_by_index_response(packet):
             ValueError If the packet is not 64 bytes, has an invalid start-of-message byte or has
                        the incorrect message type.
     '''
-    if len(packet) != 64:
-        raise ValueError(f'invalid reply packet length ({len(packet)})')
-
-    # Ref. v6.62 firmware event
-    if packet[0] != 0x17 and (packet[0] != 0x19 or packet[1] != 0x20):
-        raise ValueError(f'invalid reply start of message byte ({packet[0]:02x})')
+    validate(packet, 0x5c)
 
-    if packet[1] != 0x5c:
-        raise ValueError(f'invalid reply function code ({packet[1]:02x})')
+    (controller, card, door_1, door_2, door_3, door_4, pin, pin_hi) = CARD.unpack_from(packet)
 
     return GetCardByIndexResponse(
-        unpack_uint32(packet, 4),
-        unpack_uint32(packet, 8),
+        controller,
+        card,
         unpack_optional_date(packet, 12),
         unpack_optional_date(packet, 16),
-        unpack_uint8(packet, 20),
-        unpack_uint8(packet, 21),
-        unpack_uint8(packet, 22),
-        unpack_uint8(packet, 23),
-        unpack_pin(packet, 24),
+        door_1,
+        door_2,
+        door_3,
+        door_4,
+        pin | (pin_hi << 16),
     )
 
 
@@ -497,20 +413,9 @@ def put_card_response(packet):
             ValueError If the packet is not 64 bytes, has an invalid start-of-message byte or has
                        the incorrect message type.
     '''
-    if len(packet) != 64:
-        raise ValueError(f'invalid reply packet length ({len(packet)})')
+    validate(packet, 0x50)
 
-    # Ref. v6.62 firmware event
-    if packet[0] != 0x17 and (packet[0] != 0x19 or packet[1] != 0x20):
-        raise ValueError(f'invalid reply start of message byte ({packet[0]:02x})')
-
-    if packet[1] != 0x50:
-        raise ValueError(f'invalid reply function code ({packet[1]:02x})')
-
-    return PutCardResponse(
-        unpack_uint32(packet, 4),
-        unpack_bool(packet, 8),
-    )
+    return PutCardResponse(*CONTROLLER_BOOL.unpack_from(packet))
 
 
 def delete_card_response(packet):
@@ -527,20 +432,9 @@ def delete_card_response(packet):
             ValueError If the packet is not 64 bytes, has an invalid start-of-message byte or has
                        the incorrect message type.
     '''
-    if len(packet) != 64:
-        raise ValueError(f'invalid reply packet length ({len(packet)})')
+    validate(packet, 0x52)
 
-    # Ref. v6.62 firmware event
-    if packet[0] != 0x17 and (packet[0] != 0x19 or packet[1] != 0x20):
-        raise ValueError(f'invalid reply start of message byte ({packet[0]:02x})')
-
-    if packet[1] != 0x52:
-        raise ValueError(f'invalid reply function code ({packet[1]:02x})')
-
-    return DeleteCardResponse(
-        unpack_uint32(packet, 4),
-        unpack_bool(packet, 8),
-    )
+    return DeleteCardResponse(*CONTROLLER_BOOL.unpack_from(packet))
 
 
 def delete_all_cards_response(packet):
@@ -557,20 +451,9 @@ def delete_all_cards_response(packet):
             ValueError If the packet is not 64 bytes, has an invalid start-of-message byte or has
                        the incorrect message type.
     '''
-    if len(packet) != 64:
-        raise ValueError(f'invalid reply packet length ({len(packet)})')
-
-    # Ref. v6.62 firmware event
-    if packet[0] != 0x17 and (packet[0] != 0x19 or packet[1] != 0x20):
-        raise ValueError(f'invalid reply start of message byte ({packet[0]:02x})')
+    validate(packet, 0x54)
 
-    if packet[1] != 0x54:
-        raise ValueError(f'invalid reply function code ({packet[1]:02x})')
-
-    return DeleteAllCardsResponse(
-        unpack_uint32(packet, 4),
-        unpack_bool(packet, 8),
-    )
+    return DeleteAllCardsResponse(*CONTROLLER_BOOL.unpack_from(packet))
 
 
 def get_event_response(packet):
@@ -587,26 +470,20 @@ def get_event_response(packet):
             ValueError If the packet is not 64 bytes, has an invalid start-of-message byte or has
                        the incorrect message type.
     '''
-    if len(packet) != 64:
-        raise ValueError(f'invalid reply packet length ({len(packet)})')
+    validate(packet, 0xb0)
 
-    # Ref. v6.62 firmware event
-    if packet[0] != 0x17 and (packet[0] != 0x19 or packet[1] != 0x20):
-        raise ValueError(f'invalid reply start of message byte ({packet[0]:02x})')
-
-    if packet[1] != 0xb0:
-        raise ValueError(f'invalid reply function code ({packet[1]:02x})')
+    (controller, index, event_type, granted, door, direction, card, reason) = GET_EVENT.unpack_from(packet)
 
     return GetEventResponse(
-        unpack_uint32(packet, 4),
-        unpack_uint32(packet, 8),
-        unpack_uint8(packet, 12),
-        unpack_bool(packet, 13),
-        unpack_uint8(packet, 14),
-        unpack_uint8(packet, 15),
-        unpack_uint32(packet, 16),
+        controller,
+        index,
+        event_type,
+        granted,
+        door,
+        direction,
+        card,
         unpack_optional_datetime(packet, 20),
-        unpack_uint8(packet, 27),
+        reason,
     )
 
 
@@ -624,20 +501,9 @@ def get_event_index_response(packet):
             ValueError If the packet is not 64 bytes, has an invalid start-of-message byte or has
                        the incorrect message type.
     '''
-    if len(packet) != 64:
-        raise ValueError(f'invalid reply packet length ({len(packet)})')
+    validate(packet, 0xb4)
 
-    # Ref. v6.62 firmware event
-    if packet[0] != 0x17 and (packet[0] != 0x19 or packet[1] != 0x20):
-        raise ValueError(f'invalid reply start of message byte ({packet[0]:02x})')
-
-    if packet[1] != 0xb4:
-        raise ValueError(f'invalid reply function code ({packet[1]:02x})')
-
-    return GetEventIndexResponse(
-        unpack_uint32(packet, 4),
-        unpack_uint32(packet, 8),
-    )
+    return GetEventIndexResponse(*CONTROLLER_UINT32.unpack_from(packet))
 
 
 def set_event_index_response(packet):
@@ -654,20 +520,9 @@ def set_event_index_response(packet):
             ValueError If the packet is not 64 bytes, has an invalid start-of-message byte or has
                        the incorrect message type.
     '''
-    if len(packet) != 64:
-        raise ValueError(f'invalid reply packet length ({len(packet)})')
-
-    # Ref. v6.62 firmware event
-    if packet[0] != 0x17 and (packet[0] != 0x19 or packet[1] != 0x20):
-        raise ValueError(f'invalid reply start of message byte ({packet[0]:02x})')
+    validate(packet, 0xb2)
 
-    if packet[1] != 0xb2:
-        raise ValueError(f'invalid reply function code ({packet[1]:02x})')
-
-    return SetEventIndexResponse(
-        unpack_uint32(packet, 4),
-        unpack_bool(packet, 8),
-    )
+    return SetEventIndexResponse(*CONTROLLER_BOOL.unpack_from(packet))
 
 
 def record_special_events_response(packet):
@@ -684,20 +539,9 @@ def record_special_events_response(packet):
             ValueError If the packet is not 64 bytes, has an invalid start-of-message byte or has
                        the incorrect message type.
     '''
-    if len(packet) != 64:
-        raise ValueError(f'invalid reply packet length ({len(packet)})')
+    validate(packet, 0x8e)
 
-    # Ref. v6.62 firmware event
-    if packet[0] != 0x17 and (packet[0] != 0x19 or packet[1] != 0x20):
-        raise ValueError(f'invalid reply start of message byte ({packet[0]:02x})')
-
-    if packet[1] != 0x8e:
-        raise ValueError(f'invalid reply function code ({packet[1]:02x})')
-
-    return RecordSpecialEventsResponse(
-        unpack_uint32(packet, 4),
-        unpack_bool(packet, 8),
-    )
+    return RecordSpecialEventsResponse(*CONTROLLER_BOOL.unpack_from(packet))
 
 
 def get_time_profile_response(packet):
@@ -714,35 +558,30 @@ def get_time_profile_response(packet):
             ValueError If the packet is not 64 bytes, has an invalid start-of-message byte or has
                        the incorrect message type.
     '''
-    if len(packet) != 64:
-        raise ValueError(f'invalid reply packet length ({len(packet)})')
+    validate(packet, 0x98)
 
-    # Ref. v6.62 firmware event
-    if packet[0] != 0x17 and (packet[0] != 0x19 or packet[1] != 0x20):
-        raise ValueError(f'invalid reply start of message byte ({packet[0]:02x})')
-
-    if packet[1] != 0x98:
-        raise ValueError(f'invalid reply function code ({packet[1]:02x})')
+    (controller, profile, monday, tuesday, wednesday, thursday, friday, saturday, sunday,
+     linked) = TIME_PROFILE.unpack_from(packet)
 
     return GetTimeProfileResponse(
-        unpack_uint32(packet, 4),
-        unpack_uint8(packet, 8),
+        controller,
+        profile,
         unpack_optional_date(packet, 9),
         unpack_optional_date(packet, 13),
-        unpack_bool(packet, 17),
-        unpack_bool(packet, 18),
-        unpack_bool(packet, 19),
-        unpack_bool(packet, 20),
-        unpack_bool(packet, 21),
-        unpack_bool(packet, 22),
-        unpack_bool(packet, 23),
+        monday,
+        tuesday,
+        wednesday,
+        thursday,
+        friday,
+        saturday,
+        sunday,
         unpack_hhmm(packet, 24),
         unpack_hhmm(packet, 26),
         unpack_hhmm(packet, 28),
         unpack_hhmm(packet, 30),
         unpack_hhmm(packet, 32),
         unpack_hhmm(packet, 34),
-        unpack_uint8(packet, 36),
+        linked,
     )
 
 
@@ -760,20 +599,9 @@ def set_time_profile_response(packet):
             ValueError If the packet is not 64 bytes, has an invalid start-of-message byte or has
                        the incorrect message type.
     '''
-    if len(packet) != 64:
-        raise ValueError(f'invalid reply packet length ({len(packet)})')
-
-    # Ref. v6.62 firmware event
-    if packet[0] != 0x17 and (packet[0] != 0x19 or packet[1] != 0x20):
-        raise ValueError(f'invalid reply start of message byte ({packet[0]:02x})')
+    validate(packet, 0x88)
 
-    if packet[1] != 0x88:
-        raise ValueError(f'invalid reply function code ({packet[1]:02x})')
-
-    return SetTimeProfileResponse(
-        unpack_uint32(packet, 4),
-        unpack_bool(packet, 8),
-    )
+    return SetTimeProfileResponse(*CONTROLLER_BOOL.unpack_from(packet))
 
 
 def delete_all_time_profiles_response(packet):
@@ -790,20 +618,9 @@ def delete_all_time_profiles_response(packet):
             ValueError If the packet is not 64 bytes, has an invalid start-of-message byte or has
                        the incorrect message type.
     '''
-    if len(packet) != 64:
-        raise ValueError(f'invalid reply packet length ({len(packet)})')
-
-    # Ref. v6.62 firmware event
-    if packet[0] != 0x17 and (packet[0] != 0x19 or packet[1] != 0x20):
-        raise ValueError(f'invalid reply start of message byte ({packet[0]:02x})')
+    validate(packet, 0x8a)
 
-    if packet[1] != 0x8a:
-        raise ValueError(f'invalid reply function code ({packet[1]:02x})')
-
-    return DeleteAllTimeProfilesResponse(
-        unpack_uint32(packet, 4),
-        unpack_bool(packet, 8),
-    )
+    return DeleteAllTimeProfilesResponse(*CONTROLLER_BOOL.unpack_from(packet))
 
 
 def add_task_response(packet):
@@ -820,20 +637,9 @@ def add_task_response(packet):
             ValueError If the packet is not 64 bytes, has an invalid start-of-message byte or has
                        the incorrect message type.
     '''
-    if len(packet) != 64:
-        raise ValueError(f'invalid reply packet length ({len(packet)})')
-
-    # Ref. v6.62 firmware event
-    if packet[0] != 0x17 and (packet[0] != 0x19 or packet[1] != 0x20):
-        raise ValueError(f'invalid reply start of message byte ({packet[0]:02x})')
+    validate(packet, 0xa8)
 
-    if packet[1] != 0xa8:
-        raise ValueError(f'invalid reply function code ({packet[1]:02x})')
-
-    return AddTaskResponse(
-        unpack_uint32(packet, 4),
-        unpack_bool(packet, 8),
-    )
+    return AddTaskResponse(*CONTROLLER_BOOL.unpack_from(packet))
 
 
 def refresh_tasklist_response(packet):
@@ -850,20 +656,9 @@ def refresh_tasklist_response(packet):
             ValueError If the packet is not 64 bytes, has an invalid start-of-message byte or has
                        the incorrect message type.
     '''
-    if len(packet) != 64:
-        raise ValueError(f'invalid reply packet length ({len(packet)})')
-
-    # Ref. v6.62 firmware event
-    if packet[0] != 0x17 and (packet[0] != 0x19 or packet[1] != 0x20):
-        raise ValueError(f'invalid reply start of message byte ({packet[0]:02x})')
+    validate(packet, 0xac)
 
-    if packet[1] != 0xac:
-        raise ValueError(f'invalid reply function code ({packet[1]:02x})')
-
-    return RefreshTasklistResponse(
-        unpack_uint32(packet, 4),
-        unpack_bool(packet, 8),
-    )
+    return RefreshTasklistResponse(*CONTROLLER_BOOL.unpack_from(packet))
 
 
 def clear_tasklist_response(packet):
@@ -880,20 +675,9 @@ def clear_tasklist_response(packet):
             ValueError If the packet is not 64 bytes, has an invalid start-of-message byte or has
                        the incorrect message type.
     '''
-    if len(packet) != 64:
-        raise ValueError(f'invalid reply packet length ({len(packet)})')
+    validate(packet, 0xa6)
 
-    # Ref. v6.62 firmware event
-    if packet[0] != 0x17 and (packet[0] != 0x19 or packet[1] != 0x20):
-        raise ValueError(f'invalid reply start of message byte ({packet[0]:02x})')
-
-    if packet[1] != 0xa6:
-        raise ValueError(f'invalid reply function code ({packet[1]:02x})')
-
-    return ClearTasklistResponse(
-        unpack_uint32(packet, 4),
-        unpack_bool(packet, 8),
-    )
+    return ClearTasklistResponse(*CONTROLLER_BOOL.unpack_from(packet))
 
 
 def set_pc_control_response(packet):
@@ -910,20 +694,9 @@ def set_pc_control_response(packet):
             ValueError If the packet is not 64 bytes, has an invalid start-of-message byte or has
                        the incorrect message type.
     '''
-    if len(packet) != 64:
-        raise ValueError(f'invalid reply packet length ({len(packet)})')
-
-    # Ref. v6.62 firmware event
-    if packet[0] != 0x17 and (packet[0] != 0x19 or packet[1] != 0x20):
-        raise ValueError(f'invalid reply start of message byte ({packet[0]:02x})')
-
-    if packet[1] != 0xa0:
-        raise ValueError(f'invalid reply function code ({packet[1]:02x})')
+    validate(packet, 0xa0)
 
-    return SetPcControlResponse(
-        unpack_uint32(packet, 4),
-        unpack_bool(packet, 8),
-    )
+    return SetPcControlResponse(*CONTROLLER_BOOL.unpack_from(packet))
 
 
 def set_interlock_response(packet):
@@ -940,20 +713,9 @@ def set_interlock_response(packet):
             ValueError If the packet is not 64 bytes, has an invalid start-of-message byte or has
                        the incorrect message type.
     '''
-    if len(packet) != 64:
-        raise ValueError(f'invalid reply packet length ({len(packet)})')
-
-    # Ref. v6.62 firmware event
-    if packet[0] != 0x17 and (packet[0] != 0x19 or packet[1] != 0x20):
-        raise ValueError(f'invalid reply start of message byte ({packet[0]:02x})')
+    validate(packet, 0xa2)
 
-    if packet[1] != 0xa2:
-        raise ValueError(f'invalid reply function code ({packet[1]:02x})')
-
-    return SetInterlockResponse(
-        unpack_uint32(packet, 4),
-        unpack_bool(packet, 8),
-    )
+    return SetInterlockResponse(*CONTROLLER_BOOL.unpack_from(packet))
 
 
 def activate_keypads_response(packet):
@@ -970,20 +732,9 @@ def activate_keypads_response(packet):
             ValueError If the packet is not 64 bytes, has an invalid start-of-message byte or has
                        the incorrect message type.
     '''
-    if len(packet) != 64:
-        raise ValueError(f'invalid reply packet length ({len(packet)})')
+    validate(packet, 0xa4)
 
-    # Ref. v6.62 firmware event
-    if packet[0] != 0x17 and (packet[0] != 0x19 or packet[1] != 0x20):
-        raise ValueError(f'invalid reply start of message byte ({packet[0]:02x})')
-
-    if packet[1] != 0xa4:
-        raise ValueError(f'invalid reply function code ({packet[1]:02x})')
-
-    return ActivateKeypadsResponse(
-        unpack_uint32(packet, 4),
-        unpack_bool(packet, 8),
-    )
+    return ActivateKeypadsResponse(*CONTROLLER_BOOL.unpack_from(packet))
 
 
 def set_door_passcodes_response(packet):
@@ -1000,20 +751,9 @@ def set_door_passcodes_response(packet):
             ValueError If the packet is not 64 bytes, has an invalid start-of-message byte or has
                        the incorrect message type.
     '''
-    if len(packet) != 64:
-        raise ValueError(f'invalid reply packet length ({len(packet)})')
-
-    # Ref. v6.62 firmware event
-    if packet[0] != 0x17 and (packet[0] != 0x19 or packet[1] != 0x20):
-        raise ValueError(f'invalid reply start of message byte ({packet[0]:02x})')
-
-    if packet[1] != 0x8c:
-        raise ValueError(f'invalid reply function code ({packet[1]:02x})')
+    validate(packet, 0x8c)
 
-    return SetDoorPasscodesResponse(
-        unpack_uint32(packet, 4),
-        unpack_bool(packet, 8),
-    )
+    return SetDoorPasscodesResponse(*CONTROLLER_BOOL.unpack_from(packet))
 
 
 def restore_default_parameters_response(packet):
@@ -1030,20 +770,9 @@ def restore_default_parameters_response(packet):
             ValueError If the packet is not 64 bytes, has an invalid start-of-message byte or has
                        the incorrect message type.
     '''
-    if len(packet) != 64:
-        raise ValueError(f'invalid reply packet length ({len(packet)})')
+    validate(packet, 0xc8)
 
-    # Ref. v6.62 firmware event
-    if packet[0] != 0x17 and (packet[0] != 0x19 or packet[1] != 0x20):
-        raise ValueError(f'invalid reply start of message byte ({packet[0]:02x})')
-
-    if packet[1] != 0xc8:
-        raise ValueError(f'invalid reply function code ({packet[1]:02x})')
-
-    return RestoreDefaultParametersResponse(
-        unpack_uint32(packet, 4),
-        unpack_bool(packet, 8),
-    )
+    return RestoreDefaultParametersResponse(*CONTROLLER_BOOL.unpack_from(packet))
 
 
 def event(packet):
@@ -1060,6 +789,197 @@ def event(packet):
             ValueError If the packet is not 64 bytes, has an invalid start-of-message byte or has
                        the incorrect message type.
     '''
+    validate(packet, 0x20)
+
+    (controller, event_index, event_type, granted, door, direction, card, reason, door_1_open, door_2_open, door_3_open,
+     door_4_open, door_1_button, door_2_button, door_3_button, door_4_button, system_error, sequence_no, special_info,
+     relays, inputs) = STATUS.unpack_from(packet)
+
+    return Event(
+        controller,
+        event_index,
+        event_type,
+        granted,
+        door,
+        direction,
+        card,
+        unpack_datetime(packet, 20),
+        reason,
+        unpack_shortdate(packet, 51),
+        unpack_time(packet, 37),
+        door_1_open,
+        door_2_open,
+        door_3_open,
+        door_4_open,
+        door_1_button,
+        door_2_button,
+        door_3_button,
+        door_4_button,
+        relays,
+        inputs,
+        system_error,
+        special_info,
+        sequence_no,
+    )
+
+
+class _Fixed:
+    '''
+    Descriptor for an EventView integer/boolean field. All the fixed fields are unpacked together (with the
+    precompiled STATUS layout) on first access to any of them and cached in the '_fields' slot.
+    '''
+
+    def __init__(self, index):
+        self._index = index
+
+    def __get__(self, view, owner=None):
+        if view == None:
+            return self
+
+        fields = view._fields
+        if fields == None:
+            fields = view._fields = STATUS.unpack_from(view._packet)
+
+        return fields[self._index]
+
+
+class _Lazy:
+    '''
+    Descriptor for an EventView BCD date/time field that is decoded from the packet on first access and
+    cached in the '_<name>' slot.
+    '''
+
+    def __init__(self, f):
+        self._decode = f
+
+    def __set_name__(self, owner, name):
+        self._slot = owner.__dict__[f'_{name}']
+
+    def __get__(self, view, owner=None):
+        if view == None:
+            return self
+
+        v = self._slot.__get__(view, owner)
+        if v is _UNDECODED:
+            v = self._decode(view._packet)
+            self._slot.__set__(view, v)
+
+        return v
+
+
+_UNDECODED = object()
+
+
+class EventView:
+    '''
+    Read-only view of an event packet that decodes the fields on first access (and caches the decoded
+    values). Wraps a memoryview of the received packet so that only the fields that are actually used
+    are decoded - in particular the BCD date/time fields are only decoded if they are accessed. The
+    field names are the same as for Event and 'materialize' returns the equivalent Event.
+
+        Raises:
+            ValueError If the packet is not 64 bytes, has an invalid start-of-message byte or has
+                       the incorrect message type.
+    '''
+    FIELDS = tuple(Event.__dataclass_fields__)
+
+    __slots__ = ('_packet', '_fields', '_event_timestamp', '_system_date', '_system_time')
+
+    def __init__(self, packet):
+        validate(packet, 0x20)
+
+        self._packet = memoryview(packet)
+        self._fields = None
+        self._event_timestamp = _UNDECODED
+        self._system_date = _UNDECODED
+        self._system_time = _UNDECODED
+
+    def __repr__(self):
+        return f'EventView(controller={self.controller}, event_index={self.event_index})'
+
+    @property
+    def packet(self):
+        '''
+        Returns the (memoryview of the) underlying event packet.
+        '''
+        return self._packet
+
+    def materialize(self):
+        '''
+        Decodes all the fields of the event.
+
+            Returns:
+               Event initialised from the packet.
+        '''
+        return Event(*[getattr(self, f) for f in EventView.FIELDS])
+
+    # yapf: disable
+    controller           = _Fixed(0)
+    event_index          = _Fixed(1)
+    event_type           = _Fixed(2)
+    event_access_granted = _Fixed(3)
+    event_door           = _Fixed(4)
+    event_direction      = _Fixed(5)
+    event_card           = _Fixed(6)
+    event_timestamp      = _Lazy(lambda p: unpack_datetime(p, 20))
+    event_reason         = _Fixed(7)
+    system_date          = _Lazy(lambda p: unpack_shortdate(p, 51))
+    system_time          = _Lazy(lambda p: unpack_time(p, 37))
+    door_1_open          = _Fixed(8)
+    door_2_open          = _Fixed(9)
+    door_3_open          = _Fixed(10)
+    door_4_open          = _Fixed(11)
+    door_1_button        = _Fixed(12)
+    door_2_button        = _Fixed(13)
+    door_3_button        = _Fixed(14)
+    door_4_button        = _Fixed(15)
+    relays               = _Fixed(19)
+    inputs               = _Fixed(20)
+    system_error         = _Fixed(16)
+    special_info         = _Fixed(18)
+    sequence_no          = _Fixed(17)
+    # yapf: enable
+
+
+def decode_any(packet):
+    '''
+    Decodes a response (or event) packet using the decoder for the packet function code.
+
+    Function code 0x20 is decoded as a GetStatusResponse - use 'event' to decode packets received
+    by an event listener.
+
+        Parameters:
+            packet  (bytearray)  64 byte UDP packet.
+
+        Returns:
+            Response initialised from the UDP packet.
+
+        Raises:
+            ValueError If the packet is not 64 bytes, has an invalid start-of-message byte or has
+                       an unknown function code.
+    '''
+    if len(packet) != 64:
+        raise ValueError(f'invalid reply packet length ({len(packet)})')
+
+    decoder = DECODERS.get(packet[1])
+    if decoder == None:
+        raise ValueError(f'unknown reply function code ({packet[1]:02x})')
+
+    return decoder(packet)
+
+
+def validate(packet, code):
+    '''
+    Validates the length, start-of-message byte and function code of a response packet.
+
+        Parameters:
+            packet  (bytearray)  64 byte UDP packet.
+            code    (uint8)      Expected function code.
+
+        Raises:
+            ValueError If the packet is not 64 bytes, has an invalid start-of-message byte or has
+                       the incorrect message type.
+    '''
     if len(packet) != 64:
         raise ValueError(f'invalid reply packet length ({len(packet)})')
 
@@ -1067,37 +987,209 @@ def event(packet):
     if packet[0] != 0x17 and (packet[0] != 0x19 or packet[1] != 0x20):
         raise ValueError(f'invalid reply start of message byte ({packet[0]:02x})')
 
-    if packet[1] != 0x20:
+    if packet[1] != code:
         raise ValueError(f'invalid reply function code ({packet[1]:02x})')
 
-    # yapf: disable
-    return Event(
-        unpack_uint32(packet, 4),       # controller
-        unpack_uint32(packet, 8),       # event index
-        unpack_uint8(packet, 12),       # event type
-        unpack_bool(packet, 13),        # event access granted
-        unpack_uint8(packet, 14),       # event door
-        unpack_uint8(packet, 15),       # event direction
-        unpack_uint32(packet, 16),      # event card number
-        unpack_datetime(packet, 20),    # event timestamp
-        unpack_uint8(packet, 27),       # event reason
-        unpack_shortdate(packet, 51),   # system date
-        unpack_time(packet, 37),        # system time
-        unpack_bool(packet, 28),        # door 1 open
-        unpack_bool(packet, 29),        # door 2 open
-        unpack_bool(packet, 30),        # door 3 open
-        unpack_bool(packet, 31),        # door 4 open
-        unpack_bool(packet, 32),        # door 1 button
-        unpack_bool(packet, 33),        # door 2 button
-        unpack_bool(packet, 34),        # door 3 button
-        unpack_bool(packet, 35),        # door 4 button
-        unpack_uint8(packet, 49),       # relays
-        unpack_uint8(packet, 50),       # inputs
-        unpack_uint8(packet, 36),       # system error
-        unpack_uint8(packet, 48),       # special info
-        unpack_uint32(packet, 40),      # sequence no
-    )
-    # yapf: enable
+
+# function code -> response decoder
+DECODERS = {
+    0x94: get_controller_response,
+    0x32: get_time_response,
+    0x30: set_time_response,
+    0x20: get_status_response,
+    0x92: get_listener_response,
+    0x90: set_listener_response,
+    0x82: get_door_control_response,
+    0x80: set_door_control_response,
+    0x40: open_door_response,
+    0x58: get_cards_response,
+    0x5a: get_card_response,
+    0x5c: get_card_by_index_response,
+    0x50: put_card_response,
+    0x52: delete_card_response,
+    0x54: delete_all_cards_response,
+    0xb0: get_event_response,
+    0xb4: get_event_index_response,
+    0xb2: set_event_index_response,
+    0x8e: record_special_events_response,
+    0x98: get_time_profile_response,
+    0x88: set_time_profile_response,
+    0x8a: delete_all_time_profiles_response,
+    0xa8: add_task_response,
+    0xac: refresh_tasklist_response,
+    0xa6: clear_tasklist_response,
+    0xa0: set_pc_control_response,
+    0xa2: set_interlock_response,
+    0xa4: activate_keypads_response,
+    0x8c: set_door_passcodes_response,
+    0xc8: restore_default_parameters_response,
+}
+
+
+def events_to_columns(buffer):
+    '''
+    Decodes a contiguous buffer of N 64 byte event packets (listener events or get-event responses) into
+    columns, using vectorised NumPy operations throughout. Requires the optional numpy dependency.
+
+        Parameters:
+            buffer  (bytes-like)  N*64 bytes of event packets.
+
+        Returns:
+            Dict of NumPy column arrays with the Event field names:
+            - controller, event_index, event_card: uint32
+            - event_type, event_door, event_direction, event_reason: uint8
+            - event_access_granted: bool
+            - event_timestamp: datetime64[s] (NaT for invalid timestamps)
+
+        Raises:
+            ImportError If numpy is not installed.
+            ValueError  If the buffer is not a multiple of 64 bytes or any packet has an invalid start-of-message
+                        byte or is not an event or get-event response.
+    '''
+    np = _numpy()
+    packets = _packets(np, buffer, (0x20, 0xb0))
+
+    return {
+        'controller': _uint32(np, buffer, 4),
+        'event_index': _uint32(np, buffer, 8),
+        'event_type': packets[:, 12].copy(),
+        'event_access_granted': packets[:, 13] != 0,
+        'event_door': packets[:, 14].copy(),
+        'event_direction': packets[:, 15].copy(),
+        'event_card': _uint32(np, buffer, 16),
+        'event_timestamp': _bcd_datetime(np, packets[:, 20:27]),
+        'event_reason': packets[:, 27].copy(),
+    }
+
+
+def cards_to_columns(buffer):
+    '''
+    Decodes a contiguous buffer of N 64 byte get-card-by-index (or get-card) response packets into columns,
+    using vectorised NumPy operations throughout. Requires the optional numpy dependency.
+
+        Parameters:
+            buffer  (bytes-like)  N*64 bytes of get-card-by-index response packets.
+
+        Returns:
+            Dict of NumPy column arrays with the GetCardByIndexResponse field names:
+            - controller, card_number, pin: uint32
+            - start_date, end_date: datetime64[D] (NaT for invalid dates)
+            - door_1, door_2, door_3, door_4: uint8
+
+        Raises:
+            ImportError If numpy is not installed.
+            ValueError  If the buffer is not a multiple of 64 bytes or any packet has an invalid start-of-message
+                        byte or is not a get-card-by-index or get-card response.
+    '''
+    np = _numpy()
+    packets = _packets(np, buffer, (0x5c, 0x5a))
+    pin = packets[:, 24:27].astype(np.uint32)
+
+    return {
+        'controller': _uint32(np, buffer, 4),
+        'card_number': _uint32(np, buffer, 8),
+        'start_date': _bcd_date(np, packets[:, 12:16]),
+        'end_date': _bcd_date(np, packets[:, 16:20]),
+        'door_1': packets[:, 20].copy(),
+        'door_2': packets[:, 21].copy(),
+        'door_3': packets[:, 22].copy(),
+        'door_4': packets[:, 23].copy(),
+        'pin': pin[:, 0] | (pin[:, 1] << 8) | (pin[:, 2] << 16),
+    }
+
+
+def _numpy():
+    '''
+    Imports numpy on demand, so that it is only required by the columnar decoders.
+    '''
+    try:
+        import numpy
+        return numpy
+    except ImportError as x:
+        raise ImportError('columnar decoding requires numpy (pip install uhppoted[numpy])') from x
+
+
+def _packets(np, buffer, codes):
+    '''
+    Returns the buffer as an (N,64) uint8 array after validating the start-of-message byte and function code
+    of every packet.
+    '''
+    data = np.frombuffer(buffer, dtype=np.uint8)
+    if len(data) % 64 != 0:
+        raise ValueError(f'invalid packet buffer length ({len(data)})')
+
+    packets = data.reshape(-1, 64)
+    som = packets[:, 0]
+    code = packets[:, 1]
+
+    # Ref. v6.62 firmware event
+    if not np.all((som == 0x17) | ((som == 0x19) & (code == 0x20))):
+        raise ValueError('invalid reply start of message byte')
+
+    if not np.all(np.isin(code, codes)):
+        raise ValueError('invalid reply function code')
+
+    return packets
+
+
+def _uint32(np, buffer, offset):
+    '''
+    Extracts the little-endian uint32 column at the offset from a buffer of 64 byte packets.
+    '''
+    layout = np.dtype({'names': ['v'], 'formats': ['<u4'], 'offsets': [offset], 'itemsize': 64})
+
+    return np.frombuffer(buffer, dtype=layout)['v'].astype(np.uint32)
+
+
+def _bcd(np, bcd):
+    '''
+    Decodes an (N,k) array of BCD bytes into an (N,k) array of 0..99 values and an (N,) validity mask.
+    '''
+    hi = bcd >> 4
+    lo = bcd & 0x0f
+
+    return (hi.astype(np.int64) * 10 + lo, np.all((hi < 10) & (lo < 10), axis=1))
+
+
+def _ymd(np, year, month, day, valid):
+    '''
+    Converts year, month and day columns to datetime64[D], with NaT for invalid dates.
+    '''
+    valid = valid & (year > 0) & (month >= 1) & (month <= 12) & (day >= 1)
+    year = np.where(valid, year, 1970)
+    month = np.where(valid, month, 1)
+    day = np.where(valid, day, 1)
+
+    months = (year - 1970) * 12 + (month - 1)
+    first = months.astype('datetime64[M]')
+    dates = first.astype('datetime64[D]') + (day - 1).astype('timedelta64[D]')
+
+    # day past the end of the month ?
+    valid &= dates < (first + np.timedelta64(1, 'M')).astype('datetime64[D]')
+
+    return np.where(valid, dates, np.datetime64('NaT', 'D'))
+
+
+def _bcd_date(np, bcd):
+    '''
+    Decodes an (N,4) array of BCD YYYYMMDD dates to datetime64[D].
+    '''
+    (v, valid) = _bcd(np, bcd)
+
+    return _ymd(np, v[:, 0] * 100 + v[:, 1], v[:, 2], v[:, 3], valid)
+
+
+def _bcd_datetime(np, bcd):
+    '''
+    Decodes an (N,7) array of BCD YYYYMMDDHHmmss timestamps to datetime64[s].
+    '''
+    (v, valid) = _bcd(np, bcd)
+    valid &= (v[:, 4] < 24) & (v[:, 5] < 60) & (v[:, 6] < 60)
+
+    dates = _ymd(np, v[:, 0] * 100 + v[:, 1], v[:, 2], v[:, 3], valid)
+    seconds = (v[:, 4] * 3600 + v[:, 5] * 60 + v[:, 6]).astype('timedelta64[s]')
+
+    return dates.astype('datetime64[s]') + seconds
 
 
 def unpack_uint8(packet, offset):
@@ -1195,11 +1287,10 @@ def unpack_date(packet, offset):
         Returns:
            datetime value (or None if the date/time valid is invalid)
     '''
-    bcd = '{:02x}{:02x}{:02x}{:02x}'.format(*packet[offset:offset + 4])
-
     try:
-        return datetime.datetime.strptime(bcd, '%Y%m%d').date()
-    except ValueError:
+        return datetime.date(BCD[packet[offset]] * 100 + BCD[packet[offset + 1]], BCD[packet[offset + 2]],
+                             BCD[packet[offset + 3]])
+    except (TypeError, ValueError):
         return None
 
 
@@ -1215,11 +1306,9 @@ def unpack_shortdate(packet, offset):
         Returns:
            datetime value (or None if the date/time valid is invalid)
     '''
-    bcd = '20{:02x}{:02x}{:02x}'.format(*packet[offset:offset + 3])
-
     try:
-        return datetime.datetime.strptime(bcd, '%Y%m%d').date()
-    except ValueError:
+        return datetime.date(2000 + BCD[packet[offset]], BCD[packet[offset + 1]], BCD[packet[offset + 2]])
+    except (TypeError, ValueError):
         return None
 
 
@@ -1234,11 +1323,10 @@ def unpack_optional_date(packet, offset):
         Returns:
            datetime value (or None if the date/time valid is invalid)
     '''
-    bcd = '{:02x}{:02x}{:02x}{:02x}'.format(*packet[offset:offset + 4])
-
     try:
-        return datetime.datetime.strptime(bcd, '%Y%m%d').date()
-    except ValueError:
+        return datetime.date(BCD[packet[offset]] * 100 + BCD[packet[offset + 1]], BCD[packet[offset + 2]],
+                             BCD[packet[offset + 3]])
+    except (TypeError, ValueError):
         return None
 
 
@@ -1253,11 +1341,11 @@ def unpack_datetime(packet, offset):
         Returns:
            datetime value (or None if the BCD value is not a valid date/time).
     '''
-    bcd = '{:02x}{:02x}{:02x}{:02x}{:02x}{:02x}{:02x}'.format(*packet[offset:offset + 7])
-
     try:
-        return datetime.datetime.strptime(bcd, '%Y%m%d%H%M%S')
-    except ValueError:
+        return datetime.datetime(BCD[packet[offset]] * 100 + BCD[packet[offset + 1]], BCD[packet[offset + 2]],
+                                 BCD[packet[offset + 3]], BCD[packet[offset + 4]], BCD[packet[offset + 5]],
+                                 BCD[packet[offset + 6]])
+    except (TypeError, ValueError):
         return None
 
 
@@ -1272,11 +1360,11 @@ def unpack_optional_datetime(packet, offset):
         Returns:
            datetime value (or None if the BCD value is not a valid date/time).
     '''
-    bcd = '{:02x}{:02x}{:02x}{:02x}{:02x}{:02x}{:02x}'.format(*packet[offset:offset + 7])
-
     try:
-        return datetime.datetime.strptime(bcd, '%Y%m%d%H%M%S')
-    except ValueError:
+        return datetime.datetime(BCD[packet[offset]] * 100 + BCD[packet[offset + 1]], BCD[packet[offset + 2]],
+                                 BCD[packet[offset + 3]], BCD[packet[offset + 4]], BCD[packet[offset + 5]],
+                                 BCD[packet[offset + 6]])
+    except (TypeError, ValueError):
         return None
 
 
@@ -1291,11 +1379,9 @@ def unpack_time(packet, offset):
         Returns:
            datetime value (or None if the BCD value is not a valid date/time).
     '''
-    bcd = '{:02x}{:02x}{:02x}'.format(*packet[offset:offset + 3])
-
     try:
-        return datetime.datetime.strptime(bcd, '%H%M%S').time()
-    except ValueError:
+        return datetime.time(BCD[packet[offset]], BCD[packet[offset + 1]], BCD[packet[offset + 2]])
+    except (TypeError, ValueError):
         return None
 
 
@@ -1310,11 +1396,9 @@ def unpack_hhmm(packet, offset):
         Returns:
            datetime value (or None if the BCD value is not a valid date/time).
     '''
-    bcd = '{:02x}{:02x}'.format(*packet[offset:offset + 2])
-
     try:
-        return datetime.datetime.strptime(bcd, '%H%M').time()
-    except ValueError:
+        return datetime.time(BCD[packet[offset]], BCD[packet[offset + 1]])
+    except (TypeError, ValueError):
         return None
 
 
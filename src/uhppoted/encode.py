@@ -9,8 +9,12 @@ Encodes a UHPPOTE access controller request as a 64 byte UDP packet:
 '''
 
 import datetime
+import functools
 import struct
 
+# 0..99 -> BCD byte lookup table
+BCD = tuple((v // 10) << 4 | (v % 10) for v in range(100))
+
 
 def get_controller_request(controller):
     '''
@@ -22,14 +26,7 @@ def get_controller_request(controller):
         Returns:
             64 byte UDP packet.
     '''
-    packet = bytearray(64)
-
-    packet[0] = 0x17
-    packet[1] = 0x94
-
-    pack_uint32(controller, packet, 4)
-
-    return packet
+    return bytearray(prototype(0x94, controller))
 
 
 def set_ip_request(controller, address, netmask, gateway):
@@ -45,12 +42,8 @@ def set_ip_request(controller, address, netmask, gateway):
         Returns:
             64 byte UDP packet.
     '''
-    packet = bytearray(64)
-
-    packet[0] = 0x17
-    packet[1] = 0x96
+    packet = bytearray(prototype(0x96, controller))
 
-    pack_uint32(controller, packet, 4)
     pack_IPv4(address, packet, 8)
     pack_IPv4(netmask, packet, 12)
     pack_IPv4(gateway, packet, 16)
@@ -69,14 +62,19 @@ def get_time_request(controller):
         Returns:
             64 byte UDP packet.
     '''
-    packet = bytearray(64)
+    return bytearray(prototype(0x32, controller))
 
-    packet[0] = 0x17
-    packet[1] = 0x32
 
-    pack_uint32(controller, packet, 4)
+def get_time_request_into(buffer, offset, controller):
+    '''
+    Encodes a get-time request into a caller supplied buffer.
 
-    return packet
+        Parameters:
+            buffer     (bytearray)  Buffer with at least 64 bytes from the offset.
+            offset     (int)        Packet location in buffer.
+            controller (uint32)     Controller serial number.
+    '''
+    buffer[offset:offset + 64] = prototype(0x32, controller)
 
 
 def set_time_request(controller, datetime):
@@ -90,17 +88,28 @@ def set_time_request(controller, datetime):
         Returns:
             64 byte UDP packet.
     '''
-    packet = bytearray(64)
+    packet = bytearray(prototype(0x30, controller))
 
-    packet[0] = 0x17
-    packet[1] = 0x30
-
-    pack_uint32(controller, packet, 4)
     pack_datetime(datetime, packet, 8)
 
     return packet
 
 
+def set_time_request_into(buffer, offset, controller, datetime):
+    '''
+    Encodes a set-time request into a caller supplied buffer.
+
+        Parameters:
+            buffer     (bytearray)  Buffer with at least 64 bytes from the offset.
+            offset     (int)        Packet location in buffer.
+            controller (uint32)     Controller serial number.
+            datetime   (datetime)   Date and time.
+    '''
+    buffer[offset:offset + 64] = prototype(0x30, controller)
+
+    pack_datetime(datetime, buffer, offset + 8)
+
+
 def get_status_request(controller):
     '''
     Encodes a get-status request.
@@ -111,14 +120,19 @@ def get_status_request(controller):
         Returns:
             64 byte UDP packet.
     '''
-    packet = bytearray(64)
+    return bytearray(prototype(0x20, controller))
 
-    packet[0] = 0x17
-    packet[1] = 0x20
 
-    pack_uint32(controller, packet, 4)
+def get_status_request_into(buffer, offset, controller):
+    '''
+    Encodes a get-status request into a caller supplied buffer.
 
-    return packet
+        Parameters:
+            buffer     (bytearray)  Buffer with at least 64 bytes from the offset.
+            offset     (int)        Packet location in buffer.
+            controller (uint32)     Controller serial number.
+    '''
+    buffer[offset:offset + 64] = prototype(0x20, controller)
 
 
 def get_listener_request(controller):
@@ -131,14 +145,7 @@ def get_listener_request(controller):
         Returns:
             64 byte UDP packet.
     '''
-    packet = bytearray(64)
-
-    packet[0] = 0x17
-    packet[1] = 0x92
-
-    pack_uint32(controller, packet, 4)
-
-    return packet
+    return bytearray(prototype(0x92, controller))
 
 
 def set_listener_request(controller, address, port, interval=0):
@@ -154,12 +161,8 @@ def set_listener_request(controller, address, port, interval=0):
         Returns:
             64 byte UDP packet.
     '''
-    packet = bytearray(64)
+    packet = bytearray(prototype(0x90, controller))
 
-    packet[0] = 0x17
-    packet[1] = 0x90
-
-    pack_uint32(controller, packet, 4)
     pack_IPv4(address, packet, 8)
     pack_uint16(port, packet, 12)
     pack_uint8(interval, packet, 14)
@@ -178,12 +181,8 @@ def get_door_control_request(controller, door):
         Returns:
             64 byte UDP packet.
     '''
-    packet = bytearray(64)
+    packet = bytearray(prototype(0x82, controller))
 
-    packet[0] = 0x17
-    packet[1] = 0x82
-
-    pack_uint32(controller, packet, 4)
     pack_uint8(door, packet, 8)
 
     return packet
@@ -202,12 +201,8 @@ def set_door_control_request(controller, door, mode, delay):
         Returns:
             64 byte UDP packet.
     '''
-    packet = bytearray(64)
-
-    packet[0] = 0x17
-    packet[1] = 0x80
+    packet = bytearray(prototype(0x80, controller))
 
-    pack_uint32(controller, packet, 4)
     pack_uint8(door, packet, 8)
     pack_uint8(mode, packet, 9)
     pack_uint8(delay, packet, 10)
@@ -226,12 +221,8 @@ def open_door_request(controller, door):
         Returns:
             64 byte UDP packet.
     '''
-    packet = bytearray(64)
-
-    packet[0] = 0x17
-    packet[1] = 0x40
+    packet = bytearray(prototype(0x40, controller))
 
-    pack_uint32(controller, packet, 4)
     pack_uint8(door, packet, 8)
 
     return packet
@@ -247,14 +238,7 @@ def get_cards_request(controller):
         Returns:
             64 byte UDP packet.
     '''
-    packet = bytearray(64)
-
-    packet[0] = 0x17
-    packet[1] = 0x58
-
-    pack_uint32(controller, packet, 4)
-
-    return packet
+    return bytearray(prototype(0x58, controller))
 
 
 def get_card_request(controller, card_number):
@@ -268,12 +252,8 @@ def get_card_request(controller, card_number):
         Returns:
             64 byte UDP packet.
     '''
-    packet = bytearray(64)
+    packet = bytearray(prototype(0x5a, controller))
 
-    packet[0] = 0x17
-    packet[1] = 0x5a
-
-    pack_uint32(controller, packet, 4)
     pack_uint32(card_number, packet, 8)
 
     return packet
@@ -290,17 +270,28 @@ def get_card_by_index_request(controller, card_index):
         Returns:
             64 byte UDP packet.
     '''
-    packet = bytearray(64)
+    packet = bytearray(prototype(0x5c, controller))
 
-    packet[0] = 0x17
-    packet[1] = 0x5c
-
-    pack_uint32(controller, packet, 4)
     pack_uint32(card_index, packet, 8)
 
     return packet
 
 
+def get_card_by_index_request_into(buffer, offset, controller, card_index):
+    '''
+    Encodes a get-card-by-index request into a caller supplied buffer.
+
+        Parameters:
+            buffer      (bytearray)  Buffer with at least 64 bytes from the offset.
+            offset      (int)        Packet location in buffer.
+            controller  (uint32)     Controller serial number.
+            card_index  (uint32)     Index into controller cards list.
+    '''
+    buffer[offset:offset + 64] = prototype(0x5c, controller)
+
+    pack_uint32(card_index, buffer, offset + 8)
+
+
 def put_card_request(controller, card_number, start_date, end_date, door_1, door_2, door_3, door_4, pin):
     '''
     Encodes a put-card request.
@@ -321,22 +312,116 @@ def put_card_request(controller, card_number, start_date, end_date, door_1, door
     '''
     packet = bytearray(64)
 
-    packet[0] = 0x17
-    packet[1] = 0x50
-
-    pack_uint32(controller, packet, 4)
-    pack_uint32(card_number, packet, 8)
-    pack_date(start_date, packet, 12)
-    pack_date(end_date, packet, 16)
-    pack_uint8(door_1, packet, 20)
-    pack_uint8(door_2, packet, 21)
-    pack_uint8(door_3, packet, 22)
-    pack_uint8(door_4, packet, 23)
-    pack_pin(pin, packet, 24)
+    put_card_request_into(packet, 0, controller, card_number, start_date, end_date, door_1, door_2, door_3, door_4, pin)
 
     return packet
 
 
+def put_card_request_into(buffer, offset, controller, card_number, start_date, end_date, door_1, door_2, door_3, door_4,
+                          pin):
+    '''
+    Encodes a put-card request into a caller supplied buffer.
+
+        Parameters:
+            buffer      (bytearray)  Buffer with at least 64 bytes from the offset.
+            offset      (int)        Packet location in buffer.
+            controller  (uint32)     Controller serial number.
+            card_number (uint32)     Card number.
+            start_date  (date)       Card 'valid from' date.
+            end_date    (date)       Card 'valid until' date.
+            door_1      (uint8)      Card access permissions for door 1 (0: none, 1: all, 2-254: time profile ID)
+            door_2      (uint8)      Card access permissions for door 2 (0: none, 1: all, 2-254: time profile ID)
+            door_3      (uint8)      Card access permissions for door 3 (0: none, 1: all, 2-254: time profile ID)
+            door_4      (uint8)      Card access permissions for door 4 (0: none, 1: all, 2-254: time profile ID)
+            pin         (uint24)     Card access keypad PIN code
+    '''
+    buffer[offset:offset + 64] = prototype(0x50, controller)
+
+    pack_uint32(card_number, buffer, offset + 8)
+    pack_date(start_date, buffer, offset + 12)
+    pack_date(end_date, buffer, offset + 16)
+    pack_uint8(door_1, buffer, offset + 20)
+    pack_uint8(door_2, buffer, offset + 21)
+    pack_uint8(door_3, buffer, offset + 22)
+    pack_uint8(door_4, buffer, offset + 23)
+    pack_pin(pin, buffer, offset + 24)
+
+
+def put_card_requests(controller, cards):
+    '''
+    Encodes a put-card request for each card, back to back in a single contiguous buffer.
+
+    The cards may be either a list of card records or a dict of NumPy columns (as returned by
+    decode.cards_to_columns), in which case the requests are encoded with vectorised NumPy operations.
+
+        Parameters:
+            controller  (uint32)     Controller serial number.
+            cards       (list|dict)  Card records (structs.Card or any object with the same fields) or dict of
+                                     'card_number', 'start_date', 'end_date', 'door_1', 'door_2', 'door_3',
+                                     'door_4' and (optional) 'pin' NumPy columns, with the dates as datetime64.
+
+        Returns:
+            memoryview of N*64 bytes, with the request for card i at offset i*64.
+
+        Raises:
+            ValueError  If a date column includes NaT.
+    '''
+    if isinstance(cards, dict):
+        return _put_card_requests(controller, cards)
+
+    cards = list(cards)
+    buffer = bytearray(64 * len(cards))
+
+    for (i, card) in enumerate(cards):
+        put_card_request_into(buffer, 64 * i, controller, card.card_number, card.start_date, card.end_date, card.door_1,
+                              card.door_2, card.door_3, card.door_4, card.pin)
+
+    return memoryview(buffer)
+
+
+def _put_card_requests(controller, columns):
+    '''
+    Vectorised implementation of put_card_requests for a dict of NumPy columns.
+    '''
+    import numpy as np
+
+    N = len(columns['card_number'])
+    packets = np.empty((N, 64), dtype=np.uint8)
+    bcd = np.array(BCD, dtype=np.uint8)
+
+    def uint32(offset, column):
+        packets[:, offset:offset + 4] = np.asarray(column, dtype='<u4').reshape(N, 1).view(np.uint8)
+
+    def date(offset, column):
+        dates = np.asarray(column, dtype='datetime64[D]')
+        if np.any(np.isnat(dates)):
+            raise ValueError('invalid card date (NaT)')
+
+        months = dates.astype('datetime64[M]')
+        year = dates.astype('datetime64[Y]').astype(np.int64) + 1970
+        month = months.astype(np.int64) % 12 + 1
+        day = (dates - months.astype('datetime64[D]')).astype(np.int64) + 1
+
+        packets[:, offset] = bcd[year // 100]
+        packets[:, offset + 1] = bcd[year % 100]
+        packets[:, offset + 2] = bcd[month]
+        packets[:, offset + 3] = bcd[day]
+
+    packets[:] = np.frombuffer(prototype(0x50, controller), dtype=np.uint8)
+
+    uint32(8, columns['card_number'])
+    date(12, columns['start_date'])
+    date(16, columns['end_date'])
+
+    for (offset, door) in [(20, 'door_1'), (21, 'door_2'), (22, 'door_3'), (23, 'door_4')]:
+        packets[:, offset] = columns[door]
+
+    pin = np.asarray(columns['pin'] if 'pin' in columns else np.zeros(N), dtype='<u4').reshape(N, 1).view(np.uint8)
+    packets[:, 24:27] = pin[:, 0:3]
+
+    return memoryview(packets.reshape(-1))
+
+
 def delete_card_request(controller, card_number):
     '''
     Encodes a delete-card request.
@@ -348,12 +433,8 @@ def delete_card_request(controller, card_number):
         Returns:
             64 byte UDP packet.
     '''
-    packet = bytearray(64)
+    packet = bytearray(prototype(0x52, controller))
 
-    packet[0] = 0x17
-    packet[1] = 0x52
-
-    pack_uint32(controller, packet, 4)
     pack_uint32(card_number, packet, 8)
 
     return packet
@@ -369,12 +450,8 @@ def delete_cards_request(controller):
         Returns:
             64 byte UDP packet.
     '''
-    packet = bytearray(64)
-
-    packet[0] = 0x17
-    packet[1] = 0x54
+    packet = bytearray(prototype(0x54, controller))
 
-    pack_uint32(controller, packet, 4)
     pack_uint32(0x55aaaa55, packet, 8)
 
     return packet
@@ -391,17 +468,28 @@ def get_event_request(controller, event_index):
         Returns:
             64 byte UDP packet.
     '''
-    packet = bytearray(64)
-
-    packet[0] = 0x17
-    packet[1] = 0xb0
+    packet = bytearray(prototype(0xb0, controller))
 
-    pack_uint32(controller, packet, 4)
     pack_uint32(event_index, packet, 8)
 
     return packet
 
 
+def get_event_request_into(buffer, offset, controller, event_index):
+    '''
+    Encodes a get-event request into a caller supplied buffer.
+
+        Parameters:
+            buffer      (bytearray)  Buffer with at least 64 bytes from the offset.
+            offset      (int)        Packet location in buffer.
+            controller  (uint32)     Controller serial number.
+            event_index (uint32)     Index of event in controller events list.
+    '''
+    buffer[offset:offset + 64] = prototype(0xb0, controller)
+
+    pack_uint32(event_index, buffer, offset + 8)
+
+
 def get_event_index_request(controller):
     '''
     Encodes a get-event-index request.
@@ -412,14 +500,7 @@ def get_event_index_request(controller):
         Returns:
             64 byte UDP packet.
     '''
-    packet = bytearray(64)
-
-    packet[0] = 0x17
-    packet[1] = 0xb4
-
-    pack_uint32(controller, packet, 4)
-
-    return packet
+    return bytearray(prototype(0xb4, controller))
 
 
 def set_event_index_request(controller, event_index):
@@ -433,12 +514,8 @@ def set_event_index_request(controller, event_index):
         Returns:
             64 byte UDP packet.
     '''
-    packet = bytearray(64)
+    packet = bytearray(prototype(0xb2, controller))
 
-    packet[0] = 0x17
-    packet[1] = 0xb2
-
-    pack_uint32(controller, packet, 4)
     pack_uint32(event_index, packet, 8)
     pack_uint32(0x55aaaa55, packet, 12)
 
@@ -456,12 +533,8 @@ def record_special_events_request(controller, enable):
         Returns:
             64 byte UDP packet.
     '''
-    packet = bytearray(64)
-
-    packet[0] = 0x17
-    packet[1] = 0x8e
+    packet = bytearray(prototype(0x8e, controller))
 
-    pack_uint32(controller, packet, 4)
     pack_bool(enable, packet, 8)
 
     return packet
@@ -478,12 +551,8 @@ def get_time_profile_request(controller, profile_id):
         Returns:
             64 byte UDP packet.
     '''
-    packet = bytearray(64)
-
-    packet[0] = 0x17
-    packet[1] = 0x98
+    packet = bytearray(prototype(0x98, controller))
 
-    pack_uint32(controller, packet, 4)
     pack_uint8(profile_id, packet, 8)
 
     return packet
@@ -518,12 +587,8 @@ def set_time_profile_request(controller, profile_id, start_date, end_date, monda
         Returns:
             64 byte UDP packet.
     '''
-    packet = bytearray(64)
+    packet = bytearray(prototype(0x88, controller))
 
-    packet[0] = 0x17
-    packet[1] = 0x88
-
-    pack_uint32(controller, packet, 4)
     pack_uint8(profile_id, packet, 8)
     pack_date(start_date, packet, 9)
     pack_date(end_date, packet, 13)
@@ -580,12 +645,8 @@ def delete_all_time_profiles_request(controller):
         Returns:
             64 byte UDP packet.
     '''
-    packet = bytearray(64)
+    packet = bytearray(prototype(0x8a, controller))
 
-    packet[0] = 0x17
-    packet[1] = 0x8a
-
-    pack_uint32(controller, packet, 4)
     pack_uint32(0x55aaaa55, packet, 8)
 
     return packet
@@ -628,12 +689,8 @@ def add_task_request(controller, start_date, end_date, monday, tuesday, wednesda
         Returns:
             64 byte UDP packet.
     '''
-    packet = bytearray(64)
-
-    packet[0] = 0x17
-    packet[1] = 0xa8
+    packet = bytearray(prototype(0xa8, controller))
 
-    pack_uint32(controller, packet, 4)
     pack_date(start_date, packet, 8)
     pack_date(end_date, packet, 12)
     pack_bool(monday, packet, 16)
@@ -661,12 +718,8 @@ def refresh_tasklist_request(controller):
         Returns:
             64 byte UDP packet.
     '''
-    packet = bytearray(64)
-
-    packet[0] = 0x17
-    packet[1] = 0xac
+    packet = bytearray(prototype(0xac, controller))
 
-    pack_uint32(controller, packet, 4)
     pack_uint32(0x55aaaa55, packet, 8)
 
     return packet
@@ -682,12 +735,8 @@ def clear_tasklist_request(controller):
         Returns:
             64 byte UDP packet.
     '''
-    packet = bytearray(64)
+    packet = bytearray(prototype(0xa6, controller))
 
-    packet[0] = 0x17
-    packet[1] = 0xa6
-
-    pack_uint32(controller, packet, 4)
     pack_uint32(0x55aaaa55, packet, 8)
 
     return packet
@@ -704,12 +753,8 @@ def set_pc_control_request(controller, enable):
         Returns:
             64 byte UDP packet.
     '''
-    packet = bytearray(64)
+    packet = bytearray(prototype(0xa0, controller))
 
-    packet[0] = 0x17
-    packet[1] = 0xa0
-
-    pack_uint32(controller, packet, 4)
     pack_uint32(0x55aaaa55, packet, 8)
     pack_bool(enable, packet, 12)
 
@@ -733,12 +778,8 @@ def set_interlock_request(controller, interlock):
         Returns:
             64 byte UDP packet.
     '''
-    packet = bytearray(64)
-
-    packet[0] = 0x17
-    packet[1] = 0xa2
+    packet = bytearray(prototype(0xa2, controller))
 
-    pack_uint32(controller, packet, 4)
     pack_uint8(interlock, packet, 8)
 
     return packet
@@ -758,12 +799,8 @@ def activate_keypads_request(controller, reader1, reader2, reader3, reader4):
         Returns:
             64 byte UDP packet.
     '''
-    packet = bytearray(64)
-
-    packet[0] = 0x17
-    packet[1] = 0xa4
+    packet = bytearray(prototype(0xa4, controller))
 
-    pack_uint32(controller, packet, 4)
     pack_bool(reader1, packet, 8)
     pack_bool(reader2, packet, 9)
     pack_bool(reader3, packet, 10)
@@ -787,12 +824,8 @@ def set_door_passcodes_request(device_id, door, passcode1, passcode2, passcode3,
         Returns:
             64 byte UDP packet.
     '''
-    packet = bytearray(64)
-
-    packet[0] = 0x17
-    packet[1] = 0x8c
+    packet = bytearray(prototype(0x8c, device_id))
 
-    pack_uint32(device_id, packet, 4)
     pack_uint8(door, packet, 8)
     pack_uint32(passcode1, packet, 12)
     pack_uint32(passcode2, packet, 16)
@@ -812,15 +845,35 @@ def restore_default_parameters_request(controller):
         Returns:
             64 byte UDP packet.
     '''
+    packet = bytearray(prototype(0xc8, controller))
+
+    pack_uint32(0x55aaaa55, packet, 8)
+
+    return packet
+
+
+@functools.lru_cache(maxsize=1024)
+def prototype(code, controller):
+    '''
+    Returns the (cached) prototype packet for a function code and controller, i.e. a 64 byte packet with
+    the start-of-message byte, function code and controller serial number. Requests are encoded by
+    patching the variable fields into a copy of the prototype.
+
+        Parameters:
+            code       (uint8)   Request function code.
+            controller (uint32)  Controller serial number.
+
+        Returns:
+            64 byte (immutable) prototype packet.
+    '''
     packet = bytearray(64)
 
     packet[0] = 0x17
-    packet[1] = 0xc8
+    packet[1] = code
 
     pack_uint32(controller, packet, 4)
-    pack_uint32(0x55aaaa55, packet, 8)
 
-    return packet
+    return bytes(packet)
 
 
 def pack_uint8(v, packet, offset):
@@ -882,8 +935,7 @@ def pack_date(v, packet, offset):
            packet (bytearray)  64 byte array.
            offset (int)        Value location in array.
     '''
-    bcd = f'{v:%Y%m%d}'
-    packet[offset:offset + 4] = bytes.fromhex(bcd)
+    packet[offset:offset + 4] = (BCD[v.year // 100], BCD[v.year % 100], BCD[v.month], BCD[v.day])
 
 
 def pack_datetime(v, packet, offset):
@@ -896,8 +948,8 @@ def pack_datetime(v, packet, offset):
            packet (bytearray)  64 byte array.
            offset (int)        Value location in array.
     '''
-    bcd = f'{v:%Y%m%d%H%M%S}'
-    packet[offset:offset + 7] = bytes.fromhex(bcd)
+    packet[offset:offset + 7] = (BCD[v.year // 100], BCD[v.year % 100], BCD[v.month], BCD[v.day], BCD[v.hour],
+                                 BCD[v.minute], BCD[v.second])
 
 
 def pack_HHmm(v, packet, offset):
@@ -909,8 +961,7 @@ def pack_HHmm(v, packet, offset):
            packet (bytearray)  64 byte array.
            offset (int)        Value location in array.
     '''
-    bcd = f'{v:%H%M}'
-    packet[offset:offset + 2] = bytes.fromhex(bcd)
+    packet[offset:offset + 2] = (BCD[v.hour], BCD[v.minute])
 
 
 def pack_bool(v, packet, offset):
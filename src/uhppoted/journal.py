@@ -0,0 +1,331 @@
+'''
+UHPPOTE event journal.
+
+Implements a durable append-only journal of raw 64 byte event packets (received events and get-event
+responses), stored as fixed size records in memory-mapped segment files with an in-memory index for
+lookup by (controller, event index). Records are replayed as zero-copy memoryview slices of the mapped
+segments, decoded on demand.
+'''
+
+import mmap
+import os
+import re
+import struct
+import threading
+
+from . import decode
+from . import encode
+
+# yapf: disable
+RECORD     = 64
+SOM        = 0x17
+SOM_V6_62  = 0x19                       # Ref. v6.62 firmware event
+EVENT      = 0x20
+GET_EVENT  = 0xb0
+KEY        = struct.Struct('<4xLL')     # controller, event index
+RECORD_KEY = struct.Struct('<4xLL52x')  # controller, event index (64 byte stride)
+# yapf: enable
+
+_SEGMENT = re.compile(r'^events\.([0-9]{8})\.journal$')
+
+
+class Journal:
+
+    def __init__(self, directory, segment_records=65536):
+        '''
+        Opens (or creates) an event journal in a directory, mapping any existing segment files and rebuilding
+        the (controller, event index) lookup index from the stored records.
+
+            Parameters:
+               directory       (string)  Directory for the journal segment files (created if it does not exist).
+               segment_records (int)     Number of 64 byte records per segment file. Defaults to 65536 (4MiB
+                                         segments). Ignored for existing segments, other than empty segment
+                                         files (e.g. after a crash while creating a segment).
+
+            Returns:
+               Initialised Journal object.
+
+            Raises:
+               Error  For any file related errors.
+        '''
+        self._directory = directory
+        self._segment_records = max(1, segment_records)
+        self._segments = []
+        self._index = {}
+        self._lock = threading.Lock()
+        self._count = 0
+
+        os.makedirs(directory, exist_ok=True)
+
+        names = sorted(f for f in os.listdir(directory) if _SEGMENT.match(f))
+        for name in names:
+            segment = _Segment.open(os.path.join(directory, name), self._segment_records)
+            self._segments.append(segment)
+
+            records = memoryview(segment.mm)[0:segment.used * RECORD]
+            for (slot, (controller, event_index)) in enumerate(RECORD_KEY.iter_unpack(records)):
+                self._index.setdefault(controller, {})[event_index] = (len(self._segments) - 1, slot)
+
+            records.release()
+
+            self._count += segment.used
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def segments(self):
+        '''
+        Returns the list of segment file paths, oldest first.
+        '''
+        return [segment.path for segment in self._segments]
+
+    def append(self, packet):
+        '''
+        Appends a raw event packet to the journal, rotating to a new segment file if the current segment is
+        full. A packet for a (controller, event index) that is already in the journal is appended and replaces
+        the previous record in the lookup index.
+
+            Parameters:
+               packet  (bytes-like)  64 byte event (0x20) or get-event response (0xb0) packet. Events with the 0x19
+                                     start-of-message byte used by v6.62 firmware are also accepted.
+
+            Returns:
+               None.
+
+            Raises:
+               ValueError  If the packet is not a 64 byte event packet or is a get-event response for an event
+                           that does not exist (event index 0).
+        '''
+        if len(packet) != RECORD or packet[1] not in (EVENT, GET_EVENT):
+            raise ValueError('invalid event packet')
+
+        if packet[0] != SOM and (packet[0] != SOM_V6_62 or packet[1] != EVENT):
+            raise ValueError('invalid event packet')
+
+        (controller, event_index) = KEY.unpack_from(packet)
+        if event_index == 0:
+            raise ValueError('invalid event index (0)')
+
+        with self._lock:
+            if len(self._segments) == 0 or self._segments[-1].full:
+                self._rotate()
+
+            segment = self._segments[-1]
+            slot = segment.used
+            offset = slot * RECORD
+
+            segment.mm[offset:offset + RECORD] = packet
+            segment.used += 1
+
+            self._index.setdefault(controller, {})[event_index] = (len(self._segments) - 1, slot)
+            self._count += 1
+
+    def append_record(self, record):
+        '''
+        Appends a decoded event to the journal. An EventView is appended as the underlying event packet, while
+        an Event or GetEventResponse is stored as the equivalent get-event response packet (i.e. without the
+        controller status fields of an Event).
+
+            Parameters:
+               record  (EventView|Event|GetEventResponse)  Event to append.
+
+            Returns:
+               None.
+
+            Raises:
+               ValueError  If the record is for an event that does not exist (event index 0).
+        '''
+        if isinstance(record, decode.EventView):
+            self.append(record.packet)
+        elif hasattr(record, 'event_index'):
+            self.append(
+                _pack(record.controller, record.event_index, record.event_type, record.event_access_granted,
+                      record.event_door, record.event_direction, record.event_card, record.event_timestamp,
+                      record.event_reason))
+        else:
+            self.append(
+                _pack(record.controller, record.index, record.event_type, record.access_granted, record.door,
+                      record.direction, record.card, record.timestamp, record.reason))
+
+    def get(self, controller, event_index):
+        '''
+        Returns the most recently appended packet for a (controller, event index).
+
+            Parameters:
+               controller  (uint32)  Controller serial number.
+               event_index (uint32)  Event index.
+
+            Returns:
+               64 byte memoryview of the stored packet (or None if the event is not in the journal).
+        '''
+        position = self._index.get(controller, {}).get(event_index)
+        if position != None:
+            (segment, slot) = position
+            return self._segments[segment].view(slot)
+
+        return None
+
+    def event_indexes(self, controller):
+        '''
+        Returns the sorted list of the event indexes stored for a controller.
+        '''
+        return sorted(self._index.get(controller, {}))
+
+    def packets(self, controller=None):
+        '''
+        Iterates over the stored packets in the order in which they were appended.
+
+            Parameters:
+               controller  (uint32)  Optional controller serial number. Defaults to all controllers.
+
+            Returns:
+               Generator of 64 byte memoryview slices of the mapped segment files.
+        '''
+        for segment in list(self._segments):
+            view = memoryview(segment.mm)
+
+            for slot in range(segment.used):
+                offset = slot * RECORD
+                if controller == None or KEY.unpack_from(view, offset)[0] == controller:
+                    yield view[offset:offset + RECORD]
+
+    def replay(self, controller=None, lazy=False):
+        '''
+        Iterates over the stored events in the order in which they were appended, decoding each packet from
+        the mapped segment file without copying it.
+
+            Parameters:
+               controller  (uint32)  Optional controller serial number. Defaults to all controllers.
+               lazy        (bool)    Yields a decode.EventView for received events rather than an Event if
+                                     True. Defaults to False.
+
+            Returns:
+               Generator of Event (or EventView) for received events and GetEventResponse for get-event
+               responses.
+        '''
+        for packet in self.packets(controller):
+            if packet[1] == GET_EVENT:
+                yield decode.get_event_response(packet)
+            elif lazy:
+                yield decode.EventView(packet)
+            else:
+                yield decode.event(packet)
+
+    def flush(self):
+        '''
+        Flushes the appended records in the current segment to disk.
+        '''
+        with self._lock:
+            if len(self._segments) > 0:
+                self._segments[-1].mm.flush()
+
+    def rotate(self):
+        '''
+        Flushes the current segment and starts a new segment file for subsequent appends.
+        '''
+        with self._lock:
+            self._rotate()
+
+    def close(self):
+        '''
+        Flushes the current segment and unmaps all the segment files. Any memoryviews or EventViews returned
+        by the journal must not be used after the journal is closed.
+        '''
+        with self._lock:
+            if len(self._segments) > 0:
+                self._segments[-1].mm.flush()
+
+            for segment in self._segments:
+                segment.close()
+
+            self._segments = []
+            self._index = {}
+            self._count = 0
+
+    def _rotate(self):
+        if len(self._segments) > 0:
+            self._segments[-1].mm.flush()
+
+        path = os.path.join(self._directory, f'events.{len(self._segments) + 1:08d}.journal')
+
+        self._segments.append(_Segment.create(path, self._segment_records))
+
+
+class _Segment:
+    '''
+    A memory-mapped segment file of fixed size records. Unused records are zero filled, so the number of used
+    records (which are always a prefix of the segment) is recovered on open from the (non-zero) start-of-message
+    bytes.
+    '''
+
+    def __init__(self, path, mm):
+        self.path = path
+        self.mm = mm
+        self.capacity = len(mm) // RECORD
+        self.used = 0
+
+    @staticmethod
+    def create(path, records):
+        with open(path, 'x+b') as f:
+            f.truncate(records * RECORD)
+            mm = mmap.mmap(f.fileno(), records * RECORD, access=mmap.ACCESS_WRITE)
+
+        return _Segment(path, mm)
+
+    @staticmethod
+    def open(path, records):
+        with open(path, 'r+b') as f:
+            # NTS: a crash between creating and sizing a segment leaves an empty file, which can't be mapped
+            if os.fstat(f.fileno()).st_size == 0:
+                f.truncate(records * RECORD)
+
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_WRITE)
+
+        segment = _Segment(path, mm)
+        (lo, hi) = (0, segment.capacity)
+
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if mm[mid * RECORD] != 0:
+                lo = mid + 1
+            else:
+                hi = mid
+
+        segment.used = lo
+
+        return segment
+
+    @property
+    def full(self):
+        return self.used >= self.capacity
+
+    def view(self, slot):
+        return memoryview(self.mm)[slot * RECORD:(slot + 1) * RECORD]
+
+    def close(self):
+        try:
+            self.mm.close()
+        except BufferError:
+            pass  # still referenced by an exported memoryview - unmapped when the last view is released
+
+
+def _pack(controller, event_index, event_type, granted, door, direction, card, timestamp, reason):
+    '''
+    Encodes the event fields as a get-event response packet.
+    '''
+    packet = bytearray(encode.prototype(GET_EVENT, controller))
+
+    struct.pack_into('<LB?BBL', packet, 8, event_index, event_type, granted, door, direction, card)
+    struct.pack_into('<B', packet, 27, reason)
+
+    if timestamp != None:
+        encode.pack_datetime(timestamp, packet, 20)
+
+    return packet
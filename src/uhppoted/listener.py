@@ -0,0 +1,462 @@
+'''
+UHPPOTE event listener.
+
+Implements a high throughput listener for events from UHPPOTE access controllers, with a dedicated receive
+thread that hands the received packets to a pool of handler threads through a bounded queue, so that a slow
+event handler does not stall the socket (and cause the kernel to silently discard events once the socket
+receive buffer is full), and an event index tracker that retrieves the events that were lost in transit.
+'''
+
+import socket
+import threading
+
+from collections import OrderedDict
+from collections import deque
+
+from . import net
+from .structs import BackfillStats
+from .structs import Event
+from .structs import ListenerStats
+
+DROP_OLDEST = 'drop-oldest'
+DROP_NEWEST = 'drop-newest'
+BLOCK = 'block'
+
+POLICIES = (DROP_OLDEST, DROP_NEWEST, BLOCK)
+
+
+class Listener:
+
+    def __init__(self,
+                 listen,
+                 onEvent,
+                 rcvbuf=None,
+                 queue_size=1024,
+                 policy=DROP_OLDEST,
+                 workers=1,
+                 onError=None,
+                 debug=False):
+        '''
+        Initialises an event listener.
+
+            Parameters:
+               listen     (tuple)     (address, port) on which to listen for events.
+               onEvent    (function)  Handler function for received event packets, with a function signature
+                                      f(packet).
+               rcvbuf     (int)       Optional socket receive buffer size (SO_RCVBUF) in bytes. Defaults to
+                                      None (the operating system default).
+               queue_size (int)       Maximum number of received events waiting to be handled. Defaults to 1024.
+               policy     (string)    Action when the queue is full:
+                                      - 'drop-oldest' discards the oldest queued event (default)
+                                      - 'drop-newest' discards the received event
+                                      - 'block' stops receiving until there is space in the queue (i.e. defers
+                                        to the socket receive buffer)
+               workers    (int)       Number of handler threads. Defaults to 1 (events are handled in the order
+                                      in which they are received).
+               onError    (function)  Optional handler for exceptions raised by onEvent, with a function signature
+                                      f(packet, exception). Defaults to printing the exception.
+               debug      (bool)      Dumps the received packets to the console if enabled.
+
+            Returns:
+               Initialised Listener object.
+
+            Raises:
+               ValueError  If the policy is not one of 'drop-oldest', 'drop-newest' or 'block'.
+        '''
+        if policy not in POLICIES:
+            raise ValueError(f'invalid queue policy ({policy})')
+
+        self._listen = listen
+        self._onEvent = onEvent
+        self._onError = onError
+        self._rcvbuf = rcvbuf
+        self._queue_size = max(1, queue_size)
+        self._policy = policy
+        self._workers = max(1, workers)
+        self._debug = debug
+        self._queue = deque()
+        self._guard = threading.Condition()
+        self._sock = None
+        self._threads = []
+        self._closed = False
+        self._received = 0
+        self._handled = 0
+        self._dropped = 0
+        self._errors = 0
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def start(self):
+        '''
+        Binds to the listen address and starts the receive and handler threads.
+
+            Returns:
+               The Listener object.
+
+            Raises:
+               Error  For any socket related errors.
+        '''
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, 0)
+
+        try:
+            if self._rcvbuf != None:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self._rcvbuf)
+
+            sock.bind(self._listen)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVTIMEO, net.NO_TIMEOUT)
+        except:
+            sock.close()
+            raise
+
+        self._sock = sock
+        self._closed = False
+        self._threads = [threading.Thread(target=self._receive, name='uhppoted-listener', daemon=True)]
+
+        for i in range(self._workers):
+            self._threads.append(threading.Thread(target=self._handle, name=f'uhppoted-listener-{i}', daemon=True))
+
+        for thread in self._threads:
+            thread.start()
+
+        return self
+
+    def stop(self):
+        '''
+        Stops the receive thread, closes the socket and waits for the handler threads to finish handling the
+        events already in the queue.
+
+            Returns:
+               None.
+        '''
+        with self._guard:
+            self._closed = True
+            self._guard.notify_all()
+
+        if self._sock != None:
+            try:
+                self._sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+        for thread in self._threads:
+            thread.join()
+
+        if self._sock != None:
+            self._sock.close()
+
+        self._sock = None
+        self._threads = []
+
+    def wait(self, timeout=None):
+        '''
+        Blocks until the listener is stopped (or for 'timeout' seconds).
+
+            Parameters:
+               timeout  (float)  Optional time limit (in seconds). Defaults to None (wait indefinitely).
+
+            Returns:
+               True if the listener has stopped.
+        '''
+        with self._guard:
+            return self._guard.wait_for(lambda: self._closed, timeout)
+
+    def stats(self):
+        '''
+        Returns the received, handled, dropped and error counters and the current queue depth.
+
+            Returns:
+               ListenerStats.
+        '''
+        with self._guard:
+            return ListenerStats(self._received, self._handled, self._dropped, self._errors, len(self._queue))
+
+    @property
+    def rcvbuf(self):
+        '''
+        Returns the actual socket receive buffer size (which may differ from the requested size e.g. Linux
+        doubles the requested value and caps it at net.core.rmem_max), or None if the listener is not started.
+        '''
+        if self._sock != None:
+            return self._sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+
+        return None
+
+    def _receive(self):
+        while True:
+            try:
+                packet = self._sock.recv(1024)
+            except (BlockingIOError, socket.timeout):
+                continue
+            except OSError:
+                break
+
+            if self._closed:
+                break
+
+            if len(packet) == 64:
+                if self._debug:
+                    net.dump(packet)
+
+                self._enqueue(packet)
+
+    def _enqueue(self, packet):
+        with self._guard:
+            self._received += 1
+
+            if len(self._queue) >= self._queue_size:
+                if self._policy == DROP_NEWEST:
+                    self._dropped += 1
+                    return
+                elif self._policy == DROP_OLDEST:
+                    self._queue.popleft()
+                    self._dropped += 1
+                else:
+                    self._guard.wait_for(lambda: len(self._queue) < self._queue_size or self._closed)
+                    if self._closed:
+                        self._dropped += 1
+                        return
+
+            self._queue.append(packet)
+            self._guard.notify_all()
+
+    def _handle(self):
+        while True:
+            with self._guard:
+                self._guard.wait_for(lambda: len(self._queue) > 0 or self._closed)
+                if len(self._queue) == 0:
+                    break
+
+                packet = self._queue.popleft()
+                self._guard.notify_all()
+
+            try:
+                self._onEvent(packet)
+            except BaseException as err:
+                with self._guard:
+                    self._errors += 1
+
+                if self._onError != None:
+                    self._onError(packet, err)
+                else:
+                    print('   *** ERROR {}'.format(err))
+            finally:
+                with self._guard:
+                    self._handled += 1
+
+
+class Backfill:
+    '''
+    Event handler wrapper that tracks the last event index delivered for each controller and, when a received
+    event index skips ahead, retrieves the missing events from the controller (with pipelined get-event
+    requests) and delivers them before the received event, so that the events for each controller are passed
+    to the wrapped handler in index order without gaps. Events that have already been delivered (e.g. a
+    retrieved event that subsequently arrives late) are discarded, while a late event that could not be
+    retrieved is delivered (out of order) when it arrives.
+
+    A received event index that is not ahead of the last delivered index is only treated as a reset of the
+    controller event log (e.g. after the controller events were cleared or the index rolled over) if there is
+    positive evidence of a reset i.e. it does not match the recently delivered event with the same index (by
+    timestamp and card number) or it is an unknown index with a timestamp later than the last delivered event.
+    Tracking then restarts from the new index, retrieving the preceding events of the new log. Any other
+    unknown index is a late event and is delivered (out of order) when it arrives.
+
+    Backfilled events are delivered as an Event (like the received events) with the event fields from the
+    get-event response and the controller status fields (system date/time, door and input states, etc.) set to
+    None, since they are not included in the get-event response.
+
+    Exceptions raised by the wrapped handler are propagated to the caller (e.g. to the Listener 'onError'
+    handler) for both received and backfilled events - an exception raised for a backfilled event is raised
+    after the remaining backfilled events and the received event have been delivered. Failures retrieving the
+    missing events are counted as missed and passed to the optional 'onError' handler.
+    '''
+
+    def __init__(self, u, onEvent, controllers=None, window=8, max_gap=1024, retries=3, timeout=2.5, onError=None):
+        '''
+        Initialises an event index tracker.
+
+            Parameters:
+               u           (Uhppote)   Uhppote used to retrieve the missing events.
+               onEvent     (function)  Handler function for the received and retrieved events, with a function
+                                       signature f(event).
+               controllers (dict)      Optional controller serial number -> (id,address,protocol) tuple used to
+                                       address the get-event requests. Defaults to the serial number alone (i.e.
+                                       UDP broadcast).
+               window      (int)       Maximum number of get-event requests in flight. Defaults to 8.
+               max_gap     (int)       Maximum number of missing events to retrieve for a single gap (only the
+                                       most recent events of a larger gap are retrieved) and the number of
+                                       delivered events remembered per controller for discarding duplicates.
+                                       Defaults to 1024.
+               retries     (int)       Number of times to retry a lost get-event request. Defaults to 3.
+               timeout     (float)     Timeout (in seconds) per get-event request. Defaults to 2.5s.
+               onError     (function)  Optional handler for errors retrieving the missing events, with a
+                                       function signature f(controller, err). Defaults to None.
+
+            Returns:
+               Initialised Backfill object, for use as the event handler for 'listen' or 'listener'.
+        '''
+        self._u = u
+        self._onEvent = onEvent
+        self._controllers = controllers if controllers != None else {}
+        self._window = window
+        self._max_gap = max(1, max_gap)
+        self._retries = retries
+        self._timeout = timeout
+        self._onError = onError
+        self._guard = threading.Lock()
+        self._tracks = {}
+        self._stats = BackfillStats(0, 0, 0, 0, 0)
+
+    def __call__(self, event):
+        with self._guard:
+            track = self._tracks.setdefault(event.controller, _Track())
+
+        with track.lock:
+            index = event.event_index
+            error = None
+
+            if track.last != None and index <= track.last:
+                fingerprint = track.recent.get(index)
+
+                if fingerprint == _fingerprint(event):
+                    self._count(duplicates=1)
+                    return
+
+                # NTS: an unknown index is a late event (e.g. received out of order or not retrievable when
+                #      the gap was backfilled) unless it is newer than the last delivered event
+                if fingerprint == None and not _newer(event.event_timestamp, track.timestamp):
+                    self._remember(track, index, event)
+                    self._onEvent(event)
+                    self._count(delivered=1)
+                    return
+
+                # NTS: discard the remembered events that the new event log reuses
+                for k in [k for k in track.recent if k <= index]:
+                    del track.recent[k]
+
+                track.last = 0
+                self._count(resets=1)
+
+            if track.last != None and index > track.last + 1:
+                start = max(track.last + 1, index - self._max_gap)
+
+                self._count(missed=start - track.last - 1)
+                error = self._backfill(event.controller, track, start, index - 1)
+
+            self._deliver(track, index, event)
+            self._count(delivered=1)
+
+            if error != None:
+                raise error
+
+    def last(self, controller):
+        '''
+        Returns the last event index delivered for a controller (or None if no events have been received).
+        '''
+        with self._guard:
+            track = self._tracks.get(controller)
+
+        return track.last if track != None else None
+
+    def stats(self):
+        '''
+        Returns the delivered, backfilled, missed, duplicate and reset counters.
+
+            Returns:
+               BackfillStats.
+        '''
+        with self._guard:
+            return BackfillStats(**self._stats.__dict__)
+
+    def _backfill(self, controller, track, start, end):
+        error = None
+        expected = start
+        target = self._controllers.get(controller, controller)
+        events = self._u.iter_events(target,
+                                     start,
+                                     end,
+                                     window=self._window,
+                                     retries=self._retries,
+                                     timeout=self._timeout)
+
+        # NTS: only the retrieval is guarded - handler exceptions propagate as for the received events
+        while True:
+            try:
+                event = next(events)
+            except StopIteration:
+                break
+            except Exception as err:
+                if self._onError != None:
+                    self._onError(controller, err)
+                break
+
+            self._count(missed=event.index - expected)
+            expected = event.index + 1
+
+            try:
+                self._deliver(track, event.index, _event(event))
+                self._count(backfilled=1)
+            except BaseException as err:
+                error = err if error == None else error
+
+        self._count(missed=end + 1 - expected)
+
+        return error
+
+    def _deliver(self, track, index, event):
+        track.last = index
+        track.timestamp = event.event_timestamp
+        self._remember(track, index, event)
+        self._onEvent(event)
+
+    def _remember(self, track, index, event):
+        track.recent[index] = _fingerprint(event)
+        while len(track.recent) > self._max_gap:
+            track.recent.popitem(last=False)
+
+    def _count(self, delivered=0, backfilled=0, missed=0, duplicates=0, resets=0):
+        with self._guard:
+            self._stats.delivered += delivered
+            self._stats.backfilled += backfilled
+            self._stats.missed += missed
+            self._stats.duplicates += duplicates
+            self._stats.resets += resets
+
+
+class _Track:
+    '''
+    Per-controller state for Backfill: the last delivered event index and timestamp and the fingerprints of the
+    recently delivered events.
+    '''
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.last = None
+        self.timestamp = None
+        self.recent = OrderedDict()
+
+
+def _fingerprint(event):
+    '''
+    Returns the (timestamp, card number) of an event (Event or EventView).
+    '''
+    return (event.event_timestamp, event.event_card)
+
+
+def _newer(timestamp, last):
+    '''
+    Returns True if an event timestamp is known to be later than the last delivered event timestamp.
+    '''
+    return timestamp != None and last != None and timestamp > last
+
+
+def _event(record):
+    '''
+    Converts a retrieved event (GetEventResponse) to an Event without the controller status fields.
+    '''
+    return Event(record.controller, record.index, record.event_type, record.access_granted, record.door,
+                 record.direction, record.card, record.timestamp, record.reason, None, None, None, None, None, None,
+                 None, None, None, None, None, None, None, None, None)
@@ -91,6 +91,27 @@ def disambiguate(v):
     return Controller(None, None, 'udp')
 
 
+def matches(request, reply):
+    '''
+    Returns True if the reply is a response to the request i.e. has the same function code and (unless the
+    request was addressed to controller 0) the same controller serial number.
+
+        Parameters:
+            request (bytearray)  64 byte request packet.
+            reply   (bytearray)  64 byte reply packet.
+
+        Returns:
+            True if the reply function code and controller serial number match the request.
+    '''
+    if reply[1] != request[1]:
+        return False
+
+    if request[4:8] != b'\x00\x00\x00\x00' and reply[4:8] != request[4:8]:
+        return False
+
+    return True
+
+
 def dump(packet):
     '''
     Prints a packet to the console as a formatted hexadecimal string.
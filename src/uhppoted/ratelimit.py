@@ -0,0 +1,187 @@
+'''
+UHPPOTE request rate limiter.
+
+Implements a per-controller token bucket rate limiter and in-flight request cap for the UDP and TCP transports,
+to avoid overrunning the small receive buffers of the access controllers (which silently drop requests, which
+then time out and are retried) when requests are pipelined.
+'''
+
+import struct
+import threading
+import time
+
+from collections import namedtuple
+from contextlib import contextmanager
+
+from .structs import RateLimiterStats
+
+# per-controller limits: requests per second, token bucket size and maximum requests in flight (None for unlimited)
+Limit = namedtuple('Limit', 'rate burst max_inflight', defaults=(None, 1, None))
+
+
+class RateLimiter:
+
+    def __init__(self, rate=None, burst=1, max_inflight=None, controllers=None):
+        '''
+        Initialises a rate limiter with the default limits for all controllers and optional per-controller
+        overrides. Each controller has its own token bucket and in-flight count, keyed by controller serial
+        number (or by address for requests to controller 0).
+
+            Parameters:
+               rate         (float)  Default maximum requests per second per controller. Defaults to None
+                                     (unlimited).
+               burst        (int)    Default token bucket size. Defaults to 1.
+               max_inflight (int)    Default maximum number of requests in flight per controller. Defaults to
+                                     None (unlimited).
+               controllers  (dict)   Optional per-controller Limit, keyed by controller serial number, IPv4
+                                     address:port or IPv4 address, e.g. { 405419896: Limit(rate=50) }.
+
+            Returns:
+               Initialised RateLimiter object.
+        '''
+        self._default = Limit(rate, burst, max_inflight)
+        self._controllers = dict(controllers) if controllers != None else {}
+        self._buckets = {}
+        self._guard = threading.Condition()
+        self._requests = 0
+        self._throttled = 0
+
+    def acquire(self, request, addr):
+        '''
+        Waits until a request can be sent to a controller without exceeding the controller rate or in-flight
+        limits. Every successful 'acquire' must be matched by a 'release' once the reply has been received
+        (or the request has failed).
+
+            Parameters:
+               request (bytearray)  64 byte request packet.
+               addr    (tuple)      Controller (address, port).
+
+            Returns:
+               None.
+        '''
+        with self._guard:
+            bucket = self._bucket(request, addr)
+            delay = bucket.take(time.monotonic())
+
+            if delay != 0:
+                self._throttled += 1
+
+            while delay != 0:
+                self._guard.wait(delay)
+                delay = bucket.take(time.monotonic())
+
+            self._requests += 1
+
+    def try_acquire(self, request, addr):
+        '''
+        Non-blocking equivalent of 'acquire' for single threaded I/O loops.
+
+            Parameters:
+               request (bytearray)  64 byte request packet.
+               addr    (tuple)      Controller (address, port).
+
+            Returns:
+               0 if the request can be sent (and must be released), the time (in seconds) until the request
+               can be sent or None if the request is waiting for a request in flight to be released.
+        '''
+        with self._guard:
+            delay = self._bucket(request, addr).take(time.monotonic())
+            if delay == 0:
+                self._requests += 1
+
+            return delay
+
+    def release(self, request, addr):
+        '''
+        Releases the in-flight slot acquired for a request.
+
+            Parameters:
+               request (bytearray)  64 byte request packet.
+               addr    (tuple)      Controller (address, port).
+
+            Returns:
+               None.
+        '''
+        with self._guard:
+            self._bucket(request, addr).inflight -= 1
+            self._guard.notify_all()
+
+    @contextmanager
+    def request(self, request, addr):
+        '''
+        Context manager that acquires and releases a request slot, e.g.:
+
+            with limiter.request(request, addr):
+                sock.sendto(request, addr)
+                ...
+        '''
+        self.acquire(request, addr)
+        try:
+            yield
+        finally:
+            self.release(request, addr)
+
+    def stats(self):
+        '''
+        Returns the request counters and the number of requests currently in flight.
+
+            Returns:
+               RateLimiterStats.
+        '''
+        with self._guard:
+            inflight = sum(b.inflight for b in self._buckets.values())
+
+            return RateLimiterStats(self._requests, self._throttled, inflight)
+
+    def _bucket(self, request, addr):
+        controller = struct.unpack_from('<L', request, 4)[0]
+        key = controller if controller != 0 else addr
+        bucket = self._buckets.get(key)
+
+        if bucket == None:
+            limit = self._limit(controller, addr)
+            bucket = self._buckets[key] = _Bucket(limit, time.monotonic())
+
+        return bucket
+
+    def _limit(self, controller, addr):
+        for k in [controller, f'{addr[0]}:{addr[1]}', addr[0]]:
+            if k in self._controllers:
+                return self._controllers[k]
+
+        return self._default
+
+
+class _Bucket:
+    '''
+    Token bucket and in-flight count for a single controller.
+    '''
+
+    def __init__(self, limit, now):
+        self.rate = limit.rate
+        self.burst = max(1, limit.burst if limit.burst != None else 1)
+        self.max_inflight = limit.max_inflight
+        self.tokens = float(self.burst)
+        self.updated = now
+        self.inflight = 0
+
+    def take(self, now):
+        '''
+        Takes a token and an in-flight slot if both are available, returning 0. Otherwise returns the time
+        until the next token is available or None if all the in-flight slots are in use.
+        '''
+        if self.max_inflight != None and self.inflight >= self.max_inflight:
+            return None
+
+        if self.rate != None:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+            if self.tokens < 1.0:
+                return (1.0 - self.tokens) / self.rate
+
+            self.tokens -= 1.0
+
+        self.inflight += 1
+
+        return 0
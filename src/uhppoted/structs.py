@@ -3,10 +3,14 @@ Shared dataclass definitions.
 '''
 
 import datetime
+import functools
 import struct
+import sys
 
 from ipaddress import IPv4Address
+from dataclasses import MISSING
 from dataclasses import dataclass
+from dataclasses import fields
 from typing import NewType
 
 PIN = NewType('PIN', int)
@@ -599,3 +603,206 @@ class Event:
     system_error: int
     special_info: int
     sequence_no: int
+
+
+@dataclass
+class Result:
+    '''
+    Container class for the per-controller result of an API function invoked by 'map'.
+
+       Fields:
+          controller  (uint32|tuple)  Controller (as passed to 'map').
+          response    (object)        API function response (None if the call failed).
+          error       (Exception)     Error raised by the API function (None if the call succeeded).
+    '''
+    controller: object
+    response: object
+    error: Exception
+
+
+@dataclass
+class Card:
+    '''
+    Container class for a card record to be stored on a controller by 'put_cards'.
+
+       Fields:
+          card_number (uint32)  Card number.
+          start_date  (date)    Card 'valid from' date.
+          end_date    (date)    Card 'valid until' date.
+          door_1      (uint8)   Card access permissions for door 1 (0: none, 1: all, 2-254: time profile ID)
+          door_2      (uint8)   Card access permissions for door 2 (0: none, 1: all, 2-254: time profile ID)
+          door_3      (uint8)   Card access permissions for door 3 (0: none, 1: all, 2-254: time profile ID)
+          door_4      (uint8)   Card access permissions for door 4 (0: none, 1: all, 2-254: time profile ID)
+          pin         (uint24)  Card access keypad PIN code (0 for none)
+    '''
+    card_number: int
+    start_date: datetime.date
+    end_date: datetime.date
+    door_1: int
+    door_2: int
+    door_3: int
+    door_4: int
+    pin: PIN = 0
+
+
+@dataclass
+class PutCardsReport:
+    '''
+    Container class for the summary report returned by 'put_cards'.
+
+       Fields:
+          controller  (uint32)  Controller serial number.
+          stored      (list)    Card numbers of the cards stored on the controller.
+          rejected    (list)    Card numbers of the cards for which the controller returned 'not stored'.
+          failed      (dict)    Card number -> Exception for the cards that could not be stored after all
+                                retries were exhausted.
+    '''
+    controller: int
+    stored: list
+    rejected: list
+    failed: dict
+
+
+@dataclass
+class SyncCardsReport:
+    '''
+    Container class for the summary report returned by 'sync_cards'.
+
+       Fields:
+          controller  (uint32)  Controller serial number.
+          added       (list)    Card numbers of the cards added to the controller.
+          updated     (list)    Card numbers of the cards updated on the controller.
+          deleted     (list)    Card numbers of the cards deleted from the controller.
+          unchanged   (int)     Number of cards that did not need to be updated.
+          failed      (dict)    Card number -> Exception (or 'not stored'/'not deleted' reason) for the cards
+                                that could not be added, updated or deleted.
+    '''
+    controller: int
+    added: list
+    updated: list
+    deleted: list
+    unchanged: int
+    failed: dict
+
+
+@dataclass
+class ListenerStats:
+    '''
+    Container class for the counters returned by 'Listener.stats'.
+
+       Fields:
+          received  (int)  Number of event packets received from the socket.
+          handled   (int)  Number of events passed to the event handler.
+          dropped   (int)  Number of events discarded because the queue was full.
+          errors    (int)  Number of events for which the event handler raised an exception.
+          queued    (int)  Number of events currently waiting in the queue.
+    '''
+    received: int
+    handled: int
+    dropped: int
+    errors: int
+    queued: int
+
+
+@dataclass
+class BackfillStats:
+    '''
+    Container class for the counters returned by 'Backfill.stats'.
+
+       Fields:
+          delivered   (int)  Number of received events passed to the event handler.
+          backfilled  (int)  Number of missing events retrieved from the controllers and passed to the event handler.
+          missed      (int)  Number of missing events that could not be retrieved.
+          duplicates  (int)  Number of received events discarded because they had already been delivered.
+          resets      (int)  Number of times a controller event index went backwards (e.g. after the events were
+                             cleared or the index rolled over).
+    '''
+    delivered: int
+    backfilled: int
+    missed: int
+    duplicates: int
+    resets: int
+
+
+@dataclass
+class CacheStats:
+    '''
+    Container class for the counters returned by 'ResponseCache.stats'.
+
+       Fields:
+          hits       (int)  Number of requests answered from the cache.
+          misses     (int)  Number of requests sent to a controller because the response was not cached or had expired.
+          coalesced  (int)  Number of requests that waited for an identical in-flight request rather than being sent.
+          evictions  (int)  Number of cached responses discarded to keep the cache within its size limit.
+          entries    (int)  Number of responses currently cached.
+    '''
+    hits: int
+    misses: int
+    coalesced: int
+    evictions: int
+    entries: int
+
+
+@dataclass
+class RateLimiterStats:
+    '''
+    Container class for the counters returned by 'RateLimiter.stats'.
+
+       Fields:
+          requests   (int)  Number of requests sent.
+          throttled  (int)  Number of requests that were delayed by a controller rate or in-flight limit.
+          inflight   (int)  Number of requests currently awaiting a reply.
+    '''
+    requests: int
+    throttled: int
+    inflight: int
+
+
+@functools.lru_cache(maxsize=None)
+def slotted(cls):
+    '''
+    Returns a __slots__ variant of a dataclass, with the same name, field names and equality semantics but
+    without the per-instance __dict__. Intended for applications that hold large numbers of events or cards
+    in memory.
+
+        Parameters:
+           cls  (class)  Dataclass e.g. Event or GetCardByIndexResponse.
+
+        Returns:
+           Slotted dataclass with the same fields as cls.
+    '''
+    namespace = {
+        '__annotations__': dict(cls.__annotations__),
+        '__doc__': cls.__doc__,
+        '__module__': cls.__module__,
+        '__qualname__': cls.__qualname__,
+    }
+
+    for f in fields(cls):
+        if f.default is not MISSING:
+            namespace[f.name] = f.default
+
+    if sys.version_info >= (3, 10):
+        return dataclass(slots=True)(type(cls.__name__, (), namespace))
+
+    # Python 3.9 fallback: recreate the dataclass with __slots__ in place of the field defaults (which
+    # are already bound to the generated __init__)
+    unslotted = dataclass(type(cls.__name__, (), namespace))
+    names = tuple(f.name for f in fields(unslotted))
+    namespace = {k: v for k, v in unslotted.__dict__.items() if k not in names + ('__dict__', '__weakref__')}
+    namespace['__slots__'] = names
+
+    return type(unslotted.__name__, (), namespace)
+
+
+def compact(record):
+    '''
+    Converts a dataclass instance (e.g. an Event) into an instance of the equivalent slotted dataclass.
+
+        Parameters:
+           record  (dataclass)  Dataclass instance.
+
+        Returns:
+           Instance of slotted(type(record)) with the same field values.
+    '''
+    return slotted(type(record))(*[getattr(record, f.name) for f in fields(record)])
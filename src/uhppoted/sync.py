@@ -0,0 +1,45 @@
+'''
+Card list synchronisation.
+
+Computes the difference between the cards stored on a controller (or a snapshot of the stored cards)
+and the desired card list, so that only the changed cards need to be pushed to the controller.
+'''
+
+FIELDS = ('start_date', 'end_date', 'door_1', 'door_2', 'door_3', 'door_4', 'pin')
+
+
+def diff(current, desired):
+    '''
+    Compares the current and desired card lists by card number.
+
+        Parameters:
+            current  (iterable)  Cards currently stored on the controller (e.g. GetCardByIndexResponse or Card).
+            desired  (iterable)  Cards that should be stored on the controller (e.g. Card).
+
+        Returns:
+            (added, updated, deleted, unchanged) tuple where 'added' and 'updated' are lists of the desired
+            cards to be stored on the controller, 'deleted' is a list of the card numbers to be deleted from
+            the controller and 'unchanged' is the number of cards that do not need to be updated.
+    '''
+    stored = {card.card_number: card for card in current}
+    added = []
+    updated = []
+    unchanged = 0
+
+    for card in desired:
+        existing = stored.pop(card.card_number, None)
+        if existing == None:
+            added.append(card)
+        elif not same(existing, card):
+            updated.append(card)
+        else:
+            unchanged += 1
+
+    return (added, updated, list(stored), unchanged)
+
+
+def same(p, q):
+    '''
+    Returns True if two card records have the same dates, door permissions and PIN.
+    '''
+    return all(getattr(p, f, None) == getattr(q, f, None) for f in FIELDS)
@@ -8,6 +8,7 @@ access controller.
 import socket
 import struct
 import re
+import threading
 import time
 import ipaddress
 
@@ -16,13 +17,18 @@ from . import net
 
 class TCP:
 
-    def __init__(self, bind='0.0.0.0', debug=False):
+    def __init__(self, bind='0.0.0.0', debug=False, max_idle=60, max_connections=2, limiter=None):
         '''
         Initialises a TCP communications wrapper with the bind address.
 
             Parameters:
-               bind      (string)  The IPv4 address:port to which to bind when sending a request.
-               debug     (bool)    Dumps the sent and received packets to the console if enabled.
+               bind            (string)       The IPv4 address:port to which to bind when sending a request.
+               debug           (bool)         Dumps the sent and received packets to the console if enabled.
+               max_idle        (float)        Time (in seconds) after which an idle pooled connection is closed.
+                                              Defaults to 60s.
+               max_connections (int)          Maximum number of pooled connections per controller. Defaults to 2.
+               limiter         (RateLimiter)  Optional ratelimit.RateLimiter that limits the request rate and
+                                              number of requests in flight per controller. Defaults to None.
 
             Returns:
                Initialised TCP object.
@@ -33,6 +39,48 @@ class TCP:
         '''
         self._bind = (bind, 0)
         self._debug = debug
+        self._max_idle = max_idle
+        self._max_connections = max_connections
+        self._limiter = limiter
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def open(self):
+        '''
+        Enables a pool of persistent connections keyed by controller address. Connections are kept
+        open between requests (up to max_connections per controller), checked before reuse, replaced
+        transparently if the controller has reset the connection and closed after being idle for
+        max_idle seconds.
+
+            Returns:
+               The TCP object.
+        '''
+        with self._lock:
+            if self._pool == None:
+                self._pool = _Pool(self._bind, self._max_idle, self._max_connections)
+
+        return self
+
+    def close(self):
+        '''
+        Closes all pooled connections (if any). Subsequent requests revert to using a connection per
+        request.
+
+            Returns:
+               None.
+        '''
+        with self._lock:
+            if self._pool != None:
+                try:
+                    self._pool.close()
+                finally:
+                    self._pool = None
 
     def send(self, request, dest_addr, timeout=2.5):
         '''
@@ -54,15 +102,22 @@ class TCP:
         self.dump(request)
 
         addr = net.resolve(f'{dest_addr}')
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDTIMEO, net.WRITE_TIMEOUT)
-            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVTIMEO, net.READ_TIMEOUT)
 
-            if not is_INADDR_ANY(self._bind):
-                sock.bind(self._bind)
+        if self._limiter != None:
+            with self._limiter.request(request, addr):
+                return self._exchange(request, addr, timeout)
 
-            sock.connect(addr)
+        return self._exchange(request, addr, timeout)
+
+    def _exchange(self, request, addr, timeout):
+        '''
+        Sends a request using either a pooled connection or a connection per request.
+        '''
+        pool = self._pool
+        if pool != None:
+            return self._send(pool, request, addr, timeout)
+
+        with _connect(self._bind, addr) as sock:
             sock.sendall(request)
 
             if request[1] == 0x96:
@@ -70,6 +125,35 @@ class TCP:
             else:
                 return _read(sock, timeout=timeout, debug=self._debug)
 
+    def _send(self, pool, request, addr, timeout):
+        '''
+        Sends a request using a pooled connection, retrying once on a new connection if a reused 
+        connection turns out to have been closed or reset by the controller.
+        '''
+        for attempt in [1, 2]:
+            (sock, reused) = pool.acquire(addr, timeout)
+
+            try:
+                sock.sendall(request)
+
+                if request[1] == 0x96:
+                    reply = None
+                else:
+                    reply = _read(sock, timeout=timeout, debug=self._debug, request=request)
+
+                pool.release(addr, sock)
+
+                return reply
+
+            except ConnectionError:
+                pool.discard(addr, sock)
+                if not reused or attempt > 1:
+                    raise
+
+            except BaseException:
+                pool.discard(addr, sock)
+                raise
+
     def dump(self, packet):
         '''
         Prints a packet to the console as a formatted hexadecimal string if debug was enabled in the
@@ -98,29 +182,210 @@ def is_INADDR_ANY(addr):
     return False
 
 
+def _connect(bind, addr):
+    '''
+    Opens a TCP connection to the controller, binding to the bind address (unless INADDR_ANY).
+
+        Parameters:
+            bind  (tuple)  (address, port) to which to bind the socket.
+            addr  (tuple)  Controller (address, port).
+
+        Returns:
+            Connected socket.
+    '''
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDTIMEO, net.WRITE_TIMEOUT)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVTIMEO, net.READ_TIMEOUT)
+
+        if not is_INADDR_ANY(bind):
+            sock.bind(bind)
+
+        sock.connect(addr)
+
+        return sock
+    except:
+        sock.close()
+        raise
+
+
+def _healthy(sock):
+    '''
+    Checks that an idle pooled connection is still usable i.e. has not been closed or reset by the
+    controller and has no unsolicited data pending.
+
+        Parameters:
+            sock  (socket)  Idle connected socket.
+
+        Returns:
+            True if the connection can be reused.
+    '''
+    try:
+        sock.setblocking(False)
+        sock.recv(1, socket.MSG_PEEK)
+        return False
+    except BlockingIOError:
+        return True
+    except OSError:
+        return False
+    finally:
+        sock.setblocking(True)
+
+
+class _Pool:
+    '''
+    Pool of persistent TCP connections keyed by controller (address, port).
+    '''
+
+    def __init__(self, bind, max_idle, max_connections):
+        self._bind = bind
+        self._max_idle = max_idle
+        self._max_connections = max(1, max_connections)
+        self._idle = {}
+        self._connections = {}
+        self._guard = threading.Condition()
+        self._closed = False
+
+    def acquire(self, addr, timeout):
+        '''
+        Returns an idle healthy connection to the controller, or a new connection if there is no idle 
+        connection and the per-controller connection limit has not been reached. Otherwise waits up to
+        'timeout' seconds for a connection to be released.
+
+            Returns:
+                (socket, reused) tuple.
+
+            Raises:
+                socket.timeout  If no connection became available within the timeout.
+        '''
+        deadline = time.monotonic() + net.timeout_to_seconds(timeout)
+
+        with self._guard:
+            while True:
+                if self._closed:
+                    raise OSError('TCP connection pool closed')
+
+                self._evict()
+
+                idle = self._idle.get(addr, [])
+                while len(idle) > 0:
+                    (sock, _) = idle.pop()
+                    if _healthy(sock):
+                        return (sock, True)
+
+                    self._close(addr, sock)
+
+                if self._connections.get(addr, 0) < self._max_connections:
+                    self._connections[addr] = self._connections.get(addr, 0) + 1
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise socket.timeout('timed out waiting for a connection')
+
+                self._guard.wait(remaining)
+
+        try:
+            return (_connect(self._bind, addr), False)
+        except:
+            with self._guard:
+                self._connections[addr] -= 1
+                self._guard.notify_all()
+            raise
+
+    def release(self, addr, sock):
+        '''
+        Returns a connection to the pool after a successful request.
+        '''
+        with self._guard:
+            if self._closed:
+                self._close(addr, sock)
+            else:
+                self._idle.setdefault(addr, []).append((sock, time.monotonic()))
+
+            self._guard.notify_all()
+
+    def discard(self, addr, sock):
+        '''
+        Closes a connection that failed or may have a pending stale reply.
+        '''
+        with self._guard:
+            self._close(addr, sock)
+            self._guard.notify_all()
+
+    def close(self):
+        '''
+        Closes all idle connections. Connections in use are closed when released.
+        '''
+        with self._guard:
+            self._closed = True
+            for (addr, idle) in self._idle.items():
+                for (sock, _) in idle:
+                    self._close(addr, sock)
+
+            self._idle.clear()
+            self._guard.notify_all()
+
+    def _evict(self):
+        now = time.monotonic()
+
+        for (addr, idle) in self._idle.items():
+            expired = [v for v in idle if now - v[1] >= self._max_idle]
+            if len(expired) > 0:
+                idle[:] = [v for v in idle if now - v[1] < self._max_idle]
+                for (sock, _) in expired:
+                    self._close(addr, sock)
+
+    def _close(self, addr, sock):
+        try:
+            sock.close()
+        finally:
+            self._connections[addr] = self._connections.get(addr, 1) - 1
+
+
 # TODO convert to asyncio
-def _read(sock, timeout=2.5, debug=False):
+def _read(sock, timeout=2.5, debug=False, request=None):
     '''
     Waits 2.5 seconds for a single 64 byte packet to be received on the socket. Prints the packet to the console
-    if debug is True.
+    if debug is True. If the request is supplied, replies that do not match the request function code and 
+    controller serial number are discarded.
 
         Parameters:
-            sock    (socket)  Initialised and open UDP socket.
-            timeout (float)   Optional operation timeout (in seconds). Defaults to 2.5s.
-            debug   (bool)    Enables dumping the received packet to the console.
+            sock    (socket)     Initialised and open TCP socket.
+            timeout (float)      Optional operation timeout (in seconds). Defaults to 2.5s.
+            debug   (bool)       Enables dumping the received packet to the console.
+            request (bytearray)  Optional request packet used to discard stale replies.
 
         Returns:
             Received 64 byte UDP packet (or None).
+
+        Raises:
+            ConnectionResetError  If the connection was closed by the controller.
+            socket.timeout        If no matching reply was received within the timeout.
     '''
     time_limit = net.timeout_to_seconds(timeout)
+    deadline = time.monotonic() + time_limit
 
     sock.settimeout(time_limit)
 
     while True:
         reply = sock.recv(1024)
+        if len(reply) == 0:
+            raise ConnectionResetError('connection closed by controller')
+
         if len(reply) == 64:
             if debug:
                 net.dump(reply)
-            return reply
+
+            if request == None or net.matches(request, reply):
+                return reply
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise socket.timeout('timed out')
+
+        sock.settimeout(remaining)
 
     return None
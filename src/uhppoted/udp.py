@@ -5,27 +5,42 @@ Implements the functionality to send and receive 64 byte UDP packets to/from a U
 access controller.
 '''
 
+import selectors
 import socket
 import struct
 import re
+import threading
 import time
 import ipaddress
 
+from collections import deque
+
 from . import net
+from .listener import Listener
 
 
 class UDP:
 
-    def __init__(self, bind='0.0.0.0', broadcast='255.255.255.255:60000', listen="0.0.0.0:60001", debug=False):
+    def __init__(self,
+                 bind='0.0.0.0',
+                 broadcast='255.255.255.255:60000',
+                 listen="0.0.0.0:60001",
+                 debug=False,
+                 batched=False,
+                 limiter=None):
         '''
         Initialises a UDP communications wrapper with the bind address, broadcast address and listen address.
 
             Parameters:
-               bind      (string)  The IPv4 address:port to which to bind when sending a request.
-               broadcast (string)  The IPv4 address:port to which to send broadcast UDP messages.
-               listen    (string)  The IPv4 address:port on which to listen for events from the
-                                   access controllers.
-               debug     (bool)    Dumps the sent and received packets to the console if enabled.
+               bind      (string)       The IPv4 address:port to which to bind when sending a request.
+               broadcast (string)       The IPv4 address:port to which to send broadcast UDP messages.
+               listen    (string)       The IPv4 address:port on which to listen for events from the
+                                        access controllers.
+               debug     (bool)         Dumps the sent and received packets to the console if enabled.
+               batched   (bool)         Enables the single threaded batched I/O backend for pipelined bulk
+                                        requests (see 'batch'). Defaults to False.
+               limiter   (RateLimiter)  Optional ratelimit.RateLimiter that limits the request rate and number
+                                        of requests in flight per controller. Defaults to None.
 
             Returns:
                Initialised UDP object.
@@ -38,6 +53,62 @@ class UDP:
         self._broadcast = net.resolve(broadcast)
         self._listen = net.resolve(listen)
         self._debug = debug
+        self._batched = batched
+        self._limiter = limiter
+        self._dispatcher = None
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def open(self):
+        '''
+        Opens a long-lived UDP socket bound to the bind address from the constructor. The socket is
+        shared by all subsequent send and broadcast requests until the UDP object is closed, which
+        avoids the overhead of creating, binding and configuring a socket for every request. Replies
+        are routed back to the originating request by a dispatcher, so requests from multiple threads
+        can be in flight concurrently.
+
+            Returns:
+               The UDP object (to allow 'with UDP(...).open() as u' and chaining).
+
+            Raises:
+               Error  For any socket related errors.
+        '''
+        with self._lock:
+            if self._dispatcher == None:
+                sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, 0)
+
+                try:
+                    sock.bind(self._bind)
+                    sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+                    sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDTIMEO, net.WRITE_TIMEOUT)
+                    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVTIMEO, net.READ_TIMEOUT)
+                except:
+                    sock.close()
+                    raise
+
+                self._dispatcher = _Dispatcher(sock, self._debug)
+
+        return self
+
+    def close(self):
+        '''
+        Closes the long-lived UDP socket (if open). Subsequent requests revert to using a socket per
+        request.
+
+            Returns:
+               None.
+        '''
+        with self._lock:
+            if self._dispatcher != None:
+                try:
+                    self._dispatcher.close()
+                finally:
+                    self._dispatcher = None
 
     def broadcast(self, request, timeout=2.5):
         '''
@@ -57,6 +128,10 @@ class UDP:
         '''
         self.dump(request)
 
+        dispatcher = self._dispatcher
+        if dispatcher != None:
+            return dispatcher.broadcast(request, self._broadcast, timeout)
+
         sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, 0)
 
         try:
@@ -90,6 +165,25 @@ class UDP:
         '''
         self.dump(request)
 
+        if dest_addr == None:
+            addr = self._broadcast
+        else:
+            addr = net.resolve(f'{dest_addr}')
+
+        if self._limiter != None:
+            with self._limiter.request(request, addr):
+                return self._send(request, addr, timeout)
+
+        return self._send(request, addr, timeout)
+
+    def _send(self, request, addr, timeout):
+        '''
+        Sends a request to a controller address and waits for the reply, using the long-lived socket if open.
+        '''
+        dispatcher = self._dispatcher
+        if dispatcher != None:
+            return dispatcher.send(request, addr, timeout)
+
         # sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM | socket.SOCK_NONBLOCK)
         sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, 0)
 
@@ -99,19 +193,48 @@ class UDP:
             sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDTIMEO, net.WRITE_TIMEOUT)
             sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVTIMEO, net.READ_TIMEOUT)
 
-            if dest_addr == None:
-                sock.sendto(request, self._broadcast)
-            else:
-                addr = net.resolve(f'{dest_addr}')
-                sock.sendto(request, addr)
+            sock.sendto(request, addr)
 
             if request[1] == 0x96:
                 return None
 
-            return _read(sock, timeout=timeout, debug=self._debug)
+            return _read(sock, timeout=timeout, debug=self._debug, request=request)
         finally:
             sock.close()
 
+    def batch(self, dest_addr=None, timeout=2.5, request=None):
+        '''
+        Returns a batched I/O backend for pipelined bulk requests to a single controller, if the batched
+        backend was enabled in the constructor and the long-lived socket is not open (requests over the
+        long-lived socket are multiplexed by the dispatcher).
+
+        The dispatcher can only have one request in flight for function codes for which the reply does not
+        identify the request (e.g. get-card-by-index, put-card), so a batched backend (which sends each request
+        on its own socket) is always returned for these requests while the long-lived socket is open.
+
+            Parameters:
+               dest_addr (string)     Optional IPv4 address:port of the controller. Defaults to port 60000
+                                      if dest_addr does not include a port.
+               timeout   (float)      Optional timeout (in seconds) per request. Defaults to 2.5s.
+               request   (bytearray)  Optional request packet identifying the function code of the bulk
+                                      requests.
+
+            Returns:
+               Batch object (or None if the requests should be sent with 'send').
+        '''
+        if self._dispatcher != None:
+            if request == None or _identifies(request):
+                return None
+        elif not self._batched:
+            return None
+
+        if dest_addr == None:
+            addr = self._broadcast
+        else:
+            addr = net.resolve(f'{dest_addr}')
+
+        return Batch(self._bind, addr, timeout, self._debug, self._limiter)
+
     def listen(self, onEvent):
         '''
         Binds to the listen address from the constructor and invokes the events handler for
@@ -141,6 +264,27 @@ class UDP:
         finally:
             sock.close()
 
+    def listener(self, onEvent, rcvbuf=None, queue_size=1024, policy='drop-oldest', workers=1, onError=None):
+        '''
+        Returns an event listener bound to the listen address from the constructor, with a dedicated
+        receive thread and a bounded queue of received packets that are handled by a pool of worker
+        threads (see listener.Listener).
+
+            Parameters:
+               onEvent    (function)  Handler function for received event packets, with a function signature
+                                      f(packet).
+               rcvbuf     (int)       Optional socket receive buffer size (SO_RCVBUF) in bytes.
+               queue_size (int)       Maximum number of received events waiting to be handled. Defaults to 1024.
+               policy     (string)    'drop-oldest', 'drop-newest' or 'block'. Defaults to 'drop-oldest'.
+               workers    (int)       Number of handler threads. Defaults to 1.
+               onError    (function)  Optional handler for exceptions raised by onEvent, with a function
+                                      signature f(packet, exception).
+
+            Returns:
+               Listener (not started).
+        '''
+        return Listener(self._listen, onEvent, rcvbuf, queue_size, policy, workers, onError, self._debug)
+
     def dump(self, packet):
         '''
         Prints a packet to the console as a formatted hexadecimal string if debug was enabled in the
@@ -157,20 +301,23 @@ class UDP:
 
 
 # TODO convert to asyncio
-def _read(sock, timeout=2.5, debug=False):
+def _read(sock, timeout=2.5, debug=False, request=None):
     '''
     Waits 2.5 seconds for a single 64 byte packet to be received on the socket. Prints the packet to the console
-    if debug is True.
+    if debug is True. If the request is supplied, replies that do not match the request function code and 
+    controller serial number are discarded.
 
         Parameters:
-            sock    (socket)  Initialised and open UDP socket.
-            timeout (float)   Optional operation timeout (in seconds). Defaults to 2.5s.
-            debug   (bool)    Enables dumping the received packet to the console.
+            sock    (socket)     Initialised and open UDP socket.
+            timeout (float)      Optional operation timeout (in seconds). Defaults to 2.5s.
+            debug   (bool)       Enables dumping the received packet to the console.
+            request (bytearray)  Optional request packet used to discard late or stray replies.
 
         Returns:
             Received 64 byte UDP packet (or None).
     '''
     time_limit = net.timeout_to_seconds(timeout)
+    deadline = time.monotonic() + time_limit
 
     sock.settimeout(time_limit)
 
@@ -179,7 +326,15 @@ def _read(sock, timeout=2.5, debug=False):
         if len(reply) == 64:
             if debug:
                 net.dump(reply)
-            return reply
+
+            if request == None or net.matches(request, reply):
+                return reply
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise socket.timeout('timed out')
+
+        sock.settimeout(remaining)
 
     return None
 
@@ -214,3 +369,381 @@ def _read_all(sock, timeout=2.5, debug=False):
             break
 
     return replies
+
+
+class Batch:
+    '''
+    Single threaded batched I/O backend for pipelined bulk requests. Each request in flight is sent on its
+    own non-blocking socket (so that replies which do not identify the request, e.g. put-card, are still
+    matched to the request) and the replies for all the requests in flight are collected with a single
+    selector poll rather than a blocked thread per request. Sockets are reused for subsequent requests once
+    the reply has been received, but replaced after a timeout so that a late reply cannot be mistaken for
+    the reply to the next request. If a rate limiter is supplied, requests that would exceed the controller
+    limits are queued and sent from 'wait' as soon as the limits allow.
+    '''
+
+    def __init__(self, bind, addr, timeout, debug=False, limiter=None):
+        self._bind = bind
+        self._addr = addr
+        self._timeout = net.timeout_to_seconds(timeout)
+        self._debug = debug
+        self._limiter = limiter
+        self._selector = selectors.DefaultSelector()
+        self._inflight = {}
+        self._queued = deque()
+        self._idle = []
+        self._completed = []
+
+    def __len__(self):
+        return len(self._inflight) + len(self._queued) + len(self._completed)
+
+    def submit(self, key, request):
+        '''
+        Sends a request without waiting for the reply.
+
+            Parameters:
+               key     (any)        Key returned with the reply (or error) by 'wait'.
+               request (bytearray)  64 byte request packet.
+        '''
+        if self._limiter != None:
+            self._queued.append((key, request))
+            self._drain()
+        else:
+            self._send(key, request)
+
+    def _send(self, key, request):
+        if self._debug:
+            net.dump(request)
+
+        try:
+            sock = self._idle.pop() if len(self._idle) > 0 else self._socket()
+        except OSError as x:
+            self._completed.append((key, x))
+            self._unlimit(request)
+            return
+
+        try:
+            sock.sendto(request, self._addr)
+        except BlockingIOError:
+            pass  # send buffer full - handled the same as a lost request
+        except OSError as x:
+            sock.close()
+            self._completed.append((key, x))
+            self._unlimit(request)
+            return
+
+        self._inflight[sock] = (key, request, time.monotonic() + self._timeout)
+        self._selector.register(sock, selectors.EVENT_READ)
+
+    def wait(self):
+        '''
+        Waits for at least one request to complete, i.e. receive a reply or time out.
+
+            Returns:
+               List of (key, reply) tuples, where reply is either the 64 byte reply packet or the OSError
+               (e.g. socket.timeout) for a request that failed.
+        '''
+        (completed, self._completed) = (self._completed, [])
+
+        while len(completed) == 0 and (len(self._inflight) > 0 or len(self._queued) > 0):
+            delay = self._drain()
+
+            if len(self._completed) > 0:
+                (completed, self._completed) = (completed + self._completed, [])
+                break
+
+            if len(self._inflight) == 0:
+                if delay != None:
+                    time.sleep(delay)
+                else:
+                    self._acquire()  # blocked by requests in flight from other threads
+                continue
+
+            deadlines = [v[2] for v in self._inflight.values()]
+            if delay != None:
+                deadlines.append(time.monotonic() + delay)
+
+            for (k, _) in self._selector.select(max(0, min(deadlines) - time.monotonic())):
+                sock = k.fileobj
+                (key, request, _) = self._inflight[sock]
+
+                try:
+                    reply = self._recv(sock, request)
+                    if reply != None:
+                        self._release(sock, True)
+                        completed.append((key, reply))
+                except OSError as x:
+                    self._release(sock, False)
+                    completed.append((key, x))
+
+            now = time.monotonic()
+            for (sock, (key, _, deadline)) in list(self._inflight.items()):
+                if deadline <= now:
+                    self._release(sock, False)
+                    completed.append((key, socket.timeout('timed out')))
+
+        return completed
+
+    def close(self):
+        '''
+        Closes all the sockets (abandoning any requests still in flight or queued).
+        '''
+        for sock in list(self._inflight):
+            self._release(sock, False)
+
+        self._queued.clear()
+
+        for sock in self._idle:
+            sock.close()
+
+        self._idle = []
+        self._selector.close()
+
+    def _socket(self):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, 0)
+
+        try:
+            sock.bind(self._bind)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+            sock.setblocking(False)
+        except:
+            sock.close()
+            raise
+
+        return sock
+
+    def _recv(self, sock, request):
+        while True:
+            try:
+                reply = sock.recv(1024)
+            except BlockingIOError:
+                return None
+
+            if len(reply) == 64:
+                if self._debug:
+                    net.dump(reply)
+
+                if net.matches(request, reply):
+                    return reply
+
+    def _drain(self):
+        '''
+        Sends the queued requests that are within the rate limiter limits, returning the time until the next
+        queued request can be sent (or None if there are no queued requests or the next request is waiting
+        for a request in flight to complete).
+        '''
+        while len(self._queued) > 0:
+            (key, request) = self._queued[0]
+            delay = self._limiter.try_acquire(request, self._addr)
+            if delay != 0:
+                return delay
+
+            self._queued.popleft()
+            self._send(key, request)
+
+        return None
+
+    def _acquire(self):
+        (key, request) = self._queued.popleft()
+
+        self._limiter.acquire(request, self._addr)
+        self._send(key, request)
+
+    def _unlimit(self, request):
+        if self._limiter != None:
+            self._limiter.release(request, self._addr)
+
+    def _release(self, sock, reuse):
+        self._selector.unregister(sock)
+        (_, request, _) = self._inflight.pop(sock)
+        self._unlimit(request)
+
+        if reuse:
+            self._idle.append(sock)
+        else:
+            sock.close()
+
+
+def _key(packet):
+    '''
+    Returns the dispatch key for a request or reply packet. The key is (controller, function code) except for
+    get-event, which includes the event index because the reply is self-identifying.
+    '''
+    controller = struct.unpack_from('<L', packet, 4)[0]
+
+    if _identifies(packet):
+        return (controller, 0xb0, struct.unpack_from('<L', packet, 8)[0])
+
+    return (controller, packet[1])
+
+
+def _identifies(packet):
+    '''
+    Returns True if the reply to a request identifies the request (i.e. get-event, which includes the event
+    index) so that multiple requests with the same controller and function code can be in flight on the
+    shared socket.
+    '''
+    return packet[1] == 0xb0
+
+
+def _wildcard(key):
+    '''
+    Returns the equivalent key for a request addressed to controller 0 (i.e. any controller).
+    '''
+    return (0, ) + key[1:]
+
+
+class _Exchange:
+    '''
+    A pending request on the shared socket, accumulating the replies routed to it by the dispatcher.
+    '''
+
+    def __init__(self):
+        self.replies = []
+        self.event = threading.Event()
+
+
+class _Dispatcher:
+    '''
+    Multiplexes requests from multiple threads over a single UDP socket. A receiver thread reads all
+    replies from the socket and routes each reply to the pending request with the same dispatch key
+    (controller serial number and function code). Replies that do not match any pending request (late
+    replies to a request that has timed out, stray packets) are discarded.
+
+    Because replies for most function codes cannot otherwise be told apart, only one request per dispatch
+    key is in flight at any one time - concurrent requests with the same key wait their turn. Requests to
+    different controllers or with different function codes are not serialized.
+    '''
+
+    def __init__(self, sock, debug):
+        self._sock = sock
+        self._debug = debug
+        self._pending = {}
+        self._guard = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='uhppoted-udp-dispatcher', daemon=True)
+        self._thread.start()
+
+    def close(self):
+        '''
+        Stops the receiver thread and closes the socket.
+        '''
+        with self._guard:
+            self._closed = True
+            self._guard.notify_all()
+
+        try:
+            self._sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+        self._thread.join()
+        self._sock.close()
+
+    def send(self, request, addr, timeout):
+        '''
+        Sends a request on the shared socket and waits for the matching reply.
+
+            Returns:
+               Received 64 byte reply (or None for a set-ip request).
+
+            Raises:
+               socket.timeout  If no matching reply was received within the timeout.
+        '''
+        if request[1] == 0x96:
+            self._sock.sendto(request, addr)
+            return None
+
+        time_limit = net.timeout_to_seconds(timeout)
+        key = _key(request)
+        exchange = self._register(key)
+
+        try:
+            self._sock.sendto(request, addr)
+
+            if exchange.event.wait(time_limit):
+                return exchange.replies[0]
+
+            raise socket.timeout('timed out')
+        finally:
+            self._unregister(key)
+
+    def broadcast(self, request, addr, timeout):
+        '''
+        Sends a request on the shared socket and accumulates the matching replies until no reply has been
+        received for 'timeout' seconds.
+
+            Returns:
+               List of received 64 byte replies (may be empty).
+        '''
+        time_limit = net.timeout_to_seconds(timeout)
+        key = _key(request)
+        exchange = self._register(key)
+
+        try:
+            self._sock.sendto(request, addr)
+
+            while exchange.event.wait(time_limit):
+                exchange.event.clear()
+
+            with self._guard:
+                return list(exchange.replies)
+        finally:
+            self._unregister(key)
+
+    def _register(self, key):
+        with self._guard:
+            while key in self._pending and not self._closed:
+                self._guard.wait()
+
+            if self._closed:
+                raise OSError('UDP socket closed')
+
+            exchange = _Exchange()
+            self._pending[key] = exchange
+
+            return exchange
+
+    def _unregister(self, key):
+        with self._guard:
+            del self._pending[key]
+            self._guard.notify_all()
+
+    def _run(self):
+        while True:
+            try:
+                reply = self._sock.recv(1024)
+            except (BlockingIOError, socket.timeout):
+                reply = None
+            except OSError:
+                if self._closed:
+                    break
+                continue
+
+            if self._closed:
+                break
+
+            if reply != None and len(reply) == 64:
+                if self._debug:
+                    net.dump(reply)
+
+                self._route(reply)
+
+    def _route(self, reply):
+        key = _key(reply)
+
+        with self._guard:
+            exchange = self._pending.get(key)
+            if exchange == None:
+                exchange = self._pending.get(_wildcard(key))
+
+            # get-event replies with an index of 0 (no such event) are routed to the oldest pending get-event
+            if exchange == None and reply[1] == 0xb0 and key[2] == 0:
+                for k, v in self._pending.items():
+                    if k[1] == 0xb0 and (k[0] == key[0] or k[0] == 0):
+                        exchange = v
+                        break
+
+            if exchange != None:
+                exchange.replies.append(reply)
+                exchange.event.set()
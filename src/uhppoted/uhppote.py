@@ -2,25 +2,69 @@
 Implements a Python wrapper around the UHPPOTE TCP/IP access controller API.
 '''
 
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import as_completed
+from concurrent.futures import wait
+from itertools import chain
+from itertools import count
+
 from . import decode
 from . import encode
 from . import tcp
 from . import udp
+from . import net
+from . import sync
+from .cache import READ_ONLY
+from .cache import SingleFlight
 from .net import disambiguate
+from .structs import Card
+from .structs import PutCardsReport
+from .structs import Result
+from .structs import SyncCardsReport
 
 
 class Uhppote:
 
-    def __init__(self, bind='0.0.0.0', broadcast='255.255.255.255:60000', listen="0.0.0.0:60001", debug=False):
+    def __init__(self,
+                 bind='0.0.0.0',
+                 broadcast='255.255.255.255:60000',
+                 listen="0.0.0.0:60001",
+                 debug=False,
+                 batched=False,
+                 card_index=None,
+                 cache=None,
+                 coalesce=False,
+                 limiter=None,
+                 max_idle=60,
+                 max_connections=2):
         '''
         Initialises a Uhppote object with the bind address, broadcast address and listen address.
 
             Parameters:
-               bind      (string)  The IPv4 address to which to bind when sending a request.
-               broadcast (string)  The IPv4 address:port to which to send broadcast UDP messages.
-               listen    (string)  The IPv4 address:port on which to listen for events from the
-                                   access controllers.
-               debug     (bool)    Enables verbose debugging information.
+               bind            (string)         The IPv4 address to which to bind when sending a request.
+               broadcast       (string)         The IPv4 address:port to which to send broadcast UDP messages.
+               listen          (string)         The IPv4 address:port on which to listen for events from the
+                                                access controllers.
+               debug           (bool)           Enables verbose debugging information.
+               batched         (bool)           Uses the single threaded batched UDP I/O backend for the pipelined bulk
+                                                functions (iter_events, iter_cards, put_cards and sync_cards) rather
+                                                than a worker thread per request. Defaults to False.
+               card_index      (CardIndex)      Optional cards.CardIndex that is kept up to date with the cards stored,
+                                                deleted and retrieved by the card functions. Defaults to None.
+               cache           (ResponseCache)  Optional cache.ResponseCache for the responses to the get-controller,
+                                                get-listener, get-door-control and get-time-profile requests, which is
+                                                invalidated by the equivalent set requests. Defaults to None.
+               coalesce        (bool)           Concurrent identical read-only requests (e.g. get-status) to the same
+                                                controller share a single request and response. Defaults to False.
+               limiter         (RateLimiter)    Optional ratelimit.RateLimiter that limits the request rate and number
+                                                of requests in flight per controller for both UDP and TCP requests.
+                                                Defaults to None.
+               max_idle        (float)          Time (in seconds) after which an idle pooled TCP connection is closed
+                                                (see 'open'). Defaults to 60s.
+               max_connections (int)            Maximum number of pooled TCP connections per controller (see 'open').
+                                                Defaults to 2.
 
             Returns:
                Initialised Uhppote object.
@@ -29,8 +73,48 @@ class Uhppote:
                ValueError  If any of the supplied IPv4 values cannot be translated to a valid IPv4 
                            address:port combination.
         '''
-        self._udp = udp.UDP(bind, broadcast, listen, debug)
-        self._tcp = tcp.TCP(bind, debug)
+        self._udp = udp.UDP(bind, broadcast, listen, debug, batched, limiter)
+        self._tcp = tcp.TCP(bind, debug, max_idle, max_connections, limiter)
+        self._cards = card_index
+        self._cache = cache
+        self._flights = SingleFlight() if coalesce else None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def open(self):
+        '''
+        Opens a long-lived UDP socket that is shared by all subsequent UDP requests and enables a pool
+        of persistent TCP connections, until the Uhppote object is closed. Optional - without it each 
+        request uses its own socket/connection. The pipelined requests for which the reply does not identify
+        the request (get-card-by-index, put-card and delete-card) are still sent on a socket per request in
+        flight, so that they are not limited to one request in flight by the shared socket.
+
+            Returns:
+               The Uhppote object.
+
+            Raises:
+               Exception  If the socket could not be opened.
+        '''
+        self._udp.open()
+        self._tcp.open()
+
+        return self
+
+    def close(self):
+        '''
+        Closes the long-lived UDP socket and pooled TCP connections opened by 'open' (if any).
+
+            Returns:
+               None.
+        '''
+        try:
+            self._udp.close()
+        finally:
+            self._tcp.close()
 
     def get_all_controllers(self, timeout=2.5):
         '''
@@ -79,7 +163,7 @@ class Uhppote:
         '''
         (id, addr, protocol) = disambiguate(controller)
         request = encode.get_controller_request(id)
-        reply = self._send(request, addr, timeout, protocol)
+        reply = self._cached('get_controller', id, (), lambda: self._send(request, addr, timeout, protocol), timeout)
 
         if reply != None:
             return decode.get_controller_response(reply)
@@ -113,7 +197,10 @@ class Uhppote:
         '''
         (id, addr, protocol) = disambiguate(controller)
         request = encode.set_ip_request(id, address, netmask, gateway)
-        reply = self._send(request, addr, timeout, protocol)
+        try:
+            reply = self._send(request, addr, timeout, protocol)
+        finally:
+            self._invalidate('set_ip', id)
 
         return True
 
@@ -236,7 +323,7 @@ class Uhppote:
         '''
         (id, addr, protocol) = disambiguate(controller)
         request = encode.get_listener_request(id)
-        reply = self._send(request, addr, timeout, protocol)
+        reply = self._cached('get_listener', id, (), lambda: self._send(request, addr, timeout, protocol), timeout)
 
         if reply != None:
             return decode.get_listener_response(reply)
@@ -270,7 +357,10 @@ class Uhppote:
         '''
         (id, addr, protocol) = disambiguate(controller)
         request = encode.set_listener_request(id, address, port, interval)
-        reply = self._send(request, addr, timeout, protocol)
+        try:
+            reply = self._send(request, addr, timeout, protocol)
+        finally:
+            self._invalidate('set_listener', id)
 
         if reply != None:
             return decode.set_listener_response(reply)
@@ -302,7 +392,8 @@ class Uhppote:
         '''
         (id, addr, protocol) = disambiguate(controller)
         request = encode.get_door_control_request(id, door)
-        reply = self._send(request, addr, timeout, protocol)
+        reply = self._cached('get_door_control', id, (door, ), lambda: self._send(request, addr, timeout, protocol),
+                             timeout)
 
         if reply != None:
             return decode.get_door_control_response(reply)
@@ -336,7 +427,10 @@ class Uhppote:
         '''
         (id, addr, protocol) = disambiguate(controller)
         request = encode.set_door_control_request(id, door, mode, delay)
-        reply = self._send(request, addr, timeout, protocol)
+        try:
+            reply = self._send(request, addr, timeout, protocol)
+        finally:
+            self._invalidate('set_door_control', id)
 
         if reply != None:
             return decode.set_door_control_response(reply)
@@ -433,7 +527,14 @@ class Uhppote:
         reply = self._send(request, addr, timeout, protocol)
 
         if reply != None:
-            return decode.get_card_response(reply)
+            response = decode.get_card_response(reply)
+            if self._cards != None:
+                if response.card_number == 0:
+                    self._cards.delete(id, card_number)
+                else:
+                    self._cards.put(id, response)
+
+            return response
 
         return None
 
@@ -464,10 +565,79 @@ class Uhppote:
         reply = self._send(request, addr, timeout, protocol)
 
         if reply != None:
-            return decode.get_card_by_index_response(reply)
+            response = decode.get_card_by_index_response(reply)
+            if self._cards != None and response.card_number not in (0, 0xffffffff):
+                self._cards.put(id, response)
+
+            return response
 
         return None
 
+    def iter_cards(self, controller, window=16, retries=3, timeout=2.5):
+        '''
+        Retrieves all the card records stored on an access controller, keeping up to 'window' get-card-by-index
+        requests in flight at any one time. Lost requests are retried and the cards are yielded in index order.
+        Deleted (0xffffffff) and missing (0) card slots are skipped and the retrieval stops once all the cards
+        reported by get-cards have been retrieved. The card index (if any) is reloaded with the retrieved cards
+        once the retrieval has completed.
+
+            Parameters:
+               controller (uint32|tuple)  Controller serial number or tuple with (id,address,protocol fields). 
+                                          The controller serial number is expected to be greater than 0.
+                                          If the controller is a tuple:
+                                          - 'id' is the controller serial number
+                                          - 'address' is the optional controller IPv4 addess:port. Defaults to the
+                                             UDP broadcast address and port 60000.
+                                          - 'protocol' is an optional transport protocol ('udp' or 'tcp'). Defaults 
+                                             to 'udp'.
+
+               window     (int)     Maximum number of requests in flight. Defaults to 16.
+               retries    (int)     Number of times to retry a request that failed. Defaults to 3.
+               timeout    (float)   Optional operation timeout (in seconds) per request. Defaults to 2.5s.
+
+            Returns:
+               Generator of GetCardByIndexResponse, in card index order.
+
+            Raises:
+               Exception  If a card could not be retrieved after 'retries' attempts or a response from the 
+                          access controller cannot be decoded.
+        '''
+        (id, addr, protocol) = disambiguate(controller)
+
+        cards = self.get_cards(controller, timeout).cards
+        found = 0
+        missing = 0
+        retrieved = []
+
+        def get(index):
+            return encode.get_card_by_index_request(id, index)
+
+        # NTS: a run of missing slots longer than the window means the card table has been exhausted (e.g.
+        #      because the card count changed during the download)
+        if cards > 0:
+            pipeline = self._pipeline(count(1), get, decode.get_card_by_index_response, addr, protocol, timeout, window,
+                                      retries)
+
+            for (index, card) in pipeline:
+                if card.card_number == 0:
+                    missing += 1
+                    if missing > window:
+                        break
+                elif card.card_number == 0xffffffff:
+                    missing = 0
+                else:
+                    missing = 0
+                    found += 1
+                    if self._cards != None:
+                        retrieved.append(card)
+                    yield card
+
+                    if found >= cards:
+                        break
+
+        if self._cards != None:
+            self._cards.load(id, retrieved)
+
     def put_card(self, controller, card_number, start_date, end_date, door_1, door_2, door_3, door_4, pin, timeout=2.5):
         '''
         Adds (or updates) a card record stored on the access controller.
@@ -502,10 +672,72 @@ class Uhppote:
         reply = self._send(request, addr, timeout, protocol)
 
         if reply != None:
-            return decode.put_card_response(reply)
+            response = decode.put_card_response(reply)
+            if self._cards != None and response.stored:
+                self._cards.put(id, Card(card_number, start_date, end_date, door_1, door_2, door_3, door_4, pin))
+
+            return response
 
         return None
 
+    def put_cards(self, controller, cards, window=16, retries=3, timeout=2.5):
+        '''
+        Adds (or updates) a list of card records stored on the access controller, keeping up to 'window'
+        put-card requests in flight at any one time. Lost requests are retried and the acknowledgement for each
+        card is tracked in the returned report.
+            Parameters:
+               controller (uint32|tuple)  Controller serial number or tuple with (id,address,protocol fields). 
+                                          The controller serial number is expected to be greater than 0.
+                                          If the controller is a tuple:
+                                          - 'id' is the controller serial number
+                                          - 'address' is the optional controller IPv4 addess:port. Defaults to the
+                                             UDP broadcast address and port 60000.
+                                          - 'protocol' is an optional transport protocol ('udp' or 'tcp'). Defaults 
+                                             to 'udp'.
+
+               cards      (iterable)  Card records (structs.Card or any object with the same fields).
+               window     (int)       Maximum number of requests in flight. Defaults to 16.
+               retries    (int)       Number of times to retry a request that failed. Defaults to 3.
+               timeout    (float)     Optional operation timeout (in seconds) per request. Defaults to 2.5s.
+
+            Returns:
+               PutCardsReport  Card numbers of the stored and rejected cards and the errors for any cards that
+                               could not be stored.
+
+            Raises:
+               Exception  If a response from the access controller cannot be decoded.
+        '''
+        (id, addr, protocol) = disambiguate(controller)
+        cards = list(cards)
+        requests = encode.put_card_requests(id, cards)
+        report = PutCardsReport(id, [], [], {})
+
+        def put(ix):
+            return requests[64 * ix:64 * (ix + 1)]
+
+        pipeline = self._pipeline(range(len(cards)),
+                                  put,
+                                  decode.put_card_response,
+                                  addr,
+                                  protocol,
+                                  timeout,
+                                  window,
+                                  retries,
+                                  errors=True)
+
+        for (ix, result) in pipeline:
+            card_number = cards[ix].card_number
+            if isinstance(result, Exception):
+                report.failed[card_number] = result
+            elif result.stored:
+                report.stored.append(card_number)
+                if self._cards != None:
+                    self._cards.put(id, cards[ix])
+            else:
+                report.rejected.append(card_number)
+
+        return report
+
     def delete_card(self, controller, card_number, timeout=2.5):
         '''
         Deletes the card record from the access controller.
@@ -533,10 +765,86 @@ class Uhppote:
         reply = self._send(request, addr, timeout, protocol)
 
         if reply != None:
-            return decode.delete_card_response(reply)
+            response = decode.delete_card_response(reply)
+            if self._cards != None and response.deleted:
+                self._cards.delete(id, card_number)
+
+            return response
 
         return None
 
+    def sync_cards(self, controller, cards, snapshot=None, window=16, retries=3, timeout=2.5):
+        '''
+        Updates the cards stored on the access controller to match the supplied card list, adding, updating 
+        and deleting only the cards that differ. The current card list is retrieved from the controller (using
+        iter_cards) unless a snapshot of the stored cards is supplied.
+            Parameters:
+               controller (uint32|tuple)  Controller serial number or tuple with (id,address,protocol fields). 
+                                          The controller serial number is expected to be greater than 0.
+                                          If the controller is a tuple:
+                                          - 'id' is the controller serial number
+                                          - 'address' is the optional controller IPv4 addess:port. Defaults to the
+                                             UDP broadcast address and port 60000.
+                                          - 'protocol' is an optional transport protocol ('udp' or 'tcp'). Defaults 
+                                             to 'udp'.
+
+               cards      (iterable)  Desired card records (structs.Card or any object with the same fields).
+               snapshot   (iterable)  Optional card records currently stored on the controller e.g. from a previous
+                                      sync. Defaults to None (retrieve the cards from the controller).
+               window     (int)       Maximum number of requests in flight. Defaults to 16.
+               retries    (int)       Number of times to retry a request that failed. Defaults to 3.
+               timeout    (float)     Optional operation timeout (in seconds) per request. Defaults to 2.5s.
+
+            Returns:
+               SyncCardsReport  Card numbers of the added, updated and deleted cards and the errors for any cards
+                                that could not be synchronised.
+
+            Raises:
+               Exception  If the current card list could not be retrieved or a response from the access controller
+                          cannot be decoded.
+        '''
+        (id, addr, protocol) = disambiguate(controller)
+
+        if snapshot == None:
+            snapshot = self.iter_cards(controller, window=window, retries=retries, timeout=timeout)
+
+        (added, updated, deleted, unchanged) = sync.diff(snapshot, cards)
+        report = SyncCardsReport(id, [], [], [], unchanged, {})
+
+        if len(added) + len(updated) > 0:
+            put = self.put_cards(controller, added + updated, window=window, retries=retries, timeout=timeout)
+            stored = set(put.stored)
+
+            report.added = [card.card_number for card in added if card.card_number in stored]
+            report.updated = [card.card_number for card in updated if card.card_number in stored]
+            report.failed.update({card_number: 'not stored' for card_number in put.rejected})
+            report.failed.update(put.failed)
+
+        def delete(card_number):
+            return encode.delete_card_request(id, card_number)
+
+        pipeline = self._pipeline(deleted,
+                                  delete,
+                                  decode.delete_card_response,
+                                  addr,
+                                  protocol,
+                                  timeout,
+                                  window,
+                                  retries,
+                                  errors=True)
+
+        for (card_number, result) in pipeline:
+            if isinstance(result, Exception):
+                report.failed[card_number] = result
+            elif result.deleted:
+                report.deleted.append(card_number)
+                if self._cards != None:
+                    self._cards.delete(id, card_number)
+            else:
+                report.failed[card_number] = 'not deleted'
+
+        return report
+
     def delete_all_cards(self, controller, timeout=2.5):
         '''
         Deletes all card records stored on the access controller.
@@ -563,7 +871,11 @@ class Uhppote:
         reply = self._send(request, addr, timeout, protocol)
 
         if reply != None:
-            return decode.delete_all_cards_response(reply)
+            response = decode.delete_all_cards_response(reply)
+            if self._cards != None and response.deleted:
+                self._cards.clear(id)
+
+            return response
 
         return None
 
@@ -598,6 +910,54 @@ class Uhppote:
 
         return None
 
+    def iter_events(self, controller, start, end, window=16, retries=3, timeout=2.5):
+        '''
+        Retrieves the events in the range [start..end] from an access controller, keeping up to 'window'
+        get-event requests in flight at any one time. Lost requests are retried and the events are yielded
+        in index order as they are retrieved. The range is clipped to the current controller event index (from
+        get-status) so that requests are not wasted on events that do not exist yet, and any events that do
+        not exist on the controller (i.e. the controller returned an event index of 0) are skipped.
+
+            Parameters:
+               controller (uint32|tuple)  Controller serial number or tuple with (id,address,protocol fields). 
+                                          The controller serial number is expected to be greater than 0.
+                                          If the controller is a tuple:
+                                          - 'id' is the controller serial number
+                                          - 'address' is the optional controller IPv4 addess:port. Defaults to the
+                                             UDP broadcast address and port 60000.
+                                          - 'protocol' is an optional transport protocol ('udp' or 'tcp'). Defaults 
+                                             to 'udp'.
+
+               start      (uint32)  Index of first event to retrieve.
+               end        (uint32)  Index of last event to retrieve (inclusive).
+               window     (int)     Maximum number of requests in flight. Defaults to 16.
+               retries    (int)     Number of times to retry a request that failed. Defaults to 3.
+               timeout    (float)   Optional operation timeout (in seconds) per request. Defaults to 2.5s.
+
+            Returns:
+               Generator of GetEventResponse, in event index order.
+
+            Raises:
+               Exception  If an event could not be retrieved after 'retries' attempts or a response from the 
+                          access controller cannot be decoded.
+        '''
+        (id, addr, protocol) = disambiguate(controller)
+
+        # NTS: replies to get-event requests for non-existent events carry an index of 0 and cannot be matched
+        #      to the request, so don't pipeline requests past the last event
+        status = self.get_status(controller, timeout)
+        end = min(end, status.event_index)
+
+        def get(index):
+            return encode.get_event_request(id, index)
+
+        pipeline = self._pipeline(range(start, end + 1), get, decode.get_event_response, addr, protocol, timeout,
+                                  window, retries)
+
+        for (index, event) in pipeline:
+            if event.index != 0:
+                yield event
+
     def get_event_index(self, controller, timeout=2.5):
         '''
         Retrieves the 'last downloaded event' index from the controller. The downloaded event index
@@ -723,7 +1083,8 @@ class Uhppote:
         '''
         (id, addr, protocol) = disambiguate(controller)
         request = encode.get_time_profile_request(id, profile_id)
-        reply = self._send(request, addr, timeout, protocol)
+        reply = self._cached('get_time_profile', id, (profile_id, ),
+                             lambda: self._send(request, addr, timeout, protocol), timeout)
 
         if reply != None:
             return decode.get_time_profile_response(reply)
@@ -793,7 +1154,10 @@ class Uhppote:
                                                   thursday, friday, saturday, sunday, segment_1_start, segment_1_end,
                                                   segment_2_start, segment_2_end, segment_3_start, segment_3_end,
                                                   linked_profile_id)
-        reply = self._send(request, addr, timeout, protocol)
+        try:
+            reply = self._send(request, addr, timeout, protocol)
+        finally:
+            self._invalidate('set_time_profile', id)
 
         if reply != None:
             return decode.set_time_profile_response(reply)
@@ -824,7 +1188,10 @@ class Uhppote:
         '''
         (id, addr, protocol) = disambiguate(controller)
         request = encode.delete_all_time_profiles_request(id)
-        reply = self._send(request, addr, timeout, protocol)
+        try:
+            reply = self._send(request, addr, timeout, protocol)
+        finally:
+            self._invalidate('delete_all_time_profiles', id)
 
         if reply != None:
             return decode.delete_all_time_profiles_response(reply)
@@ -1135,14 +1502,17 @@ class Uhppote:
         '''
         (id, addr, protocol) = disambiguate(controller)
         request = encode.restore_default_parameters_request(id)
-        reply = self._send(request, addr, timeout, protocol)
+        try:
+            reply = self._send(request, addr, timeout, protocol)
+        finally:
+            self._invalidate('restore_default_parameters', id)
 
         if reply != None:
             return decode.restore_default_parameters_response(reply)
 
         return None
 
-    def listen(self, onEvent):
+    def listen(self, onEvent, lazy=False):
         '''
         Establishes a listener for events from the access controllers by binding to the UDP listen 
         address from the constructor.
@@ -1150,6 +1520,8 @@ class Uhppote:
             Parameters:
                onEvent  (function)  Handler function for received events, with a function signature 
                                     f(event).
+               lazy     (bool)      Invokes the handler with a decode.EventView (decoded on access) rather
+                                    than an Event if True. Defaults to False.
 
             Returns:
                None
@@ -1157,7 +1529,7 @@ class Uhppote:
 
         def handler(packet):
             try:
-                onEvent(decode.event(packet))
+                onEvent(decode.EventView(packet) if lazy else decode.event(packet))
             except BaseException as err:
                 print('   *** ERROR {}'.format(err))
 
@@ -1165,9 +1537,176 @@ class Uhppote:
 
         return None
 
+    def listener(self,
+                 onEvent,
+                 lazy=False,
+                 rcvbuf=None,
+                 queue_size=1024,
+                 policy='drop-oldest',
+                 workers=1,
+                 onError=None):
+        '''
+        Creates a listener for events from the access controllers on the UDP listen address from the constructor.
+        Unlike 'listen', the events are received on a dedicated thread and queued for a pool of handler threads,
+        so that a slow handler does not stall the socket, and events discarded because the queue was full are
+        counted rather than silently lost.
+
+            Parameters:
+               onEvent    (function)  Handler function for received events, with a function signature f(event).
+               lazy       (bool)      Invokes the handler with a decode.EventView (decoded on access) rather
+                                      than an Event if True. Defaults to False.
+               rcvbuf     (int)       Optional socket receive buffer size (SO_RCVBUF) in bytes. Defaults to the
+                                      operating system default.
+               queue_size (int)       Maximum number of received events waiting to be handled. Defaults to 1024.
+               policy     (string)    Action when the queue is full: 'drop-oldest' (default), 'drop-newest' or
+                                      'block' (stop receiving until there is space in the queue).
+               workers    (int)       Number of handler threads. Defaults to 1.
+               onError    (function)  Optional handler for exceptions raised while decoding or handling an event,
+                                      with a function signature f(packet, exception). Defaults to printing the
+                                      exception.
+
+            Returns:
+               listener.Listener  Event listener, started with 'start' (or as a context manager) and stopped with
+                                  'stop'. 'stats' returns the received, handled, dropped and error counters.
+
+            Raises:
+               ValueError  If the policy is not one of 'drop-oldest', 'drop-newest' or 'block'.
+        '''
+
+        def handler(packet):
+            onEvent(decode.EventView(packet) if lazy else decode.event(packet))
+
+        return self._udp.listener(handler, rcvbuf, queue_size, policy, workers, onError)
+
+    def map(self, method, controllers, *args, concurrency=32, **kwargs):
+        '''
+        Invokes an API function concurrently for each of a list of controllers, yielding the per-controller
+        results as they complete. The total time taken is bounded by (roughly) the operation timeout rather
+        than by the number of controllers, provided that 'concurrency' is not less than the number of
+        controllers.
+
+            Parameters:
+               method      (string|function)  API function name (e.g. 'get_status') or bound API function.
+               controllers (list)             List of controller serial numbers or (id,address,protocol) tuples.
+               args                           Additional positional arguments for the API function.
+               concurrency (int)              Maximum number of concurrent requests. Defaults to 32.
+               kwargs                         Additional keyword arguments for the API function (e.g. timeout).
+
+            Returns:
+               Generator of Result (controller, response, error) in the order in which the calls complete.
+        '''
+        f = getattr(self, method) if isinstance(method, str) else method
+        executor = ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix='uhppoted')
+
+        try:
+            futures = {executor.submit(f, controller, *args, **kwargs): controller for controller in controllers}
+
+            for future in as_completed(futures):
+                controller = futures[future]
+                try:
+                    yield Result(controller, future.result(), None)
+                except Exception as err:
+                    yield Result(controller, None, err)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _pipeline(self, keys, request, response, dest_addr, protocol, timeout, window, retries, errors=False):
+        '''
+        Internal helper to send the request for each key to a controller and decode the replies, keeping up
+        to 'window' requests in flight and retrying requests that fail with a network error (e.g. a timeout) up
+        to 'retries' times. UDP requests use the batched I/O backend if it is enabled (or if the long-lived
+        socket is open and the replies do not identify the request - see UDP.batch), otherwise each request is
+        sent with _send on a worker thread.
+
+            Parameters:
+               keys      (iterable)  Keys for which to send a request.
+               request   (function)  Function with signature request(key) that returns the request packet.
+               response  (function)  Function with signature response(reply) that decodes a reply packet.
+               dest_addr (string)    Controller IPv4 addess:port. Defaults to broadcast address and port 60000.
+               protocol  (string)    'udp' or 'tcp'. Defaults to 'udp'.
+               timeout   (float)     Operation timeout (in seconds) per request.
+               window    (int)       Maximum number of requests in flight.
+               retries   (int)       Maximum number of retries per key.
+               errors    (bool)      Yields the network error as the result for a key once the retries are
+                                     exhausted, rather than raising it.
+
+            Returns:
+               Generator of (key, result) tuples in key order.
+
+            Raises:
+               Exception  If a request failed after 'retries' retries (unless 'errors' is set) or a reply could
+                          not be decoded.
+        '''
+        window = max(1, window)
+        keys = iter(keys)
+        results = {}
+        order = deque()
+        eof = object()
+
+        first = next(keys, eof)
+        if first is eof:
+            return
+
+        keys = chain([first], keys)
+
+        backend = None
+        if protocol != 'tcp' or dest_addr == None:
+            backend = self._udp.batch(dest_addr, timeout, request(first))
+
+        if backend == None:
+            backend = _Threaded(lambda r: self._send(r, dest_addr, timeout, protocol), window)
+
+        def fill():
+            while len(backend) < window and len(order) < 4 * window:
+                key = next(keys, eof)
+                if key is eof:
+                    break
+                order.append(key)
+                backend.submit((key, 0), request(key))
+
+        try:
+            fill()
+
+            while len(order) > 0:
+                for ((key, attempt), reply) in backend.wait():
+                    if not isinstance(reply, OSError):
+                        results[key] = response(reply)
+                    elif attempt < retries:
+                        backend.submit((key, attempt + 1), request(key))
+                    elif errors:
+                        results[key] = reply
+                    else:
+                        raise reply
+
+                while len(order) > 0 and order[0] in results:
+                    key = order.popleft()
+                    yield (key, results.pop(key))
+
+                fill()
+        finally:
+            backend.close()
+
+    def _cached(self, method, controller, args, f, timeout):
+        '''
+        Internal function to retrieve a response via the (optional) response cache.
+        '''
+        if self._cache != None and controller != 0:
+            return self._cache.get(method, controller, args, f, net.timeout_to_seconds(timeout))
+
+        return f()
+
+    def _invalidate(self, method, controller):
+        '''
+        Internal function to discard the cached responses invalidated by a mutating request.
+        '''
+        if self._cache != None:
+            self._cache.invalidate(method, controller)
+
     def _send(self, request, dest_addr, timeout, protocol):
         '''
-        Internal HAL to use either TCP or UDP to send a request to a controller and return the response.
+        Internal HAL to use either TCP or UDP to send a request to a controller and return the response. A
+        read-only request that is identical to a request already in progress (i.e. same packet, address and
+        protocol) is not sent - it waits for and returns the response to the in-progress request.
 
             Parameters:
                dest_addr (string)  Controller IPv4 addess:port. Defaults to broadcast address and port 60000.
@@ -1181,7 +1720,47 @@ class Uhppote:
                Exception  If request could not be sent or the access controller failed to respond.
         '''
 
-        if protocol == 'tcp' and dest_addr != None:
-            return self._tcp.send(request, dest_addr, timeout)
-        else:
-            return self._udp.send(request, dest_addr=dest_addr, timeout=timeout)
+        def send():
+            if protocol == 'tcp' and dest_addr != None:
+                return self._tcp.send(request, dest_addr, timeout)
+            else:
+                return self._udp.send(request, dest_addr=dest_addr, timeout=timeout)
+
+        if self._flights != None and request[1] in READ_ONLY:
+            return self._flights.do((bytes(request), dest_addr, protocol), send, net.timeout_to_seconds(timeout))
+
+        return send()
+
+
+class _Threaded:
+    '''
+    Default backend for Uhppote._pipeline, with the same submit/wait interface as udp.Batch. Each request
+    is sent (and the reply received) with a blocking send function on a worker thread.
+    '''
+
+    def __init__(self, send, window):
+        self._send = send
+        self._executor = ThreadPoolExecutor(max_workers=window, thread_name_prefix='uhppoted')
+        self._inflight = {}
+
+    def __len__(self):
+        return len(self._inflight)
+
+    def submit(self, key, request):
+        self._inflight[self._executor.submit(self._send, request)] = key
+
+    def wait(self):
+        (done, _) = wait(self._inflight, return_when=FIRST_COMPLETED)
+        completed = []
+
+        for future in done:
+            key = self._inflight.pop(future)
+            try:
+                completed.append((key, future.result()))
+            except OSError as x:
+                completed.append((key, x))
+
+        return completed
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,244 @@
+'''
+Event backfill unit tests.
+
+Tests the event index tracking and gap backfill logic of listener.Backfill.
+'''
+
+import unittest
+import datetime
+
+from uhppoted.listener import Backfill
+from uhppoted.structs import Event
+from uhppoted.structs import GetEventResponse
+
+CONTROLLER = 405419896
+TIMESTAMP = datetime.datetime(2024, 2, 22, 10, 23, 40)
+
+
+def event(index, card=10058400, timestamp=TIMESTAMP):
+    return Event(CONTROLLER, index, 2, True, 3, 1, card, timestamp, 44, None, None, False, False, False, False, False,
+                 False, False, False, 0, 0, 0, 0, 0)
+
+
+class Stub:
+    '''
+    Stands in for Uhppote.iter_events, returning the events in the requested range except for the 'lost'
+    events and raising an error after the 'fail' event.
+    '''
+
+    def __init__(self, lost=(), fail=None):
+        self.lost = lost
+        self.fail = fail
+        self.requests = []
+
+    def iter_events(self, controller, start, end, window=16, retries=3, timeout=2.5):
+        self.requests.append((controller, start, end))
+
+        for index in range(start, end + 1):
+            if index == self.fail:
+                raise OSError('timed out')
+            if index not in self.lost:
+                yield GetEventResponse(CONTROLLER, index, 2, True, 3, 1, 10058400, TIMESTAMP, 44)
+
+
+class TestBackfill(unittest.TestCase):
+
+    def test_no_gaps(self):
+        '''
+        Tests that events received in sequence are delivered without any get-event requests.
+        '''
+        (u, delivered) = (Stub(), [])
+        backfill = Backfill(u, lambda e: delivered.append(e))
+
+        for index in range(17, 23):
+            backfill(event(index))
+
+        self.assertEqual([e.event_index for e in delivered], list(range(17, 23)))
+        self.assertEqual(u.requests, [])
+        self.assertEqual(backfill.last(CONTROLLER), 22)
+        self.assertEqual(backfill.stats().delivered, 6)
+
+    def test_gap(self):
+        '''
+        Tests that missing events are retrieved and delivered in order before the received event.
+        '''
+        (u, delivered) = (Stub(), [])
+        backfill = Backfill(u, lambda e: delivered.append(e), controllers={CONTROLLER: (CONTROLLER, '127.0.0.1')})
+
+        backfill(event(1))
+        backfill(event(2))
+        backfill(event(5))
+
+        self.assertEqual([e.event_index for e in delivered], [1, 2, 3, 4, 5])
+        self.assertTrue(all(isinstance(e, Event) for e in delivered))
+        self.assertEqual(delivered[2].event_card, 10058400)
+        self.assertEqual(delivered[2].event_timestamp, TIMESTAMP)
+        self.assertEqual(delivered[2].system_date, None)
+        self.assertEqual(delivered[2].door_1_open, None)
+        self.assertEqual(u.requests, [((CONTROLLER, '127.0.0.1'), 3, 4)])
+        self.assertEqual(backfill.stats().backfilled, 2)
+        self.assertEqual(backfill.stats().delivered, 3)
+
+    def test_duplicates(self):
+        '''
+        Tests that a late event that has already been retrieved is discarded.
+        '''
+        (u, delivered) = (Stub(), [])
+        backfill = Backfill(u, lambda e: delivered.append(e))
+
+        backfill(event(1))
+        backfill(event(4))
+        backfill(event(3))
+        backfill(event(4))
+
+        self.assertEqual(len(delivered), 4)
+        self.assertEqual(backfill.last(CONTROLLER), 4)
+        self.assertEqual(backfill.stats().duplicates, 2)
+
+    def test_reset(self):
+        '''
+        Tests that an event index that goes backwards with a different event restarts the tracking.
+        '''
+        (u, delivered) = (Stub(), [])
+        backfill = Backfill(u, lambda e: delivered.append(e))
+
+        for index in range(1, 6):
+            backfill(event(index))
+
+        backfill(event(3, card=10058401))
+
+        self.assertEqual(u.requests, [(CONTROLLER, 1, 2)])
+        self.assertEqual(backfill.last(CONTROLLER), 3)
+        self.assertEqual(backfill.stats().resets, 1)
+        self.assertEqual(len(delivered), 8)
+
+    def test_late_missed_event(self):
+        '''
+        Tests that a late event that could not be retrieved is delivered once without resetting the tracking.
+        '''
+        (u, delivered) = (Stub(lost=[3]), [])
+        backfill = Backfill(u, lambda e: delivered.append(e))
+
+        backfill(event(1))
+        backfill(event(2))
+        backfill(event(4))
+        backfill(event(3))
+        backfill(event(5))
+
+        self.assertEqual([e.event_index for e in delivered], [1, 2, 4, 3, 5])
+        self.assertEqual(u.requests, [(CONTROLLER, 3, 3)])
+        self.assertEqual(backfill.last(CONTROLLER), 5)
+        self.assertEqual(backfill.stats().resets, 0)
+        self.assertEqual(backfill.stats().backfilled, 0)
+
+        backfill(event(3))
+        self.assertEqual(backfill.stats().duplicates, 1)
+
+    def test_out_of_order(self):
+        '''
+        Tests that events received out of order at startup are delivered once without resetting the tracking.
+        '''
+        (u, delivered) = (Stub(), [])
+        backfill = Backfill(u, lambda e: delivered.append(e))
+
+        backfill(event(1500))
+        backfill(event(1499))
+        backfill(event(1501))
+        backfill(event(1500))
+
+        self.assertEqual([e.event_index for e in delivered], [1500, 1499, 1501])
+        self.assertEqual(u.requests, [])
+        self.assertEqual(backfill.last(CONTROLLER), 1501)
+        self.assertEqual(backfill.stats().resets, 0)
+        self.assertEqual(backfill.stats().missed, 0)
+        self.assertEqual(backfill.stats().duplicates, 1)
+
+    def test_reset_unknown_index(self):
+        '''
+        Tests that an unknown lower event index with a later timestamp than the last delivered event restarts
+        the tracking.
+        '''
+        (u, delivered) = (Stub(), [])
+        backfill = Backfill(u, lambda e: delivered.append(e), max_gap=4)
+
+        for index in range(100, 106):
+            backfill(event(index))
+
+        backfill(event(3, timestamp=TIMESTAMP + datetime.timedelta(minutes=1)))
+
+        self.assertEqual(u.requests, [(CONTROLLER, 1, 2)])
+        self.assertEqual(backfill.last(CONTROLLER), 3)
+        self.assertEqual(backfill.stats().resets, 1)
+        self.assertEqual([e.event_index for e in delivered][-3:], [1, 2, 3])
+
+    def test_missed(self):
+        '''
+        Tests that events that could not be retrieved are counted as missed.
+        '''
+        (u, delivered) = (Stub(lost=[3], fail=6), [])
+        backfill = Backfill(u, lambda e: delivered.append(e))
+
+        backfill(event(1))
+        backfill(event(8))
+
+        self.assertEqual(len(delivered), 5)
+        self.assertEqual(backfill.stats().backfilled, 3)
+        self.assertEqual(backfill.stats().missed, 3)
+        self.assertEqual(backfill.last(CONTROLLER), 8)
+
+    def test_retrieval_error(self):
+        '''
+        Tests that an error retrieving the missing events is passed to the error handler.
+        '''
+        (u, delivered, errors) = (Stub(fail=6), [], [])
+        backfill = Backfill(u, lambda e: delivered.append(e), onError=lambda c, err: errors.append((c, str(err))))
+
+        backfill(event(1))
+        backfill(event(8))
+
+        self.assertEqual([e.event_index for e in delivered], [1, 2, 3, 4, 5, 8])
+        self.assertEqual(errors, [(CONTROLLER, 'timed out')])
+        self.assertEqual(backfill.stats().missed, 2)
+
+    def test_handler_error(self):
+        '''
+        Tests that a handler exception for a backfilled event is raised after the remaining events have been
+        delivered.
+        '''
+        delivered = []
+
+        def on_event(e):
+            if e.event_index == 11:
+                raise ValueError('handler error')
+            delivered.append(e)
+
+        (u, errors) = (Stub(), [])
+        backfill = Backfill(u, on_event, onError=lambda c, err: errors.append(err))
+
+        backfill(event(10))
+        with self.assertRaisesRegex(ValueError, 'handler error'):
+            backfill(event(15))
+
+        self.assertEqual([e.event_index for e in delivered], [10, 12, 13, 14, 15])
+        self.assertEqual(errors, [])
+        self.assertEqual(backfill.last(CONTROLLER), 15)
+        self.assertEqual(backfill.stats().backfilled, 3)
+        self.assertEqual(backfill.stats().missed, 0)
+
+    def test_max_gap(self):
+        '''
+        Tests that only the most recent events of a gap larger than max_gap are retrieved.
+        '''
+        (u, delivered) = (Stub(), [])
+        backfill = Backfill(u, lambda e: delivered.append(e), max_gap=10)
+
+        backfill(event(1))
+        backfill(event(100))
+
+        self.assertEqual(u.requests, [(CONTROLLER, 90, 99)])
+        self.assertEqual(backfill.stats().missed, 88)
+        self.assertEqual(len(delivered), 12)
+
+
+if __name__ == '__main__':
+    unittest.main()
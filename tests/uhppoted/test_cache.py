@@ -0,0 +1,362 @@
+'''
+Response cache unit tests.
+
+Tests TTL expiry, LRU eviction, invalidation and coalescing of concurrent requests for the response cache and
+the single-flight coalescing of identical read-only requests.
+'''
+
+import unittest
+import socket
+import threading
+import time
+
+from ipaddress import IPv4Address
+
+from uhppoted import uhppote
+from uhppoted.cache import ResponseCache
+from uhppoted.cache import SingleFlight
+from uhppoted.structs import CacheStats
+
+CONTROLLER = 405419896
+
+# yapf: disable
+GET_LISTENER = bytes([
+    0x17, 0x92, 0x00, 0x00, 0x78, 0x37, 0x2a, 0x18, 0xc0, 0xa8, 0x01, 0x64, 0x61, 0xea, 0x0f, 0x00,
+    0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
+    0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
+    0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
+])
+
+SET_LISTENER = bytes([
+    0x17, 0x90, 0x00, 0x00, 0x78, 0x37, 0x2a, 0x18, 0x01, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
+    0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
+    0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
+    0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
+])
+# yapf: enable
+
+
+class Counter:
+
+    def __init__(self, value='response'):
+        self.value = value
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.value
+
+
+class TestResponseCache(unittest.TestCase):
+
+    def test_hit_and_expiry(self):
+        '''
+        Tests that a cached response is returned until the TTL expires.
+        '''
+        cache = ResponseCache(ttl={'get_listener': 0.05})
+        f = Counter()
+
+        self.assertEqual(cache.get('get_listener', CONTROLLER, (), f), 'response')
+        self.assertEqual(cache.get('get_listener', CONTROLLER, (), f), 'response')
+        self.assertEqual(f.calls, 1)
+
+        time.sleep(0.1)
+
+        self.assertEqual(cache.get('get_listener', CONTROLLER, (), f), 'response')
+        self.assertEqual(f.calls, 2)
+        self.assertEqual(cache.stats(), CacheStats(1, 2, 0, 0, 1))
+
+    def test_uncached_method(self):
+        '''
+        Tests that the responses for functions without a TTL are not cached.
+        '''
+        cache = ResponseCache()
+        f = Counter()
+
+        cache.get('get_status', CONTROLLER, (), f)
+        cache.get('get_status', CONTROLLER, (), f)
+
+        self.assertEqual(f.calls, 2)
+        self.assertEqual(cache.stats(), CacheStats(0, 0, 0, 0, 0))
+
+    def test_lru_eviction(self):
+        '''
+        Tests that the least recently used response is evicted when the cache is full.
+        '''
+        cache = ResponseCache(max_entries=2)
+        f = Counter()
+
+        cache.get('get_door_control', CONTROLLER, (1, ), f)
+        cache.get('get_door_control', CONTROLLER, (2, ), f)
+        cache.get('get_door_control', CONTROLLER, (1, ), f)
+        cache.get('get_door_control', CONTROLLER, (3, ), f)
+        self.assertEqual(f.calls, 3)
+
+        cache.get('get_door_control', CONTROLLER, (1, ), f)
+        self.assertEqual(f.calls, 3)
+
+        cache.get('get_door_control', CONTROLLER, (2, ), f)
+        self.assertEqual(f.calls, 4)
+        self.assertEqual(cache.stats().evictions, 2)
+
+    def test_invalidate(self):
+        '''
+        Tests that a mutating function discards only the responses it invalidates.
+        '''
+        cache = ResponseCache()
+        f = Counter()
+
+        cache.get('get_listener', CONTROLLER, (), f)
+        cache.get('get_door_control', CONTROLLER, (1, ), f)
+        cache.get('get_listener', 303986753, (), f)
+
+        cache.invalidate('set_listener', CONTROLLER)
+        cache.invalidate('open_door', CONTROLLER)
+        self.assertEqual(cache.stats().entries, 2)
+
+        cache.invalidate('restore_default_parameters', 303986753)
+        self.assertEqual(cache.stats().entries, 1)
+
+        cache.get('get_listener', CONTROLLER, (), f)
+        cache.get('get_door_control', CONTROLLER, (1, ), f)
+        self.assertEqual(f.calls, 4)
+
+    def test_coalesced(self):
+        '''
+        Tests that concurrent identical requests are sent only once.
+        '''
+        cache = ResponseCache()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def f():
+            calls.append(1)
+            started.set()
+            release.wait()
+            return 'response'
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(cache.get('get_listener', CONTROLLER, (), f)))
+            for _ in range(4)
+        ]
+
+        threads[0].start()
+        started.wait()
+        for t in threads[1:]:
+            t.start()
+
+        while cache.stats().coalesced < 3:
+            time.sleep(0.001)
+
+        release.set()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ['response'] * 4)
+        self.assertEqual(cache.stats(), CacheStats(0, 1, 3, 0, 1))
+
+    def test_coalesced_error(self):
+        '''
+        Tests that an error retrieving a response is raised for all the coalesced requests and not cached.
+        '''
+        cache = ResponseCache()
+        release = threading.Event()
+        errors = []
+
+        def f():
+            release.wait()
+            raise TimeoutError('no response')
+
+        def get():
+            try:
+                cache.get('get_listener', CONTROLLER, (), f)
+            except TimeoutError as err:
+                errors.append(err)
+
+        threads = [threading.Thread(target=get) for _ in range(3)]
+        for t in threads:
+            t.start()
+
+        while cache.stats().coalesced < 2:
+            time.sleep(0.001)
+
+        release.set()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(errors), 3)
+        self.assertEqual(cache.stats().entries, 0)
+
+    def test_invalidated_in_flight(self):
+        '''
+        Tests that a response retrieved while the controller configuration was being updated is not cached.
+        '''
+        cache = ResponseCache()
+
+        def f():
+            cache.invalidate('set_listener', CONTROLLER)
+            return 'stale'
+
+        self.assertEqual(cache.get('get_listener', CONTROLLER, (), f), 'stale')
+        self.assertEqual(cache.get('get_listener', CONTROLLER, (), Counter()), 'response')
+
+    def test_cleared_in_flight(self):
+        '''
+        Tests that a response retrieved while the cache was being cleared is not cached.
+        '''
+        cache = ResponseCache()
+
+        def f():
+            cache.clear()
+            return 'stale'
+
+        self.assertEqual(cache.get('get_listener', CONTROLLER, (), f), 'stale')
+        self.assertEqual(cache.get('get_listener', CONTROLLER, (), Counter()), 'response')
+
+        self.assertEqual(cache.stats().entries, 1)
+
+
+class TestUhppoteCache(unittest.TestCase):
+
+    def setUp(self):
+        self.sent = []
+        self.u = uhppote.Uhppote(cache=ResponseCache())
+        self.u._send = self.send
+
+    def send(self, request, dest_addr, timeout, protocol):
+        self.sent.append(request[1])
+
+        return GET_LISTENER if request[1] == 0x92 else SET_LISTENER
+
+    def test_get_listener(self):
+        '''
+        Tests that get-listener responses are cached and invalidated by set-listener.
+        '''
+        first = self.u.get_listener(CONTROLLER)
+        second = self.u.get_listener(CONTROLLER)
+
+        self.assertEqual(first, second)
+        self.assertIsNot(first, second)
+        self.assertEqual(first.address, IPv4Address('192.168.1.100'))
+        self.assertEqual(self.sent, [0x92])
+
+        self.u.set_listener(CONTROLLER, IPv4Address('192.168.1.100'), 60001)
+        self.u.get_listener(CONTROLLER)
+
+        self.assertEqual(self.sent, [0x92, 0x90, 0x92])
+
+    def test_broadcast(self):
+        '''
+        Tests that requests to controller 0 are not cached.
+        '''
+        self.u.get_listener(0)
+        self.u.get_listener(0)
+
+        self.assertEqual(self.sent, [0x92, 0x92])
+
+
+class UDP:
+
+    def __init__(self):
+        self.sent = []
+        self.release = threading.Event()
+
+    def send(self, request, dest_addr=None, timeout=2.5):
+        self.sent.append(request[1])
+        self.release.wait()
+
+        return GET_LISTENER if request[1] == 0x92 else SET_LISTENER
+
+
+class TestSingleFlight(unittest.TestCase):
+
+    def test_do(self):
+        '''
+        Tests that sequential calls are not coalesced.
+        '''
+        flights = SingleFlight()
+        f = Counter()
+
+        self.assertEqual(flights.do('key', f), 'response')
+        self.assertEqual(flights.do('key', f), 'response')
+        self.assertEqual(f.calls, 2)
+        self.assertEqual(flights.coalesced, 0)
+
+    def test_follower_timeout(self):
+        '''
+        Tests that a coalesced call times out if the call in progress does not complete within its timeout.
+        '''
+        flights = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+
+        def f():
+            started.set()
+            release.wait()
+            return 'response'
+
+        leader = threading.Thread(target=lambda: flights.do('key', f))
+        leader.start()
+        started.wait()
+
+        try:
+            with self.assertRaises(socket.timeout):
+                flights.do('key', f, timeout=0.05)
+        finally:
+            release.set()
+            leader.join()
+
+        self.assertEqual(flights.do('key', Counter()), 'response')
+
+    def test_coalesced_requests(self):
+        '''
+        Tests that concurrent identical read-only requests share a single request and response.
+        '''
+        u = uhppote.Uhppote(coalesce=True)
+        u._udp = UDP()
+
+        responses = []
+        threads = [threading.Thread(target=lambda: responses.append(u.get_listener(CONTROLLER))) for _ in range(4)]
+        threads += [threading.Thread(target=lambda: u.set_listener(CONTROLLER, IPv4Address('192.168.1.100'), 60001))]
+        threads += [threading.Thread(target=lambda: u.set_listener(CONTROLLER, IPv4Address('192.168.1.100'), 60001))]
+
+        for t in threads:
+            t.start()
+
+        while u._flights.coalesced < 3 or len(u._udp.sent) < 3:
+            time.sleep(0.001)
+
+        u._udp.release.set()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(sorted(u._udp.sent), [0x90, 0x90, 0x92])
+        self.assertEqual(len(responses), 4)
+        self.assertTrue(all(r == responses[0] for r in responses))
+
+    def test_disabled(self):
+        '''
+        Tests that identical requests are all sent if coalescing is not enabled.
+        '''
+        u = uhppote.Uhppote()
+        u._udp = UDP()
+
+        threads = [threading.Thread(target=lambda: u.get_listener(CONTROLLER)) for _ in range(3)]
+        for t in threads:
+            t.start()
+
+        while len(u._udp.sent) < 3:
+            time.sleep(0.001)
+
+        u._udp.release.set()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(u._udp.sent, [0x92, 0x92, 0x92])
+
+
+if __name__ == '__main__':
+    unittest.main()
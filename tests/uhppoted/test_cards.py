@@ -0,0 +1,107 @@
+'''
+Card index unit tests.
+
+Tests the lookup, door permission and expiry queries of the local card index.
+'''
+
+import unittest
+import datetime
+
+from uhppoted.cards import CardIndex
+from uhppoted.structs import Card
+from uhppoted.structs import GetCardByIndexResponse
+
+CONTROLLER = 405419896
+START_DATE = datetime.date(2024, 1, 1)
+END_DATE = datetime.date(2024, 12, 31)
+
+
+class TestCardIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = CardIndex()
+        self.index.load(CONTROLLER, [
+            GetCardByIndexResponse(CONTROLLER, 10058400, START_DATE, END_DATE, 1, 0, 17, 1, 7531),
+            GetCardByIndexResponse(CONTROLLER, 10058401, START_DATE, datetime.date(2024, 6, 30), 0, 1, 0, 0, 0),
+            GetCardByIndexResponse(CONTROLLER, 10058402, datetime.date(2024, 7, 1), END_DATE, 0, 0, 1, 0, 0),
+        ])
+
+    def test_get(self):
+        '''
+        Tests looking up a card by card number.
+        '''
+        self.assertEqual(self.index.get(CONTROLLER, 10058400), Card(10058400, START_DATE, END_DATE, 1, 0, 17, 1, 7531))
+        self.assertEqual(self.index.get(CONTROLLER, 10058409), None)
+        self.assertEqual(self.index.get(303986753, 10058400), None)
+        self.assertEqual(len(self.index), 3)
+        self.assertEqual(self.index.controllers(), [CONTROLLER])
+
+    def test_by_door(self):
+        '''
+        Tests the cards with access to a door, with and without a date.
+        '''
+        self.assertEqual(sorted(self.index.by_door(CONTROLLER, 1)), [10058400])
+        self.assertEqual(sorted(self.index.by_door(CONTROLLER, 3)), [10058400, 10058402])
+        self.assertEqual(sorted(self.index.by_door(CONTROLLER, 3, datetime.date(2024, 3, 1))), [10058400])
+        self.assertEqual(self.index.by_door(303986753, 3), [])
+
+        with self.assertRaises(ValueError):
+            self.index.by_door(CONTROLLER, 5)
+
+    def test_expiring(self):
+        '''
+        Tests the cards that expire within a number of days.
+        '''
+        self.assertEqual(self.index.expiring(CONTROLLER, 30, today=datetime.date(2024, 6, 15)), [10058401])
+        self.assertEqual(sorted(self.index.expiring(CONTROLLER, 200, today=datetime.date(2024, 6, 15))),
+                         [10058400, 10058401, 10058402])
+        self.assertEqual(self.index.expiring(CONTROLLER, 30, today=datetime.date(2025, 1, 1)), [])
+
+    def test_update(self):
+        '''
+        Tests that updating a card replaces the door permissions.
+        '''
+        self.index.put(CONTROLLER, Card(10058400, START_DATE, END_DATE, 0, 0, 0, 0))
+
+        self.assertEqual(self.index.by_door(CONTROLLER, 1), [])
+        self.assertEqual(sorted(self.index.by_door(CONTROLLER, 3)), [10058402])
+        self.assertEqual(len(self.index), 3)
+
+    def test_delete(self):
+        '''
+        Tests that deleting a card moves the last card into the vacated slot.
+        '''
+        self.assertTrue(self.index.delete(CONTROLLER, 10058400))
+        self.assertFalse(self.index.delete(CONTROLLER, 10058400))
+
+        self.assertEqual(self.index.get(CONTROLLER, 10058400), None)
+        self.assertEqual(self.index.by_door(CONTROLLER, 3), [10058402])
+        self.assertEqual(self.index.get(CONTROLLER, 10058402),
+                         Card(10058402, datetime.date(2024, 7, 1), END_DATE, 0, 0, 1, 0, 0))
+        self.assertEqual(len(self.index), 2)
+
+        self.index.clear(CONTROLLER)
+        self.assertEqual(self.index.cards(CONTROLLER), [])
+
+    def test_many(self):
+        '''
+        Tests the door bitsets across multiple bytes with interleaved updates and deletes.
+        '''
+        index = CardIndex()
+        for n in range(1, 101):
+            index.put(CONTROLLER, Card(n, START_DATE, END_DATE, n % 2, n % 3, 0, 1))
+
+        for n in range(1, 101, 7):
+            index.delete(CONTROLLER, n)
+
+        expected = [n for n in range(1, 101) if (n - 1) % 7 != 0]
+
+        self.assertEqual(sorted(index.by_door(CONTROLLER, 1)), [n for n in expected if n % 2 != 0])
+        self.assertEqual(sorted(index.by_door(CONTROLLER, 2)), [n for n in expected if n % 3 != 0])
+        self.assertEqual(index.by_door(CONTROLLER, 3), [])
+        self.assertEqual(sorted(index.by_door(CONTROLLER, 4)), expected)
+        self.assertEqual(sorted(c.card_number for c in index.cards(CONTROLLER)), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+'''
+Columnar decoder unit tests.
+
+Tests the NumPy batch decoding and encoding functions (skipped if numpy is not installed).
+'''
+
+import unittest
+import datetime
+
+from uhppoted import decode
+from uhppoted import encode
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+@unittest.skipIf(numpy == None, 'numpy not installed')
+class TestColumns(unittest.TestCase):
+
+    def test_events_to_columns(self):
+        '''
+        Tests decoding a buffer of event packets into columns.
+        '''
+        # yapf: disable
+        packet = bytearray([
+                  0x17, 0x20, 0x00, 0x00, 0x78, 0x37, 0x2a, 0x18, 0x46, 0x00, 0x00, 0x00, 0x02, 0x01, 0x03, 0x01,
+                  0x9f, 0x98, 0x7c, 0x00, 0x20, 0x24, 0x02, 0x22, 0x10, 0x23, 0x40, 0x2c, 0x01, 0x00, 0x01, 0x00,
+                  0x00, 0x00, 0x01, 0x01, 0x03, 0x10, 0x23, 0x40, 0x7b, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
+                  0x27, 0x0a, 0x05, 0x24, 0x02, 0x22, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
+        ])
+        # yapf: enable
+
+        invalid = bytearray(packet)
+        invalid[1] = 0xb0
+        invalid[8] = 0x47
+        invalid[23] = 0x30
+
+        columns = decode.events_to_columns(bytes(packet + invalid))
+
+        self.assertEqual(columns['controller'].tolist(), [405419896, 405419896])
+        self.assertEqual(columns['event_index'].tolist(), [70, 71])
+        self.assertEqual(columns['event_type'].tolist(), [2, 2])
+        self.assertEqual(columns['event_access_granted'].tolist(), [True, True])
+        self.assertEqual(columns['event_door'].tolist(), [3, 3])
+        self.assertEqual(columns['event_direction'].tolist(), [1, 1])
+        self.assertEqual(columns['event_card'].tolist(), [8165535, 8165535])
+        self.assertEqual(columns['event_reason'].tolist(), [44, 44])
+        self.assertEqual(columns['event_timestamp'][0], numpy.datetime64('2024-02-22T10:23:40'))
+        self.assertTrue(numpy.isnat(columns['event_timestamp'][1]))
+
+    def test_cards_to_columns(self):
+        '''
+        Tests decoding a buffer of get-card-by-index response packets into columns.
+        '''
+        # yapf: disable
+        packet = bytearray([
+                  0x17, 0x5c, 0x00, 0x00, 0x78, 0x37, 0x2a, 0x18, 0xa0, 0x7a, 0x99, 0x00, 0x20, 0x24, 0x01, 0x01,
+                  0x20, 0x24, 0x12, 0x31, 0x01, 0x00, 0x11, 0x01, 0x3f, 0x42, 0x0f, 0x00, 0x00, 0x00, 0x00, 0x00,
+                  0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
+                  0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
+        ])
+        # yapf: enable
+
+        columns = decode.cards_to_columns(bytes(packet))
+        card = decode.get_card_by_index_response(packet)
+
+        self.assertEqual(columns['controller'].tolist(), [card.controller])
+        self.assertEqual(columns['card_number'].tolist(), [card.card_number])
+        self.assertEqual(columns['start_date'].tolist(), [card.start_date])
+        self.assertEqual(columns['end_date'].tolist(), [card.end_date])
+        self.assertEqual(columns['door_1'].tolist(), [card.door_1])
+        self.assertEqual(columns['door_3'].tolist(), [card.door_3])
+        self.assertEqual(columns['pin'].tolist(), [card.pin])
+
+    def test_invalid_buffer(self):
+        '''
+        Tests decoding an invalid buffer.
+        '''
+        with self.assertRaises(ValueError):
+            decode.events_to_columns(bytes(100))
+
+        with self.assertRaises(ValueError):
+            decode.events_to_columns(bytes(128))
+
+    def test_put_card_requests(self):
+        '''
+        Tests encoding put-card requests from NumPy columns.
+        '''
+        columns = {
+            'card_number': numpy.array([10058400, 10058401], dtype=numpy.uint32),
+            'start_date': numpy.array(['2024-01-01', '2023-06-15'], dtype='datetime64[D]'),
+            'end_date': numpy.array(['2024-12-31', '2025-06-30'], dtype='datetime64[D]'),
+            'door_1': numpy.array([1, 0], dtype=numpy.uint8),
+            'door_2': numpy.array([0, 1], dtype=numpy.uint8),
+            'door_3': numpy.array([17, 0], dtype=numpy.uint8),
+            'door_4': numpy.array([1, 29], dtype=numpy.uint8),
+            'pin': numpy.array([999999, 0], dtype=numpy.uint32),
+        }
+
+        requests = encode.put_card_requests(405419896, columns)
+
+        self.assertEqual(len(requests), 128)
+        self.assertEqual(
+            requests[0:64],
+            encode.put_card_request(405419896, 10058400, datetime.date(2024, 1, 1), datetime.date(2024, 12, 31), 1, 0,
+                                    17, 1, 999999))
+        self.assertEqual(
+            requests[64:128],
+            encode.put_card_request(405419896, 10058401, datetime.date(2023, 6, 15), datetime.date(2025, 6, 30), 0, 1,
+                                    0, 29, 0))
+
+    def test_put_card_requests_with_invalid_date(self):
+        '''
+        Tests that encoding put-card requests from NumPy columns with a missing date raises a ValueError.
+        '''
+        columns = {
+            'card_number': numpy.array([10058400], dtype=numpy.uint32),
+            'start_date': numpy.array(['NaT'], dtype='datetime64[D]'),
+            'end_date': numpy.array(['2024-12-31'], dtype='datetime64[D]'),
+            'door_1': numpy.array([1], dtype=numpy.uint8),
+            'door_2': numpy.array([0], dtype=numpy.uint8),
+            'door_3': numpy.array([0], dtype=numpy.uint8),
+            'door_4': numpy.array([1], dtype=numpy.uint8),
+        }
+
+        with self.assertRaises(ValueError):
+            encode.put_card_requests(405419896, columns)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -9,6 +9,8 @@ import datetime
 
 from ipaddress import IPv4Address
 from uhppoted import decode
+from uhppoted.structs import GetCardByIndexResponse
+from uhppoted.structs import DeleteCardResponse
 
 
 class TestDecode(unittest.TestCase):
@@ -380,6 +382,86 @@ class TestDecode(unittest.TestCase):
         self.assertEqual(event.event_reason, 44)
         self.assertEqual(event.sequence_no, 123)
 
+    def test_unpack_bcd(self):
+        '''
+        Tests decoding valid and invalid BCD dates and times.
+        '''
+        # yapf: disable
+        tests = [
+            (decode.unpack_date, [0x20, 0x24, 0x02, 0x29], datetime.date(2024, 2, 29)),
+            (decode.unpack_date, [0x20, 0x23, 0x02, 0x29], None),
+            (decode.unpack_date, [0x00, 0x00, 0x00, 0x00], None),
+            (decode.unpack_date, [0x20, 0x2a, 0x01, 0x01], None),
+            (decode.unpack_shortdate, [0x24, 0x12, 0x31], datetime.date(2024, 12, 31)),
+            (decode.unpack_shortdate, [0x24, 0x13, 0x01], None),
+            (decode.unpack_datetime, [0x20, 0x24, 0x12, 0x31, 0x23, 0x59, 0x59], datetime.datetime(2024, 12, 31, 23, 59, 59)),
+            (decode.unpack_datetime, [0x20, 0x24, 0x12, 0x31, 0x23, 0x59, 0x60], None),
+            (decode.unpack_time, [0x23, 0x59, 0x59], datetime.time(23, 59, 59)),
+            (decode.unpack_time, [0x24, 0x00, 0x00], None),
+            (decode.unpack_hhmm, [0x08, 0x30], datetime.time(8, 30)),
+            (decode.unpack_hhmm, [0x08, 0xf0], None),
+        ]
+        # yapf: enable
+
+        for (f, bcd, expected) in tests:
+            packet = bytearray(64)
+            packet[10:10 + len(bcd)] = bytes(bcd)
+
+            self.assertEqual(f(packet, 10), expected)
+
+    def test_event_view(self):
+        '''
+        Tests the lazily decoded event view.
+        '''
+        # yapf: disable
+        packet = bytes([
+                  0x17, 0x20, 0x00, 0x00, 0x78, 0x37, 0x2a, 0x18, 0x46, 0x00, 0x00, 0x00, 0x02, 0x01, 0x03, 0x01,
+                  0x9f, 0x98, 0x7c, 0x00, 0x20, 0x24, 0x02, 0x22, 0x10, 0x23, 0x40, 0x2c, 0x01, 0x00, 0x01, 0x00,
+                  0x00, 0x00, 0x01, 0x01, 0x03, 0x10, 0x23, 0x40, 0x7b, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
+                  0x27, 0x0a, 0x05, 0x24, 0x02, 0x22, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
+        ])
+        # yapf: enable
+
+        view = decode.EventView(packet)
+
+        self.assertEqual(view.controller, 405419896)
+        self.assertEqual(view.event_index, 70)
+        self.assertEqual(view.event_card, 8165535)
+        self.assertEqual(view.event_door, 3)
+        self.assertEqual(view.event_timestamp, datetime.datetime(2024, 2, 22, 10, 23, 40))
+        self.assertEqual(view.materialize(), decode.event(packet))
+        self.assertFalse(hasattr(view, '__dict__'))
+
+        with self.assertRaises(ValueError):
+            decode.EventView(packet[0:32])
+
+    def test_decode_any(self):
+        '''
+        Tests decoding packets using the function code dispatch table.
+        '''
+        # yapf: disable
+        packet = bytearray([
+                  0x17, 0x5c, 0x00, 0x00, 0x78, 0x37, 0x2a, 0x18, 0xa0, 0x7a, 0x99, 0x00, 0x20, 0x24, 0x01, 0x01,
+                  0x20, 0x24, 0x12, 0x31, 0x01, 0x00, 0x11, 0x01, 0x3f, 0x42, 0x0f, 0x00, 0x00, 0x00, 0x00, 0x00,
+                  0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
+                  0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
+        ])
+        # yapf: enable
+
+        self.assertEqual(decode.decode_any(packet), decode.get_card_by_index_response(packet))
+        self.assertIsInstance(decode.decode_any(packet), GetCardByIndexResponse)
+
+        packet[1] = 0x52
+        self.assertIsInstance(decode.decode_any(packet), DeleteCardResponse)
+
+        packet[1] = 0x97
+        with self.assertRaises(ValueError):
+            decode.decode_any(packet)
+
+        packet[1] = 0x5c
+        with self.assertRaises(ValueError):
+            decode.decode_any(packet[0:32])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -9,6 +9,7 @@ import datetime
 
 from ipaddress import IPv4Address
 from uhppoted import encode
+from uhppoted.structs import Card
 
 
 class TestEncode(unittest.TestCase):
@@ -47,6 +48,62 @@ class TestEncode(unittest.TestCase):
 
         self.assertEqual(request, expected)
 
+    def test_put_card_request_into(self):
+        '''
+        Tests encoding a put-card request into a caller supplied buffer.
+        '''
+        # yapf: disable
+        expected = bytearray([
+            0x17, 0x50, 0x00, 0x00, 0x78, 0x37, 0x2a, 0x18, 0xa0, 0x7a, 0x99, 0x00, 0x20, 0x24, 0x01, 0x01,
+            0x20, 0x24, 0x12, 0x31, 0x01, 0x00, 0x11, 0x01, 0x3f, 0x42, 0x0f, 0x00, 0x00, 0x00, 0x00, 0x00,
+            0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
+            0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
+        ])
+        # yapf: enable
+
+        buffer = bytearray([0xff] * 192)
+        args = (405419896, 10058400, datetime.date(2024, 1, 1), datetime.date(2024, 12, 31), 1, 0, 17, 1, 999999)
+
+        encode.put_card_request_into(buffer, 64, *args)
+
+        self.assertEqual(buffer[64:128], expected)
+        self.assertEqual(buffer[0:64], bytearray([0xff] * 64))
+        self.assertEqual(buffer[128:192], bytearray([0xff] * 64))
+        self.assertEqual(encode.put_card_request(*args), expected)
+
+    def test_put_card_requests(self):
+        '''
+        Tests encoding a list of cards into a single contiguous buffer of put-card requests.
+        '''
+        cards = [
+            Card(10058400, datetime.date(2024, 1, 1), datetime.date(2024, 12, 31), 1, 0, 17, 1, 999999),
+            Card(10058401, datetime.date(2023, 6, 15), datetime.date(2025, 6, 30), 0, 1, 0, 29, 0),
+        ]
+
+        requests = encode.put_card_requests(405419896, cards)
+
+        self.assertIsInstance(requests, memoryview)
+        self.assertEqual(len(requests), 128)
+
+        for (ix, card) in enumerate(cards):
+            expected = encode.put_card_request(405419896, card.card_number, card.start_date, card.end_date, card.door_1,
+                                               card.door_2, card.door_3, card.door_4, card.pin)
+
+            self.assertEqual(requests[64 * ix:64 * (ix + 1)], expected)
+
+    def test_prototype(self):
+        '''
+        Tests that requests encoded from the cached prototype packets do not modify the prototype.
+        '''
+        request = encode.get_event_request(405419896, 17)
+        request[8] = 0xff
+
+        prototype = encode.prototype(0xb0, 405419896)
+
+        self.assertEqual(encode.get_event_request(405419896, 17)[8], 17)
+        self.assertEqual(prototype[0:8], bytes([0x17, 0xb0, 0x00, 0x00, 0x78, 0x37, 0x2a, 0x18]))
+        self.assertEqual(prototype[8:64], bytes(56))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,188 @@
+'''
+Event journal unit tests.
+
+Tests appending, lookup, replay and segment rotation for the memory-mapped event journal.
+'''
+
+import unittest
+import datetime
+import os
+import struct
+import tempfile
+
+from uhppoted import decode
+from uhppoted.journal import Journal
+from uhppoted.structs import GetEventResponse
+
+CONTROLLER = 405419896
+
+# yapf: disable
+EVENT = bytes([
+    0x17, 0x20, 0x00, 0x00, 0x78, 0x37, 0x2a, 0x18, 0x46, 0x00, 0x00, 0x00, 0x02, 0x01, 0x03, 0x01,
+    0x9f, 0x98, 0x7c, 0x00, 0x20, 0x24, 0x02, 0x22, 0x10, 0x23, 0x40, 0x2c, 0x01, 0x00, 0x01, 0x00,
+    0x00, 0x00, 0x01, 0x01, 0x03, 0x10, 0x23, 0x40, 0x7b, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
+    0x27, 0x0a, 0x05, 0x24, 0x02, 0x22, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
+])
+# yapf: enable
+
+
+def event(index, controller=CONTROLLER):
+    packet = bytearray(EVENT)
+    struct.pack_into('<LL', packet, 4, controller, index)
+
+    return bytes(packet)
+
+
+class TestJournal(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = os.path.join(self.tmp.name, 'journal')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_append_and_get(self):
+        '''
+        Tests looking up an appended event packet by controller and event index.
+        '''
+        with Journal(self.directory) as journal:
+            for index in range(1, 11):
+                journal.append(event(index))
+            journal.append(event(7, controller=303986753))
+
+            self.assertEqual(len(journal), 11)
+            self.assertEqual(journal.get(CONTROLLER, 7), event(7))
+            self.assertEqual(journal.get(303986753, 7), event(7, controller=303986753))
+            self.assertEqual(journal.get(CONTROLLER, 11), None)
+            self.assertEqual(journal.get(405419897, 1), None)
+            self.assertEqual(journal.event_indexes(303986753), [7])
+
+    def test_replay(self):
+        '''
+        Tests replaying the journal through the decoder.
+        '''
+        with Journal(self.directory) as journal:
+            journal.append(event(1))
+            journal.append(event(2, controller=303986753))
+            journal.append(event(3))
+
+            events = list(journal.replay())
+            views = list(journal.replay(controller=CONTROLLER, lazy=True))
+
+            self.assertEqual([e.event_index for e in events], [1, 2, 3])
+            self.assertEqual(events[0], decode.event(event(1)))
+            self.assertEqual([v.event_index for v in views], [1, 3])
+            self.assertIsInstance(views[0], decode.EventView)
+
+            del views
+
+    def test_rotation_and_reopen(self):
+        '''
+        Tests that segments are rotated when full and that the index is rebuilt when the journal is reopened.
+        '''
+        with Journal(self.directory, segment_records=4) as journal:
+            for index in range(1, 11):
+                journal.append(event(index))
+
+            self.assertEqual(len(journal.segments), 3)
+
+        with Journal(self.directory, segment_records=4) as journal:
+            self.assertEqual(len(journal), 10)
+            self.assertEqual(journal.get(CONTROLLER, 9), event(9))
+
+            journal.append(event(11))
+            journal.append(event(12))
+            journal.append(event(13))
+
+            self.assertEqual(len(journal.segments), 4)
+            self.assertEqual(journal.event_indexes(CONTROLLER), list(range(1, 14)))
+            self.assertEqual([bytes(p) for p in journal.packets()], [event(i) for i in range(1, 14)])
+
+    def test_empty_segment(self):
+        '''
+        Tests reopening a journal with an empty last segment file (e.g. after a crash while rotating).
+        '''
+        with Journal(self.directory, segment_records=4) as journal:
+            for index in range(1, 5):
+                journal.append(event(index))
+
+        open(os.path.join(self.directory, 'events.00000002.journal'), 'xb').close()
+
+        with Journal(self.directory, segment_records=4) as journal:
+            self.assertEqual(len(journal), 4)
+
+            for index in range(5, 10):
+                journal.append(event(index))
+
+            self.assertEqual(len(journal.segments), 3)
+
+        with Journal(self.directory, segment_records=4) as journal:
+            self.assertEqual(journal.event_indexes(CONTROLLER), list(range(1, 10)))
+
+    def test_v6_62_events(self):
+        '''
+        Tests appending and reopening a journal with v6.62 firmware events (0x19 start-of-message byte).
+        '''
+        packets = [bytearray(event(index)) for index in range(1, 6)]
+        for packet in packets[1::2]:
+            packet[0] = 0x19
+
+        with Journal(self.directory, segment_records=4) as journal:
+            for packet in packets:
+                journal.append(packet)
+
+        with Journal(self.directory, segment_records=4) as journal:
+            self.assertEqual(len(journal), 5)
+            self.assertEqual(journal.get(CONTROLLER, 4), packets[3])
+
+            journal.append(event(6))
+
+            self.assertEqual([bytes(p) for p in journal.packets()], [bytes(p) for p in packets] + [event(6)])
+            self.assertEqual([e.event_index for e in journal.replay()], [1, 2, 3, 4, 5, 6])
+
+    def test_append_record(self):
+        '''
+        Tests appending decoded events.
+        '''
+        timestamp = datetime.datetime(2024, 2, 22, 10, 23, 40)
+        record = GetEventResponse(CONTROLLER, 17, 2, True, 3, 1, 8165535, timestamp, 44)
+
+        with Journal(self.directory) as journal:
+            journal.append_record(record)
+            journal.append_record(decode.event(event(18)))
+            journal.append_record(decode.EventView(event(19)))
+
+            self.assertEqual(decode.get_event_response(journal.get(CONTROLLER, 17)), record)
+            self.assertEqual(decode.get_event_response(journal.get(CONTROLLER, 18)),
+                             GetEventResponse(CONTROLLER, 18, 2, True, 3, 1, 8165535, timestamp, 44))
+            self.assertEqual(journal.get(CONTROLLER, 19), event(19))
+
+            self.assertEqual([type(e).__name__ for e in journal.replay()],
+                             ['GetEventResponse', 'GetEventResponse', 'Event'])
+
+    def test_append_invalid_packet(self):
+        '''
+        Tests that packets that are not events are rejected.
+        '''
+        packet = bytearray(event(1))
+        packet[1] = 0x94
+
+        with Journal(self.directory) as journal:
+            with self.assertRaises(ValueError):
+                journal.append(packet)
+
+            with self.assertRaises(ValueError):
+                journal.append(event(0))
+
+            with self.assertRaises(ValueError):
+                journal.append(event(1)[0:63])
+
+            with self.assertRaises(ValueError):
+                journal.append(bytes([0x19, 0xb0]) + event(1)[2:])
+
+            self.assertEqual(len(journal), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -9,6 +9,7 @@ import unittest
 from uhppoted.net import timeout_to_seconds
 from uhppoted.net import disambiguate
 from uhppoted.net import Controller
+from uhppoted.net import matches
 
 
 class TestNet(unittest.TestCase):
@@ -53,6 +54,30 @@ class TestNet(unittest.TestCase):
         for test in tests:
             self.assertEqual(disambiguate(test[0]), test[1])
 
+    def test_matches(self):
+        '''
+        Tests matching a reply to a request on function code and controller serial number.
+        '''
+        request = bytearray(64)
+        request[0:8] = bytes([0x17, 0x20, 0x00, 0x00, 0x78, 0x37, 0x2a, 0x18])
+
+        broadcast = bytearray(64)
+        broadcast[0:8] = bytes([0x17, 0x94, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00])
+
+        tests = [
+            (request, bytes([0x17, 0x20, 0x00, 0x00, 0x78, 0x37, 0x2a, 0x18]), True),
+            (request, bytes([0x17, 0x32, 0x00, 0x00, 0x78, 0x37, 0x2a, 0x18]), False),
+            (request, bytes([0x17, 0x20, 0x00, 0x00, 0x79, 0x37, 0x2a, 0x18]), False),
+            (broadcast, bytes([0x17, 0x94, 0x00, 0x00, 0x78, 0x37, 0x2a, 0x18]), True),
+            (broadcast, bytes([0x17, 0x20, 0x00, 0x00, 0x78, 0x37, 0x2a, 0x18]), False),
+        ]
+
+        for (rq, header, expected) in tests:
+            reply = bytearray(64)
+            reply[0:8] = header
+
+            self.assertEqual(matches(rq, reply), expected)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,129 @@
+'''
+Rate limiter unit tests.
+
+Tests the per-controller token bucket and in-flight request limits.
+'''
+
+import unittest
+import threading
+import time
+
+from uhppoted import encode
+from uhppoted.ratelimit import Limit
+from uhppoted.ratelimit import RateLimiter
+from uhppoted.structs import RateLimiterStats
+
+CONTROLLER = 405419896
+ADDR = ('192.168.1.100', 60000)
+REQUEST = encode.get_status_request(CONTROLLER)
+
+
+class TestRateLimiter(unittest.TestCase):
+
+    def test_unlimited(self):
+        '''
+        Tests that requests are not delayed by default.
+        '''
+        limiter = RateLimiter()
+
+        for _ in range(100):
+            self.assertEqual(limiter.try_acquire(REQUEST, ADDR), 0)
+
+        self.assertEqual(limiter.stats(), RateLimiterStats(100, 0, 100))
+
+    def test_rate(self):
+        '''
+        Tests that requests are paced at the configured rate after the initial burst.
+        '''
+        limiter = RateLimiter(rate=100, burst=5)
+
+        start = time.monotonic()
+        for _ in range(15):
+            with limiter.request(REQUEST, ADDR):
+                pass
+
+        elapsed = time.monotonic() - start
+
+        self.assertGreaterEqual(elapsed, 0.09)
+        self.assertLess(elapsed, 1.0)
+        self.assertEqual(limiter.stats(), RateLimiterStats(15, 10, 0))
+
+    def test_try_acquire(self):
+        '''
+        Tests the non-blocking acquire delays for the rate and in-flight limits.
+        '''
+        limiter = RateLimiter(rate=10, max_inflight=2)
+
+        self.assertEqual(limiter.try_acquire(REQUEST, ADDR), 0)
+
+        delay = limiter.try_acquire(REQUEST, ADDR)
+        self.assertGreater(delay, 0.05)
+        self.assertLessEqual(delay, 0.1)
+
+        time.sleep(delay)
+        self.assertEqual(limiter.try_acquire(REQUEST, ADDR), 0)
+        self.assertEqual(limiter.try_acquire(REQUEST, ADDR), None)
+
+        limiter.release(REQUEST, ADDR)
+        self.assertEqual(limiter.stats().inflight, 1)
+
+    def test_max_inflight(self):
+        '''
+        Tests that concurrent requests wait for a request in flight to be released.
+        '''
+        limiter = RateLimiter(max_inflight=2)
+        release = threading.Event()
+        inflight = []
+        peak = []
+        lock = threading.Lock()
+
+        def request():
+            with limiter.request(REQUEST, ADDR):
+                with lock:
+                    inflight.append(1)
+                    peak.append(len(inflight))
+
+                release.wait()
+
+                with lock:
+                    inflight.pop()
+
+        threads = [threading.Thread(target=request) for _ in range(6)]
+        for t in threads:
+            t.start()
+
+        while limiter.stats().throttled < 4:
+            time.sleep(0.001)
+
+        release.set()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(max(peak), 2)
+        self.assertEqual(limiter.stats(), RateLimiterStats(6, 4, 0))
+
+    def test_per_controller(self):
+        '''
+        Tests the per-controller limits by serial number and address and that each controller has its own
+        bucket.
+        '''
+        limiter = RateLimiter(max_inflight=1,
+                              controllers={
+                                  CONTROLLER: Limit(max_inflight=2),
+                                  '192.168.1.101:60000': Limit(max_inflight=3),
+                                  '192.168.1.102': Limit(),
+                              })
+
+        def acquired(controller, addr, n):
+            request = encode.get_status_request(controller)
+            return [limiter.try_acquire(request, addr) for _ in range(n)]
+
+        self.assertEqual(acquired(CONTROLLER, ADDR, 3), [0, 0, None])
+        self.assertEqual(acquired(303986753, ('192.168.1.101', 60000), 4), [0, 0, 0, None])
+        self.assertEqual(acquired(201020304, ('192.168.1.102', 60000), 4), [0, 0, 0, 0])
+        self.assertEqual(acquired(123456789, ('192.168.1.103', 60000), 2), [0, None])
+        self.assertEqual(acquired(0, ('192.168.1.103', 60000), 2), [0, None])
+
+
+if __name__ == '__main__':
+    unittest.main()
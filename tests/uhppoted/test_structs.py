@@ -0,0 +1,63 @@
+'''
+Shared dataclass unit tests.
+
+Tests the slotted dataclass variants.
+'''
+
+import datetime
+import unittest
+
+from uhppoted.structs import Card
+from uhppoted.structs import GetCardByIndexResponse
+from uhppoted.structs import slotted
+from uhppoted.structs import compact
+
+
+class TestStructs(unittest.TestCase):
+
+    def test_slotted(self):
+        '''
+        Tests the slotted variant of a dataclass.
+        '''
+        start = datetime.date(2024, 1, 1)
+        end = datetime.date(2024, 12, 31)
+
+        Slotted = slotted(GetCardByIndexResponse)
+        card = Slotted(405419896, 10058400, start, end, 1, 0, 0, 1, 7531)
+
+        self.assertEqual(Slotted.__name__, 'GetCardByIndexResponse')
+        self.assertEqual(card.card_number, 10058400)
+        self.assertEqual(card, Slotted(405419896, 10058400, start, end, 1, 0, 0, 1, 7531))
+        self.assertNotEqual(card, Slotted(405419896, 10058401, start, end, 1, 0, 0, 1, 7531))
+        self.assertFalse(hasattr(card, '__dict__'))
+        self.assertIs(slotted(GetCardByIndexResponse), Slotted)
+
+    def test_slotted_with_defaults(self):
+        '''
+        Tests the slotted variant of a dataclass with default field values.
+        '''
+        start = datetime.date(2024, 1, 1)
+        end = datetime.date(2024, 12, 31)
+
+        card = slotted(Card)(10058400, start, end, 1, 0, 0, 1)
+
+        self.assertEqual(card.pin, 0)
+        self.assertFalse(hasattr(card, '__dict__'))
+
+    def test_compact(self):
+        '''
+        Tests converting a dataclass instance to the slotted variant.
+        '''
+        start = datetime.date(2024, 1, 1)
+        end = datetime.date(2024, 12, 31)
+
+        card = GetCardByIndexResponse(405419896, 10058400, start, end, 1, 0, 0, 1, 7531)
+        compacted = compact(card)
+
+        self.assertIsInstance(compacted, slotted(GetCardByIndexResponse))
+        self.assertEqual(compacted, slotted(GetCardByIndexResponse)(405419896, 10058400, start, end, 1, 0, 0, 1, 7531))
+        self.assertFalse(hasattr(compacted, '__dict__'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+'''
+Card list synchronisation unit tests.
+
+Tests the card list diff function.
+'''
+
+import datetime
+import unittest
+
+from uhppoted.structs import Card
+from uhppoted.structs import GetCardByIndexResponse
+from uhppoted.sync import diff
+
+
+class TestSync(unittest.TestCase):
+
+    def test_diff(self):
+        '''
+        Tests the diff between the cards stored on a controller and the desired card list.
+        '''
+        start = datetime.date(2024, 1, 1)
+        end = datetime.date(2024, 12, 31)
+
+        current = [
+            GetCardByIndexResponse(405419896, 10058400, start, end, 1, 0, 0, 1, 7531),
+            GetCardByIndexResponse(405419896, 10058401, start, end, 1, 1, 0, 0, 0),
+            GetCardByIndexResponse(405419896, 10058402, start, end, 0, 0, 0, 1, 0),
+        ]
+
+        desired = [
+            Card(10058400, start, end, 1, 0, 0, 1, 7531),
+            Card(10058401, start, datetime.date(2025, 12, 31), 1, 1, 0, 0, 0),
+            Card(10058403, start, end, 1, 1, 1, 1, 0),
+        ]
+
+        (added, updated, deleted, unchanged) = diff(current, desired)
+
+        self.assertEqual(added, [desired[2]])
+        self.assertEqual(updated, [desired[1]])
+        self.assertEqual(deleted, [10058402])
+        self.assertEqual(unchanged, 1)
+
+    def test_diff_with_no_changes(self):
+        '''
+        Tests the diff between identical card lists.
+        '''
+        start = datetime.date(2024, 1, 1)
+        end = datetime.date(2024, 12, 31)
+
+        cards = [
+            Card(10058400, start, end, 1, 0, 0, 1, 7531),
+            Card(10058401, start, end, 1, 1, 0, 0),
+        ]
+
+        self.assertEqual(diff(cards, cards), ([], [], [], 2))
+
+
+if __name__ == '__main__':
+    unittest.main()